@@ -1,153 +1,1012 @@
+import inspect
+import os
+import signal
 import threading
+import time
 from queue import Empty, Full, Queue
-from typing import Any, Type
+from typing import TYPE_CHECKING, Any
 
-from activity_detection.classifiers import (
-    MoondreamActivityDetector,
-    YOLOActivityDetector,
-    YOLOWorldActivityDetector,
-)
-from activity_detection.classifiers.interfaces import (
-    ActivityDetectionInterface,
-)
+import numpy as np
+import yaml
+
+from activity_detection.classifiers.types import Prediction
 from activity_detection.inputs.camera_input import (
+    CameraBase,
     CameraInputInterface,
-    IPCamera,
-    LocalCamera,
+    EndOfStream,
 )
-from activity_detection.logging_config import setup_logger
-from activity_detection.processing.image_processing import (
-    DefaultImageProcessor,
-    ImageProcessingInterface,
+from activity_detection.logging_config import (
+    configure_logging,
+    every,
+    setup_logger,
 )
-from activity_detection.security.security_capture import DefaultVideoCapture
-from activity_detection.security.security_logging import DefaultSecurityLogging
+from activity_detection.metrics import PipelineMetrics
+from activity_detection.pipeline.degradation import DegradationController
+from activity_detection.pipeline.frame_queue import FrameQueue
+from activity_detection.registry import resolve
 from activity_detection.security.security_module import SecurityModule
+from activity_detection.startup import startup
 
-COMPONENT_MAPPING: dict[str, dict[str | None, Type]] = {
-    "camera_input": {
-        "IPCamera": IPCamera,
-        "LocalCamera": LocalCamera,
-    },
-    "image_processor": {
-        "DefaultImageProcessor": DefaultImageProcessor,
-    },
-    "activity_detector": {
-        "YOLOActivityDetector": YOLOActivityDetector,
-        "YOLOWorldActivityDetector": YOLOWorldActivityDetector,
-        "MoondreamActivityDetector": MoondreamActivityDetector,
-    },
-    "security_logging": {
-        "DefaultSecurityLogging": DefaultSecurityLogging,
-    },
-    "video_capture": {
-        "DefaultVideoCapture": DefaultVideoCapture,
-    },
-}
+if TYPE_CHECKING:
+    # Only for annotations: importing detectors at runtime would load torch
+    # before the config has picked a component.
+    from activity_detection.classifiers.interfaces import ActivityDetectionInterface
+    from activity_detection.processing.image_processing import (
+        ImageProcessingInterface,
+    )
+    from activity_detection.processing.motion_detection import (
+        MotionDetectionInterface,
+    )
+    from activity_detection.processing.tracking import ObjectTrackingInterface
+    from activity_detection.security.event_store import EventStoreInterface
 
+# Put on a camera's processed frame queue to stop its writer once the frames
+# ahead of it are written.
+_STOP = object()
+
+
+class CameraStream:
+    """Per-camera pipeline state.
+
+    Each camera owns its capture input, its security module (and therefore its
+    own video writer state), optional motion detector and object tracker
+    deciding when the shared detector needs to run, and the queues feeding
+    and draining that detector. Frames wait in the feeding queue as
+    (capture time, frame) pairs, and queue_policy decides which frames are
+    lost when it is full (see FrameQueue).
+    """
 
-class ActivityManager:
     def __init__(
         self,
+        name: str,
         camera_input: CameraInputInterface,
-        image_processor: ImageProcessingInterface,
-        activity_detector: ActivityDetectionInterface,
         security_module: SecurityModule,
+        motion_detector: "MotionDetectionInterface | None" = None,
+        object_tracker: "ObjectTrackingInterface | None" = None,
+        queue_size: int = 100,
+        queue_policy: str = "drop_oldest",
     ):
+        self.name = name
         self.camera_input = camera_input
+        self.security_module = security_module
+        self.motion_detector = motion_detector
+        self.object_tracker = object_tracker
+        self.frame_count = 0
+        # Reused for frames the detector is skipped on when there is no tracker.
+        self.last_prediction = Prediction(detected=False)
+        self.frame_queue = FrameQueue(queue_size, queue_policy)
+        self.processed_frame_queue = Queue(maxsize=queue_size)
+        # Set to stop capturing from this camera.
+        self.stopped = threading.Event()
+        self.capture_thread: threading.Thread | None = None
+        self.write_thread: threading.Thread | None = None
+        # The configured frame rate of a live camera, which degradation may
+        # lower.
+        self.target_fps = (
+            camera_input.target_fps if isinstance(camera_input, CameraBase) else None
+        )
+
+    def should_run_detector(self, frame, inference_stride: int) -> bool:
+        """Decide whether this frame goes through the shared detector.
+
+        Only every inference_stride-th frame is considered, and of those only
+        the ones the motion detector (if any) lets through.
+        """
+        on_stride = self.frame_count % inference_stride == 0
+        self.frame_count += 1
+        if not on_stride:
+            return False
+        return self.motion_detector is None or self.motion_detector.should_run_detector(
+            frame
+        )
+
+    def record_prediction(self, prediction: Prediction) -> Prediction:
+        """Store a fresh detector prediction, assigning track IDs if tracking."""
+        if self.object_tracker:
+            prediction = self.object_tracker.update(prediction)
+        self.last_prediction = prediction
+        return prediction
+
+    def skipped_prediction(self) -> Prediction:
+        """Prediction for a frame the detector did not run on."""
+        if self.object_tracker:
+            return self.object_tracker.predict()
+        return self.last_prediction
+
+
+class ActivityManager:
+    def __init__(
+        self,
+        cameras: list[CameraStream],
+        image_processor: "ImageProcessingInterface",
+        activity_detector: "ActivityDetectionInterface",
+        batch_size: int = 1,
+        batch_timeout_ms: float = 0,
+        inference_stride: int = 1,
+        max_frame_age_ms: float | None = None,
+        metrics: PipelineMetrics | None = None,
+        warmup_runs: int = 2,
+        warmup_frame_shape: tuple[int, ...] = (1080, 1920, 3),
+        drain_timeout_s: float = 5.0,
+        degradation: DegradationController | None = None,
+    ):
+        if not cameras:
+            raise ValueError("At least one camera is required")
+        if len({camera.name for camera in cameras}) != len(cameras):
+            raise ValueError("Camera names must be unique")
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1")
+        if warmup_runs < 0:
+            raise ValueError("Warm-up runs must not be negative")
+        if drain_timeout_s < 0:
+            raise ValueError("Drain timeout must not be negative")
+
+        self.cameras = cameras
         self.image_processor = image_processor
         self.activity_detector = activity_detector
-        self.security_module = security_module
-        self.frame_queue = Queue(maxsize=100)
-        self.processed_frame_queue = Queue(maxsize=100)
+        self.batch_size = batch_size
+        self.update_settings(
+            batch_timeout_ms=batch_timeout_ms,
+            inference_stride=inference_stride,
+            max_frame_age_ms=max_frame_age_ms,
+        )
+        self.drain_timeout = drain_timeout_s
+        self.metrics = metrics or PipelineMetrics(summary_interval_s=None)
+        self.warmup_runs = warmup_runs
+        self.warmup_frame_shape = tuple(warmup_frame_shape)
+        self.image_processor.configure(activity_detector.input_size, batch_size)
+        for name in activity_detector.stats():
+            self.metrics.add_gauge(
+                f"detector_{name}",
+                "",
+                lambda name=name: activity_detector.stats()[name],
+            )
+        self.degradation = degradation
+        # The configured input size, which degradation may lower.
+        self.input_size = activity_detector.input_size
+        if degradation is not None:
+            try:
+                activity_detector.set_input_size(self.input_size)
+            except ValueError:
+                degradation.disable("input_size")
+            # Only live cameras have a frame rate to lower. File and replay
+            # inputs, and the detection process of ProcessPipeline, don't.
+            if all(camera.target_fps is None for camera in cameras):
+                degradation.disable("target_fps")
+            self.metrics.add_gauge("degradation_level", "", lambda: degradation.level)
+        # Counts the frames waiting across all camera frame queues, so the
+        # processing thread can block until any camera has a frame.
+        self.frames_available = threading.Semaphore(0)
+        self.next_camera = 0
         self.running = True
+        # Set once capture has stopped, after which processing ends as soon
+        # as every frame queue is empty or drain_deadline has passed.
+        self.draining = False
+        self.drain_deadline = float("inf")
+        self.processing_thread: threading.Thread | None = None
+        self.stop_requested = threading.Event()
+        self.reload_requested = threading.Event()
+        # The config the running components were built from, if any.
+        self.config: dict[str, Any] | None = None
+        self.config_path: str | None = None
+        self.config_mtime: float | None = None
+        self.camera_names = [camera.name for camera in cameras]
         self.logger = setup_logger(self.__class__.__name__)
 
-    def capture_frames(self):
-        self.camera_input.start_capture()
-        while self.running:
-            frame = self.camera_input.get_frame()
+    def update_settings(
+        self,
+        batch_timeout_ms: float = 0,
+        inference_stride: int = 1,
+        max_frame_age_ms: float | None = None,
+    ):
+        """Set the frame scheduling settings, which may change while running."""
+        if batch_timeout_ms < 0:
+            raise ValueError("Batch timeout must not be negative")
+        if inference_stride < 1:
+            raise ValueError("Inference stride must be at least 1")
+        if max_frame_age_ms is not None and max_frame_age_ms <= 0:
+            raise ValueError("Max frame age must be positive")
+        self.batch_timeout = batch_timeout_ms / 1000
+        self.inference_stride = inference_stride
+        self.max_frame_age = (
+            max_frame_age_ms / 1000 if max_frame_age_ms is not None else None
+        )
+
+    def warm_up(self):
+        """Run the detector on dummy frames before any camera is read.
+
+        The first inferences pay for lazy initialisation, memory allocation
+        and, with torch.compile, compilation. Paying for them here keeps that
+        stall out of the first real frames. Each run detects one frame and
+        then a full batch, so both the smallest and the largest batch shape
+        are prepared. Frames go through the image processor, so the detector
+        sees the input shape it will get from warmup_frame_shape frames.
+        """
+        if not self.warmup_runs:
+            return
+        frame = np.full(self.warmup_frame_shape, 114, dtype=np.uint8)
+        batch_sizes = [1] if self.batch_size == 1 else [1, self.batch_size]
+        single = []
+        started = time.perf_counter()
+        with startup.step("warm-up"):
+            for _ in range(self.warmup_runs):
+                for batch_size in batch_sizes:
+                    images = [
+                        self.image_processor.process_frame(frame)
+                        for _ in range(batch_size)
+                    ]
+                    inference_started = time.perf_counter()
+                    self.activity_detector.detect_batch(images)
+                    if batch_size == 1:
+                        single.append(time.perf_counter() - inference_started)
+        elapsed = time.perf_counter() - started
+        self.metrics.observe("warmup", "", elapsed)
+        self.logger.info(
+            f"Warm-up took {elapsed:.2f}s: first inference {single[0] * 1000:.0f} ms, "
+            f"warmed up {single[-1] * 1000:.0f} ms"
+        )
+
+    def capture_frames(self, camera: CameraStream):
+        camera.camera_input.start_capture()
+        while self.running and not camera.stopped.is_set():
             try:
-                self.frame_queue.put_nowait(frame)
-            except Full:
-                self.logger.warning("Frame queue is full. Skipping frame.")
+                with self.metrics.time("capture", camera.name):
+                    frame, captured_at = camera.camera_input.get_frame_with_timestamp()
+            except EndOfStream:
+                self.logger.info(f"{camera.name} has no more frames")
+                return
+            self.metrics.count("frames_captured", camera.name)
+            # A frame replacing an older one is already counted as available.
+            if camera.frame_queue.push((captured_at, frame)):
+                self.frames_available.release()
+            else:
+                self.metrics.count("frames_dropped", camera.name)
 
     def process_frames(self):
         while self.running:
-            try:
-                frame = self.frame_queue.get()
-                processed_image = self.image_processor.process_frame(frame)
-                prediction = self.activity_detector.detect_activity(processed_image)
+            batch = self._collect_batch()
+            if not batch:
+                if self.draining:
+                    return
+                continue
+            if self.draining and time.monotonic() > self.drain_deadline:
+                self.logger.warning("Drain timed out. Dropping the queued frames.")
+                return
+            inference_stride = self._inference_stride()
+            run_detector = [
+                not self._is_stale(camera, captured_at)
+                and camera.should_run_detector(frame, inference_stride)
+                for camera, captured_at, frame in batch
+            ]
+            images = []
+            transforms = []
+            for (camera, _, frame), run in zip(batch, run_detector):
+                if run:
+                    with self.metrics.time("preprocess", camera.name):
+                        images.append(self.image_processor.process_frame(frame))
+                        transforms.append(self.image_processor.get_transform(frame))
+            transforms = iter(transforms)
+            predictions = []
+            if images:
                 try:
-                    self.processed_frame_queue.put((frame, prediction))
-                except Full:
-                    self.logger.warning(
-                        "Processed frame queue is full. Skipping frame."
+                    with self.metrics.time("inference"):
+                        predictions = self.activity_detector.detect_batch(images)
+                except (ConnectionError, TimeoutError, RuntimeError) as e:
+                    # E.g. a detector server restarting. The batch is treated
+                    # as skipped so detection carries on with the next one.
+                    self.logger.error(
+                        f"Inference failed, skipping the batch: {e}", extra=every(5)
                     )
-            except Empty:
-                pass
+                    self.metrics.count("inference_errors", "")
+                    run_detector = [False] * len(batch)
+            predictions = iter(predictions)
+            # Frames are handled in capture order so skipped frames see the
+            # tracker state from every earlier frame in the batch.
+            for (camera, captured_at, frame), run in zip(batch, run_detector):
+                if run:
+                    prediction = next(transforms).apply(next(predictions))
+                    prediction = camera.record_prediction(prediction)
+                    latency = time.monotonic() - captured_at
+                    self.metrics.observe("latency", camera.name, latency)
+                    if self.degradation:
+                        self.degradation.observe(latency)
+                    self.metrics.count("inferences_run", camera.name)
+                else:
+                    prediction = camera.skipped_prediction()
+                    self.metrics.count("inferences_skipped", camera.name)
+                # Never waits, so a slow or stuck writer only loses its own
+                # camera's frames instead of stalling detection for all.
+                try:
+                    camera.processed_frame_queue.put_nowait((frame, prediction))
+                    self.metrics.count("frames_processed", camera.name)
+                except Full:
+                    self.metrics.count("frames_dropped", camera.name)
+            self._adapt()
 
-    def write_video(self):
-        while self.running:
+    def _inference_stride(self) -> int:
+        if self.degradation is None:
+            return self.inference_stride
+        return self.degradation.degrade({"inference_stride": self.inference_stride})[
+            "inference_stride"
+        ]
+
+    def _adapt(self):
+        """Let the degradation controller change level, and apply it.
+
+        Runs on the processing thread between batches, so the detector and
+        image processor never change in the middle of one.
+        """
+        if self.degradation is None or not self.degradation.update(self._queue_fill()):
+            return
+        self.metrics.count("degradation_steps", "")
+        input_size = self.degradation.degrade({"input_size": self.input_size})[
+            "input_size"
+        ]
+        if input_size != self.activity_detector.input_size:
+            self.activity_detector.set_input_size(input_size)
+            self.image_processor.set_input_size(input_size)
+        for camera in self.cameras:
+            self._limit_frame_rate(camera)
+
+    def _limit_frame_rate(self, camera: CameraStream):
+        if self.degradation is None or camera.target_fps is None:
+            return
+        camera.camera_input.set_target_fps(
+            self.degradation.degrade({"target_fps": camera.target_fps})["target_fps"]
+        )
+
+    def _queue_fill(self) -> float:
+        """How full the fullest frame queue is, from 0 to 1.
+
+        Queues holding a single frame are left out, as they are full whenever
+        a frame waits, and so are queues shared with other processes.
+        """
+        return max(
+            (
+                camera.frame_queue.qsize() / camera.frame_queue.maxsize
+                for camera in self.cameras
+                if isinstance(camera.frame_queue, FrameQueue)
+                and camera.frame_queue.maxsize > 1
+            ),
+            default=0.0,
+        )
+
+    def _is_stale(self, camera: CameraStream, captured_at: float) -> bool:
+        """Whether a frame waited too long to be worth running the detector on.
+
+        Stale frames are still recorded, with the camera's skipped-frame
+        prediction, but spending inference on them would only delay the
+        fresher frames behind them.
+        """
+        if self.max_frame_age is None:
+            return False
+        if time.monotonic() - captured_at <= self.max_frame_age:
+            return False
+        self.metrics.count("frames_stale", camera.name)
+        return True
+
+    def _collect_batch(self) -> list[tuple[CameraStream, float, Any]]:
+        """Collect up to batch_size frames across all camera frame queues.
+
+        Blocks until the first frame arrives, then keeps collecting until the
+        batch is full or batch_timeout has passed, whichever comes first.
+        Cameras are visited round-robin so a busy camera cannot starve the
+        others. The batch is empty when woken with no frame waiting, which
+        happens when stopping or after a camera was removed.
+
+        Returns:
+            list[tuple[CameraStream, float, Any]]: The collected
+                (camera, capture time, frame) triples
+        """
+        self.frames_available.acquire()
+        first = self._next_frame()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.batch_timeout
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining > 0:
+                acquired = self.frames_available.acquire(timeout=remaining)
+            else:
+                # Positional, as multiprocessing semaphores name it `block`.
+                acquired = self.frames_available.acquire(False)
+            if not acquired:
+                break
+            next_frame = self._next_frame()
+            if next_frame is None:
+                break
+            batch.append(next_frame)
+        return batch
+
+    def _next_frame(self) -> tuple[CameraStream, float, Any] | None:
+        """Take one frame from the next camera in round-robin order that has
+        one waiting, or None if no camera has. Must only be called after
+        acquiring frames_available."""
+        # The list is replaced, never changed, when cameras are reloaded.
+        cameras = self.cameras
+        for offset in range(len(cameras)):
+            index = (self.next_camera + offset) % len(cameras)
+            camera = cameras[index]
             try:
-                frame, prediction = self.processed_frame_queue.get()
-                self.security_module.process_frame(frame, prediction)
+                captured_at, frame = camera.frame_queue.get_nowait()
             except Empty:
-                pass
+                continue
+            self.next_camera = (index + 1) % len(cameras)
+            return camera, captured_at, frame
+        return None
 
-    def run_activity_detection(self):
-        try:
-            capture_thread = threading.Thread(target=self.capture_frames)
-            process_thread = threading.Thread(target=self.process_frames)
-            write_thread = threading.Thread(target=self.write_video)
+    def write_video(self, camera: CameraStream):
+        """Write the camera's processed frames until it gets _STOP."""
+        while True:
+            item = camera.processed_frame_queue.get()
+            if item is _STOP:
+                return
+            frame, prediction = item
+            with self.metrics.time("write", camera.name):
+                camera.security_module.process_frame(frame, prediction)
+            self.metrics.count("frames_written", camera.name)
+
+    # How often the main thread checks for stop, reload and ended cameras.
+    POLL_INTERVAL = 0.5
 
-            capture_thread.start()
-            process_thread.start()
-            write_thread.start()
+    def run_activity_detection(self, config_path: str | None = None):
+        """Run until interrupted, stopped or every camera has run out of frames.
 
-            capture_thread.join()
-            process_thread.join()
-            write_thread.join()
+        SIGTERM stops like Ctrl+C. With a config path, saving the file or
+        sending SIGHUP reloads it (see reload).
+
+        Args:
+            config_path (str | None): The config file the manager was built
+                from, watched for changes
+        """
+        self.warm_up()
+        startup.mark("warm-up")
+        self.logger.info(startup.report())
+        if config_path:
+            self.config_path = config_path
+            self.config_mtime = os.path.getmtime(config_path)
+        for camera in self.cameras:
+            self._add_camera_gauges(camera)
+        self.metrics.start(self.camera_names)
+        handlers = self._install_signal_handlers()
+        try:
+            self.processing_thread = threading.Thread(
+                target=self.process_frames, name="process", daemon=True
+            )
+            self.processing_thread.start()
+            for camera in self.cameras:
+                self._start_camera(camera)
+            while not self.stop_requested.wait(self.POLL_INTERVAL):
+                if not any(camera.capture_thread.is_alive() for camera in self.cameras):
+                    break
+                if self.reload_requested.is_set() or self._config_changed():
+                    self.reload_requested.clear()
+                    self._reload_config_file()
         except KeyboardInterrupt:
             self.logger.info("Interrupted by user. Stopping the program.")
         finally:
-            self.running = False
-            self.camera_input.stop_capture()
-            self.security_module.video_capture.stop_video_capture()
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+            self.shutdown()
+            self.metrics.stop()
+            for camera in self.cameras:
+                self.log_camera_stats(camera)
+            self.close_event_stores()
+            if stats := self.activity_detector.stats():
+                self.logger.info(
+                    "Detector: "
+                    + ", ".join(f"{name} {value}" for name, value in stats.items())
+                )
             self.logger.info("Activity detection stopped.")
 
-    @classmethod
-    def from_config(cls, config: dict[str, Any]):
-        components = {}
+    def stop(self):
+        """Ask run_activity_detection to shut down. Safe from any thread."""
+        self.stop_requested.set()
+
+    def shutdown(self):
+        """Stop capture, then finish processing and writing the queued frames.
 
-        for component_type, component_config in config.items():
-            if component_type == "security_module":
+        Frames already captured are still detected and recorded, for at most
+        drain_timeout_s in total. Threads still busy after that are left
+        behind, as they are daemon threads, and their frames are lost.
+        """
+        deadline = time.monotonic() + self.drain_timeout
+        for camera in self.cameras:
+            camera.stopped.set()
+        for camera in self.cameras:
+            self._stop_capture(camera, deadline)
+        self.drain_deadline = deadline
+        self.draining = True
+        # Wakes the processing thread once the frame queues are empty.
+        self.frames_available.release()
+        self._join(self.processing_thread, deadline)
+        self.running = False
+        for camera in self.cameras:
+            self._stop_writing(camera, deadline)
+
+    def _start_camera(self, camera: CameraStream):
+        self._limit_frame_rate(camera)
+        camera.capture_thread = threading.Thread(
+            target=self.capture_frames,
+            args=(camera,),
+            name=f"capture-{camera.name}",
+            daemon=True,
+        )
+        camera.write_thread = threading.Thread(
+            target=self.write_video,
+            args=(camera,),
+            name=f"write-{camera.name}",
+            daemon=True,
+        )
+        camera.capture_thread.start()
+        camera.write_thread.start()
+
+    def _stop_capture(self, camera: CameraStream, deadline: float):
+        camera.stopped.set()
+        if camera.capture_thread:
+            # A capture thread waiting on a stalled camera only notices once
+            # the input is stopped.
+            camera.capture_thread.join(
+                timeout=min(self.POLL_INTERVAL, self.drain_timeout)
+            )
+        if isinstance(camera.camera_input, CameraBase):
+            # The reader thread may be blocked on a stalled stream.
+            camera.camera_input.stop_capture(
+                timeout=max(deadline - time.monotonic(), 0)
+            )
+        else:
+            camera.camera_input.stop_capture()
+        self._join(camera.capture_thread, deadline)
+
+    def _stop_writing(self, camera: CameraStream, deadline: float):
+        """Write the camera's remaining processed frames, then close its
+        security module."""
+        try:
+            camera.processed_frame_queue.put(
+                _STOP, timeout=max(deadline - time.monotonic(), 0)
+            )
+        except Full:
+            self.logger.warning(f"{camera.name}: writer is stuck. Not waiting for it.")
+        self._join(camera.write_thread, deadline)
+        camera.security_module.close()
+
+    def _join(self, thread: threading.Thread | None, deadline: float):
+        if thread is None:
+            return
+        thread.join(timeout=max(deadline - time.monotonic(), 0))
+        if thread.is_alive():
+            self.logger.warning(f"{thread.name} did not stop in time. Leaving it.")
+
+    def _add_camera_gauges(self, camera: CameraStream):
+        self.metrics.add_gauge(
+            "frame_queue_depth", camera.name, camera.frame_queue.qsize
+        )
+        self.metrics.add_gauge(
+            "processed_frame_queue_depth",
+            camera.name,
+            camera.processed_frame_queue.qsize,
+        )
+
+    def _install_signal_handlers(self) -> dict[int, Any]:
+        """Stop on SIGTERM and reload on SIGHUP, returning the old handlers."""
+        if threading.current_thread() is not threading.main_thread():
+            return {}
+        handlers = {
+            signal.SIGTERM: signal.signal(
+                signal.SIGTERM, lambda signum, frame: self.stop()
+            )
+        }
+        if hasattr(signal, "SIGHUP"):
+            handlers[signal.SIGHUP] = signal.signal(
+                signal.SIGHUP, lambda signum, frame: self.reload_requested.set()
+            )
+        return handlers
+
+    def _config_changed(self) -> bool:
+        if not self.config_path:
+            return False
+        try:
+            mtime = os.path.getmtime(self.config_path)
+        except OSError:
+            return False
+        if mtime == self.config_mtime:
+            return False
+        self.config_mtime = mtime
+        return True
+
+    def _reload_config_file(self):
+        if not self.config_path:
+            self.logger.warning("Reload requested, but there is no config file.")
+            return
+        try:
+            with open(self.config_path) as file:
+                config = yaml.safe_load(file)
+            self.reload(config)
+        except Exception as e:
+            # A bad edit must not take down a running pipeline.
+            self.logger.error(f"Failed to reload {self.config_path}: {e}")
+
+    # Sections whose changes only apply after a restart, as they hold loaded
+    # models or state shared by every camera.
+    RESTART_SECTIONS = (
+        "image_processor",
+        "event_store",
+        "metrics",
+        "degradation",
+        "process_pipeline",
+    )
+    # Camera settings that are rebuilt when they change.
+    CAMERA_SECTIONS = (
+        "video_capture",
+        "security_logging",
+        "motion_detector",
+        "object_tracker",
+        "frame_queue",
+    )
+    RELOADABLE_SETTINGS = {
+        "activity_manager": (
+            "batch_timeout_ms",
+            "inference_stride",
+            "max_frame_age_ms",
+        ),
+        "security_module": ("stop_threshold",),
+    }
+
+    def reload(self, config: dict[str, Any]):
+        """Apply a changed config to the running pipeline, keeping the model.
+
+        Cameras that were added, removed or changed (including their video
+        capture, security logging, motion detector, object tracker and frame
+        queue) are started, stopped or rebuilt, while the other cameras keep
+        running. The detector's RELOADABLE arguments, the stop threshold, the
+        frame scheduling settings and logging change in place. Any other
+        change is logged and waits for a restart.
+
+        Args:
+            config (dict[str, Any]): The new config
+
+        Raises:
+            ValueError: If the manager was not built from a config
+        """
+        if self.config is None:
+            raise ValueError("Only a manager built with from_config can reload")
+        old = self.config
+        applied = dict(config)
+        for section in self.RESTART_SECTIONS:
+            if old.get(section) != config.get(section):
+                self.logger.warning(f"Changing {section} requires a restart")
+                applied[section] = old.get(section)
+        if old.get("logging") != config.get("logging"):
+            configure_logging(**config.get("logging", {}))
+        for section, reloadable in self.RELOADABLE_SETTINGS.items():
+            applied[section] = self._reload_settings(
+                section, reloadable, old.get(section) or {}, config.get(section) or {}
+            )
+        if not self._reload_detector(
+            old["activity_detector"], config["activity_detector"]
+        ):
+            applied["activity_detector"] = old["activity_detector"]
+        self.config = applied
+        self._reload_cameras(old, applied)
+        self.logger.info("Config reloaded")
+
+    def _reload_settings(
+        self,
+        section: str,
+        reloadable: tuple[str, ...],
+        old: dict[str, Any],
+        new: dict[str, Any],
+    ) -> dict[str, Any]:
+        """Apply a section's reloadable settings, returning what now applies."""
+        applied = dict(new)
+        for key in set(old) | set(new):
+            if key not in reloadable and old.get(key) != new.get(key):
+                self.logger.warning(f"Changing {section}.{key} requires a restart")
+                if key in old:
+                    applied[key] = old[key]
+                else:
+                    del applied[key]
+        settings = {key: applied[key] for key in reloadable if key in applied}
+        if section == "activity_manager":
+            self.update_settings(**settings)
+        elif section == "security_module":
+            stop_threshold = settings.get(
+                "stop_threshold",
+                inspect.signature(SecurityModule).parameters["stop_threshold"].default,
+            )
+            for camera in self.cameras:
+                camera.security_module.stop_threshold = stop_threshold
+        return applied
+
+    def _reload_detector(self, old: dict[str, Any], new: dict[str, Any]) -> bool:
+        """Apply changed detector arguments in place, if they allow it."""
+        if old == new:
+            return True
+        if next(iter(old)) != next(iter(new)):
+            self.logger.warning("Changing the activity detector requires a restart")
+            return False
+        try:
+            old_arguments = self.bound_arguments("activity_detector", old)
+            new_arguments = self.bound_arguments("activity_detector", new)
+        except TypeError as e:
+            self.logger.error(f"Invalid activity detector config: {e}")
+            return False
+        changed = {
+            name: value
+            for name, value in new_arguments.items()
+            if old_arguments.get(name) != value
+        }
+        if not changed:
+            return True
+        try:
+            self.activity_detector.reconfigure(**changed)
+        except ValueError as e:
+            self.logger.warning(f"Not changing the activity detector: {e}")
+            return False
+        self.logger.info(f"Activity detector changed: {changed}")
+        return True
+
+    def _reload_cameras(self, old: dict[str, Any], new: dict[str, Any]):
+        old_cameras = {
+            camera_config["name"]: self._camera_settings(old, camera_config)
+            for camera_config in self.camera_configs(old)
+        }
+        new_configs = {
+            camera_config["name"]: camera_config
+            for camera_config in self.camera_configs(new)
+        }
+        if not new_configs:
+            self.logger.warning("Keeping the cameras, as the config has none")
+            return
+        event_store = next(
+            (
+                camera.security_module.event_store
+                for camera in self.cameras
+                if camera.security_module.event_store
+            ),
+            None,
+        )
+        cameras = []
+        started = []
+        stopped = []
+        for camera in self.cameras:
+            camera_config = new_configs.pop(camera.name, None)
+            if camera_config is None:
+                stopped.append(camera)
+                self.logger.info(f"Removing camera {camera.name}")
+                continue
+            if self._camera_settings(new, camera_config) == old_cameras[camera.name]:
+                cameras.append(camera)
                 continue
+            try:
+                replacement = self.camera_from_config(new, camera_config, event_store)
+            except Exception as e:
+                self.logger.error(
+                    f"Keeping camera {camera.name}, as its new config failed: {e}"
+                )
+                cameras.append(camera)
+                continue
+            self.logger.info(f"Restarting camera {camera.name} with its new config")
+            stopped.append(camera)
+            cameras.append(replacement)
+            started.append(replacement)
+        for camera_config in new_configs.values():
+            try:
+                camera = self.camera_from_config(new, camera_config, event_store)
+            except Exception as e:
+                self.logger.error(f"Not adding camera {camera_config['name']}: {e}")
+                continue
+            self.logger.info(f"Adding camera {camera.name}")
+            cameras.append(camera)
+            started.append(camera)
+
+        # Frames left in a removed camera's queue are dropped, and their
+        # permits wake the processing thread to an empty batch.
+        self.cameras = cameras
+        deadline = time.monotonic() + self.drain_timeout
+        for camera in stopped:
+            self._stop_capture(camera, deadline)
+            self._stop_writing(camera, deadline)
+            self.log_camera_stats(camera)
+        self.camera_names[:] = [camera.name for camera in cameras]
+        for camera in started:
+            self._add_camera_gauges(camera)
+            self._start_camera(camera)
+
+    @classmethod
+    def _camera_settings(
+        cls, config: dict[str, Any], camera_config: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Everything a camera is built from, to tell when it must be rebuilt."""
+        return {
+            "camera": camera_config,
+            "named": "cameras" in config,
+            **{section: config.get(section) for section in cls.CAMERA_SECTIONS},
+        }
+
+    def close_event_stores(self):
+        """Close each event store once, after every camera has ended its
+        events."""
+        stores = {
+            id(camera.security_module.event_store): camera.security_module.event_store
+            for camera in self.cameras
+            if camera.security_module.event_store
+        }
+        for store in stores.values():
+            store.close()
 
-            class_name = next(iter(component_config))
-            args = component_config[class_name].get("args", ())
-            components[component_type] = cls.create_object(
-                component_type, class_name, *args
+    def log_camera_stats(self, camera: CameraStream):
+        if camera.motion_detector:
+            gate = camera.motion_detector
+            total = gate.inferences_run + gate.inferences_skipped
+            self.logger.info(
+                f"{camera.name}: motion gating skipped "
+                f"{gate.inferences_skipped} of {total} inferences"
             )
+        self.logger.info(self.metrics.summary(camera.name))
 
-        security_module = SecurityModule(
-            components["video_capture"], components["security_logging"]
+    @classmethod
+    def from_config(cls, config: dict[str, Any]):
+        """Build an ActivityManager from a parsed config file.
+
+        Cameras are listed under a `cameras` key, each with a unique `name`, a
+        `camera_input` and optionally its own `video_capture`,
+        `motion_detector` and `object_tracker`. A single top-level
+        `camera_input` is still accepted and becomes a camera named "default".
+        The image processor and activity detector are built once and shared by
+        every camera. Settings under `security_module` apply to every camera's
+        SecurityModule.
+        """
+        image_processor = cls.create_from_config(
+            "image_processor", config["image_processor"]
         )
+        activity_detector = cls.create_from_config(
+            "activity_detector", config["activity_detector"]
+        )
+
+        # One store, and so one writer thread, for every camera.
+        event_store = cls.event_store_from_config(config)
+        cameras = [
+            cls.camera_from_config(config, camera_config, event_store)
+            for camera_config in cls.camera_configs(config)
+        ]
 
-        return cls(
-            components["camera_input"],
-            components["image_processor"],
-            components["activity_detector"],
-            security_module,
+        manager = cls(
+            cameras,
+            image_processor,
+            activity_detector,
+            metrics=PipelineMetrics(**config.get("metrics", {})),
+            degradation=cls.degradation_from_config(config),
+            **config.get("activity_manager", {}),
+        )
+        manager.config = config
+        return manager
+
+    @classmethod
+    def camera_from_config(
+        cls,
+        config: dict[str, Any],
+        camera_config: dict[str, Any],
+        event_store: "EventStoreInterface | None" = None,
+    ) -> CameraStream:
+        camera_input = cls.create_from_config(
+            "camera_input", camera_config["camera_input"]
+        )
+        return CameraStream(
+            camera_config["name"],
+            camera_input,
+            cls.security_module_from_config(config, camera_config, event_store),
+            *cls.frame_gating_from_config(config, camera_config),
+            **cls.frame_queue_from_config(config, camera_config),
         )
 
     @staticmethod
-    def create_object(component_type: str, class_name: str, *args, **kwargs):
-        if component_type not in COMPONENT_MAPPING:
-            raise ValueError(f"Invalid component type: {component_type}")
+    def camera_configs(config: dict[str, Any]) -> list[dict[str, Any]]:
+        """The per-camera config entries, including the single-camera layout."""
+        if "cameras" in config:
+            return config["cameras"]
+        return [{"name": "default", "camera_input": config["camera_input"]}]
+
+    @classmethod
+    def event_store_from_config(
+        cls, config: dict[str, Any]
+    ) -> "EventStoreInterface | None":
+        if not config.get("event_store"):
+            return None
+        return cls.create_from_config("event_store", config["event_store"])
+
+    @staticmethod
+    def degradation_from_config(
+        config: dict[str, Any],
+    ) -> DegradationController | None:
+        if not config.get("degradation"):
+            return None
+        return DegradationController(**config["degradation"])
+
+    @classmethod
+    def security_module_from_config(
+        cls,
+        config: dict[str, Any],
+        camera_config: dict[str, Any],
+        event_store: "EventStoreInterface | None" = None,
+    ) -> SecurityModule:
+        security_logging = cls.create_from_config(
+            "security_logging", config["security_logging"]
+        )
+        # Cameras record into the same directory, so their clips are told
+        # apart by camera name.
+        video_capture = cls.create_from_config(
+            "video_capture",
+            camera_config.get("video_capture", config["video_capture"]),
+            **({"camera_name": camera_config["name"]} if "cameras" in config else {}),
+        )
+        return SecurityModule(
+            video_capture,
+            security_logging,
+            event_store=event_store,
+            camera_name=camera_config["name"],
+            **config.get("security_module", {}),
+        )
 
-        if class_name not in COMPONENT_MAPPING[component_type]:
-            raise ValueError(f"Invalid class name for {component_type}: {class_name}")
+    @classmethod
+    def frame_gating_from_config(
+        cls, config: dict[str, Any], camera_config: dict[str, Any]
+    ) -> tuple["MotionDetectionInterface | None", "ObjectTrackingInterface | None"]:
+        """Build the camera's motion detector and object tracker, if any.
 
-        cls = COMPONENT_MAPPING[component_type][class_name]
-        return cls(*args, **kwargs)
+        Both keep per-camera state, so each camera gets its own instances.
+        """
+        components = []
+        for component_type in ("motion_detector", "object_tracker"):
+            component_config = camera_config.get(
+                component_type, config.get(component_type)
+            )
+            components.append(
+                cls.create_from_config(component_type, component_config)
+                if component_config
+                else None
+            )
+        return tuple(components)
+
+    @staticmethod
+    def frame_queue_from_config(
+        config: dict[str, Any], camera_config: dict[str, Any]
+    ) -> dict[str, Any]:
+        """CameraStream queue settings from a camera's or the top-level
+        `frame_queue` section."""
+        settings = camera_config.get("frame_queue", config.get("frame_queue")) or {}
+        return {f"queue_{key}": value for key, value in settings.items()}
+
+    @staticmethod
+    def bound_arguments(
+        component_type: str, component_config: dict[str, Any]
+    ) -> dict[str, Any]:
+        """A component's constructor arguments by name, including defaults.
+
+        Raises:
+            TypeError: If the arguments do not fit the constructor
+        """
+        class_name = next(iter(component_config))
+        settings = component_config[class_name] or {}
+        bound = inspect.signature(resolve(component_type, class_name)).bind(
+            *settings.get("args", ()), **settings.get("kwargs", {})
+        )
+        bound.apply_defaults()
+        return dict(bound.arguments)
+
+    @classmethod
+    def create_from_config(
+        cls, component_type: str, component_config: dict[str, Any], **kwargs
+    ):
+        class_name = next(iter(component_config))
+        settings = component_config[class_name] or {}
+        args = settings.get("args", ())
+        kwargs = {**settings.get("kwargs", {}), **kwargs}
+        return cls.create_object(component_type, class_name, *args, **kwargs)
+
+    @staticmethod
+    def create_object(component_type: str, class_name: str, *args, **kwargs):
+        cls = resolve(component_type, class_name)
+        with startup.step(f"create {class_name}"):
+            return cls(*args, **kwargs)
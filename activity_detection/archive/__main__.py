@@ -0,0 +1,47 @@
+import argparse
+import json
+import os
+from dataclasses import asdict
+from pathlib import Path
+
+import yaml
+
+from activity_detection.archive.scan import scan_archive
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Scan stored footage for people and print an event timeline."
+    )
+    parser.add_argument("path", help="A video file or a directory of video files")
+    parser.add_argument(
+        "--config",
+        default=str(Path(__file__).parent.parent.parent / "config.yaml"),
+        help="Pipeline config file",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="Worker processes"
+    )
+    parser.add_argument(
+        "--chunk-seconds", type=float, default=300, help="Approximate chunk length"
+    )
+    parser.add_argument("--output", help="Write the events to this JSON file")
+    args = parser.parse_args()
+
+    with open(args.config, "r") as file:
+        config = yaml.safe_load(file)
+    events = scan_archive(config, args.path, args.workers, args.chunk_seconds)
+
+    for event in events:
+        print(
+            f"{event.path}: {event.start_s:.1f}s - {event.end_s:.1f}s "
+            f"({event.detected_frames} frames, max confidence "
+            f"{event.max_confidence:.2f})"
+        )
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump([asdict(event) for event in events], file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import shutil
+import subprocess
+from dataclasses import dataclass
+
+import cv2
+
+from activity_detection.logging_config import setup_logger
+
+logger = setup_logger("archive")
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """A range of frames [start_frame, end_frame) of one video file. An end
+    frame of None reads to the end of the file."""
+
+    path: str
+    start_frame: int
+    end_frame: int | None
+    fps: float
+
+
+def video_info(path: str) -> tuple[int, float]:
+    """The frame count and frame rate of a video file."""
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise IOError(f"Cannot open video: {path}")
+    try:
+        frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    finally:
+        capture.release()
+    return frame_count, fps
+
+
+def keyframe_indices(path: str, fps: float) -> list[int] | None:
+    """Frame indices of a video's keyframes, read with ffprobe if installed.
+
+    Reading packet flags does not decode the video, so this is quick even
+    for long files. Returns None when ffprobe is not available or fails.
+    """
+    ffprobe = shutil.which("ffprobe")
+    if ffprobe is None:
+        return None
+    result = subprocess.run(
+        [
+            ffprobe,
+            "-v",
+            "error",
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "packet=pts_time,flags",
+            "-of",
+            "csv=p=0",
+            path,
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        logger.warning(f"ffprobe failed on {path}: {result.stderr.strip()}")
+        return None
+    keyframes = []
+    for line in result.stdout.splitlines():
+        pts_time, _, flags = line.partition(",")
+        if "K" in flags and pts_time not in ("", "N/A"):
+            keyframes.append(round(float(pts_time) * fps))
+    return sorted(keyframes)
+
+
+def split_frames(
+    frame_count: int, chunk_frames: int, keyframes: list[int] | None = None
+) -> list[tuple[int, int]]:
+    """Split frames [0, frame_count) into ranges of about chunk_frames.
+
+    With keyframes, each boundary is moved forward to the next keyframe, so
+    every chunk starts where decoding can begin without reading frames from
+    the previous chunk.
+
+    Returns:
+        list[tuple[int, int]]: (start_frame, end_frame) of each chunk
+    """
+    if chunk_frames < 1:
+        raise ValueError("Chunks must be at least one frame long")
+    starts = [0]
+    target = chunk_frames
+    while target < frame_count:
+        start = target
+        if keyframes is not None:
+            start = next((k for k in keyframes if k >= target), frame_count)
+        if start >= frame_count:
+            break
+        starts.append(start)
+        target = start + chunk_frames
+    return list(zip(starts, starts[1:] + [frame_count]))
+
+
+def plan_chunks(path: str, chunk_seconds: float) -> list[Chunk]:
+    """Split a video file into keyframe-aligned chunks of about chunk_seconds.
+
+    Without ffprobe the chunks are split at exact frame counts instead, which
+    costs each chunk some extra decoding when it seeks to its first frame.
+    """
+    frame_count, fps = video_info(path)
+    if frame_count <= 0:
+        logger.warning(f"Unknown length for {path}. Scanning it as one chunk.")
+        return [Chunk(path, 0, None, fps)]
+    keyframes = keyframe_indices(path, fps)
+    return [
+        Chunk(path, start, end, fps)
+        for start, end in split_frames(
+            frame_count, max(1, round(chunk_seconds * fps)), keyframes
+        )
+    ]
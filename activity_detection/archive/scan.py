@@ -0,0 +1,246 @@
+import multiprocessing
+import os
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from activity_detection.activity_manager import ActivityManager, CameraStream
+from activity_detection.archive.chunks import Chunk, logger, plan_chunks
+from activity_detection.classifiers.types import Prediction
+from activity_detection.inputs.camera_input import (
+    EndOfStream,
+    VideoFileInput,
+    video_files,
+)
+
+
+@dataclass
+class Event:
+    """A stretch of footage with people in it, in seconds from the file start."""
+
+    path: str
+    start_s: float
+    end_s: float
+    detected_frames: int
+    max_confidence: float
+
+
+class EventBuilder:
+    def __init__(self, path: str, fps: float, stop_threshold: int):
+        """Turns per-frame predictions into events.
+
+        Like SecurityModule, an event starts at the first frame with a
+        detection and ends after stop_threshold frames in a row without one.
+
+        Args:
+            path (str): The file the frames come from
+            fps (float): The file's frame rate
+            stop_threshold (int): Frames without detection that end an event
+        """
+        self.path = path
+        self.fps = fps
+        self.stop_threshold = stop_threshold
+        self.events: list[Event] = []
+        self.current: Event | None = None
+        self.last_detected = 0
+
+    def add(self, frame_index: int, prediction: Prediction):
+        if prediction.detected:
+            if len(prediction.detections):
+                confidence = float(prediction.detections.confidence.max())
+            else:
+                # Image-level detectors score the frame rather than boxes.
+                confidence = prediction.confidence or 0.0
+            if self.current is None:
+                self.current = Event(
+                    self.path, frame_index / self.fps, 0.0, 0, confidence
+                )
+            self.current.detected_frames += 1
+            self.current.max_confidence = max(self.current.max_confidence, confidence)
+            self.last_detected = frame_index
+        elif (
+            self.current is not None
+            and frame_index - self.last_detected >= self.stop_threshold
+        ):
+            self.finish()
+
+    def finish(self) -> list[Event]:
+        if self.current is not None:
+            self.current.end_s = (self.last_detected + 1) / self.fps
+            self.events.append(self.current)
+            self.current = None
+        return self.events
+
+
+# Components built once per worker process by _init_worker.
+_worker: dict[str, Any] = {}
+
+
+def _init_worker(config: dict[str, Any], torch_threads: int | None = None):
+    if torch_threads:
+        # Imported here so detectors that don't need torch never load it.
+        import torch
+
+        # Several workers share the CPU, so don't let each one use every core.
+        torch.set_num_threads(torch_threads)
+    settings = config.get("activity_manager", {})
+    image_processor = ActivityManager.create_from_config(
+        "image_processor", config["image_processor"]
+    )
+    activity_detector = ActivityManager.create_from_config(
+        "activity_detector", config["activity_detector"]
+    )
+    image_processor.configure(
+        activity_detector.input_size, settings.get("batch_size", 1)
+    )
+    _worker.update(
+        config=config,
+        image_processor=image_processor,
+        activity_detector=activity_detector,
+    )
+
+
+def scan_chunk(chunk: Chunk) -> list[Event]:
+    """Run the detector over one chunk, as fast as frames can be decoded.
+
+    Frames are batched, strided and motion gated as in the live pipeline.
+    Must be called in a process set up by _init_worker.
+    """
+    config = _worker["config"]
+    image_processor = _worker["image_processor"]
+    activity_detector = _worker["activity_detector"]
+    settings = config.get("activity_manager", {})
+    batch_size = settings.get("batch_size", 1)
+    inference_stride = settings.get("inference_stride", 1)
+
+    camera_input = VideoFileInput(
+        chunk.path, start_frame=chunk.start_frame, end_frame=chunk.end_frame
+    )
+    camera = CameraStream(
+        chunk.path,
+        camera_input,
+        None,
+        *ActivityManager.frame_gating_from_config(config, {}),
+    )
+    events = EventBuilder(
+        chunk.path,
+        chunk.fps,
+        config.get("security_module", {}).get("stop_threshold", 75),
+    )
+
+    camera_input.start_capture()
+    try:
+        finished = False
+        while not finished:
+            batch = []
+            while len(batch) < batch_size:
+                try:
+                    frame = camera_input.get_frame()
+                except EndOfStream:
+                    finished = True
+                    break
+                batch.append((camera_input.frame_index - 1, frame))
+
+            run_detector = [
+                camera.should_run_detector(frame, inference_stride)
+                for _, frame in batch
+            ]
+            frames = [frame for (_, frame), run in zip(batch, run_detector) if run]
+            images = [image_processor.process_frame(frame) for frame in frames]
+            transforms = iter(
+                [image_processor.get_transform(frame) for frame in frames]
+            )
+            predictions = iter(activity_detector.detect_batch(images) if images else [])
+            for (frame_index, _), run in zip(batch, run_detector):
+                if run:
+                    prediction = next(transforms).apply(next(predictions))
+                    prediction = camera.record_prediction(prediction)
+                else:
+                    prediction = camera.skipped_prediction()
+                events.add(frame_index, prediction)
+    finally:
+        camera_input.stop_capture()
+
+    logger.info(
+        f"Scanned {os.path.basename(chunk.path)} frames {chunk.start_frame}-"
+        f"{camera_input.frame_index}: {len(events.events)} events"
+    )
+    return events.finish()
+
+
+def merge_events(events: list[Event], max_gap_s: float) -> list[Event]:
+    """Merge per-chunk events into one timeline.
+
+    An event cut in two by a chunk boundary shows up as two events in the
+    same file with a gap shorter than the stop threshold, and is joined.
+
+    Args:
+        events (list[Event]): Events from every chunk, in any order
+        max_gap_s (float): Events closer than this in one file are merged
+
+    Returns:
+        list[Event]: The events sorted by file and start time
+    """
+    merged: list[Event] = []
+    for event in sorted(events, key=lambda event: (event.path, event.start_s)):
+        previous = merged[-1] if merged else None
+        if (
+            previous is not None
+            and previous.path == event.path
+            and event.start_s - previous.end_s < max_gap_s
+        ):
+            previous.end_s = max(previous.end_s, event.end_s)
+            previous.detected_frames += event.detected_frames
+            previous.max_confidence = max(previous.max_confidence, event.max_confidence)
+        else:
+            merged.append(Event(**asdict(event)))
+    return merged
+
+
+def scan_archive(
+    config: dict[str, Any],
+    path: str,
+    workers: int = 1,
+    chunk_seconds: float = 300,
+) -> list[Event]:
+    """Scan stored footage for people, splitting it across worker processes.
+
+    Every file is split into keyframe-aligned chunks of about chunk_seconds,
+    skipping files that cannot be opened.
+    The chunks are scanned in parallel by workers processes, each with its
+    own copy of the detector, and their events are merged into one timeline.
+
+    Args:
+        config (dict[str, Any]): The pipeline config, as for ActivityManager
+        path (str): A video file, or a directory of video files
+        workers (int): Number of worker processes. 1 scans in this process.
+        chunk_seconds (float): Approximate length of a chunk
+
+    Returns:
+        list[Event]: Every event found, sorted by file and start time
+    """
+    if workers < 1:
+        raise ValueError("Workers must be at least 1")
+    chunks = []
+    for file in video_files(path):
+        try:
+            chunks.extend(plan_chunks(file, chunk_seconds))
+        except IOError as e:
+            logger.error(f"{e}. Skipping it.")
+    logger.info(f"Scanning {len(chunks)} chunks with {workers} workers")
+
+    if workers == 1:
+        _init_worker(config)
+        results = [scan_chunk(chunk) for chunk in chunks]
+    else:
+        torch_threads = max(1, (os.cpu_count() or 1) // workers)
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(
+            workers, initializer=_init_worker, initargs=(config, torch_threads)
+        ) as pool:
+            results = pool.map(scan_chunk, chunks, chunksize=1)
+
+    stop_threshold = config.get("security_module", {}).get("stop_threshold", 75)
+    fps = max((chunk.fps for chunk in chunks), default=30.0)
+    return merge_events(
+        [event for events in results for event in events], stop_threshold / fps
+    )
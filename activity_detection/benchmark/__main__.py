@@ -0,0 +1,68 @@
+import argparse
+import json
+
+import yaml
+
+from activity_detection.benchmark.harness import run_suite
+
+COLUMNS = (
+    "name",
+    "fps",
+    "latency_p50_ms",
+    "latency_p99_ms",
+    "peak_rss_mb",
+    "frames_dropped",
+    "frames_stale",
+    "inferences_skipped",
+)
+
+
+def format_table(results: list[dict], baseline: dict[str, dict]) -> str:
+    rows = [COLUMNS]
+    for result in results:
+        if "error" in result:
+            rows.append((result["name"], f"error: {result['error']}"))
+            continue
+        row = [str(result.get(column)) for column in COLUMNS]
+        previous = baseline.get(result["name"])
+        if previous and previous.get("fps"):
+            change = (result["fps"] - previous["fps"]) / previous["fps"]
+            row[1] += f" ({change:+.0%})"
+        rows.append(tuple(row))
+    widths = [
+        max(len(row[i]) for row in rows if i < len(row)) for i in range(len(COLUMNS))
+    ]
+    return "\n".join(
+        "  ".join(value.ljust(width) for value, width in zip(row, widths))
+        for row in rows
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the activity detection pipeline on replayed video."
+    )
+    parser.add_argument("suite", help="Benchmark suite YAML file")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument(
+        "--compare", help="Results JSON from an earlier run to compare FPS against"
+    )
+    args = parser.parse_args()
+
+    with open(args.suite, "r") as file:
+        suite = yaml.safe_load(file)
+    run = run_suite(suite)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, "r") as file:
+            baseline = {result["name"]: result for result in json.load(file)["results"]}
+    print(format_table(run["results"], baseline))
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(run, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+import datetime
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import threading
+import time
+from queue import Empty
+from typing import Any
+
+import numpy as np
+
+from activity_detection.activity_manager import ActivityManager, CameraStream
+from activity_detection.benchmark.replay import ReplayInput, load_clip, synthetic_clip
+from activity_detection.benchmark.stub_detector import StubActivityDetector
+from activity_detection.logging_config import setup_logger
+from activity_detection.metrics import PipelineMetrics
+
+logger = setup_logger("benchmark")
+
+
+class RecordingMetrics(PipelineMetrics):
+    """PipelineMetrics that also keeps every latency sample, so percentiles
+    are exact rather than bucket bounds."""
+
+    def __init__(self):
+        super().__init__(summary_interval_s=None)
+        self.latencies: list[float] = []
+
+    def observe(self, stage: str, camera: str, seconds: float):
+        super().observe(stage, camera, seconds)
+        if stage == "latency":
+            self.latencies.append(seconds)
+
+
+def build_cases(suite: dict[str, Any]) -> list[dict[str, Any]]:
+    """Expand a benchmark suite into one settings dict per case.
+
+    Each case overrides the suite's `defaults`. Top-level settings and
+    sections of the pipeline `config` are replaced, not merged, so a case
+    can swap one component for another.
+    """
+    defaults = suite.get("defaults", {})
+    cases = []
+    for case in suite.get("cases", [{"name": "default"}]):
+        settings = {**defaults, **case}
+        settings["config"] = {**defaults.get("config", {}), **case.get("config", {})}
+        cases.append(settings)
+    return cases
+
+
+def create_detector(config: dict[str, Any]):
+    detector_config = config["activity_detector"]
+    if next(iter(detector_config)) == "StubActivityDetector":
+        settings = detector_config["StubActivityDetector"] or {}
+        return StubActivityDetector(
+            *settings.get("args", ()), **settings.get("kwargs", {})
+        )
+    return ActivityManager.create_from_config("activity_detector", detector_config)
+
+
+def load_frames(source: dict[str, Any]) -> list[np.ndarray]:
+    if "video" in source:
+        return load_clip(source["video"], source.get("max_frames"))
+    return synthetic_clip(**source.get("synthetic", {}))
+
+
+def run_case(settings: dict[str, Any]) -> dict[str, Any]:
+    """Run the threaded ActivityManager pipeline over a replayed clip.
+
+    Every camera replays `frames` frames of the clip. The run ends once every
+    frame has been written or dropped, or after `timeout_s`.
+
+    Args:
+        settings (dict[str, Any]): One case from build_cases
+
+    Returns:
+        dict[str, Any]: Throughput, latency, memory and drop counts
+    """
+    config = {
+        **settings["config"],
+        "cameras": [
+            {"name": f"camera{index}"} for index in range(settings.get("cameras", 1))
+        ],
+    }
+    num_frames = settings.get("frames", 300)
+    clip = load_frames(settings.get("source", {}))
+    metrics = RecordingMetrics()
+
+    cameras = []
+    for camera_config in config["cameras"]:
+        cameras.append(
+            CameraStream(
+                camera_config["name"],
+                ReplayInput(clip, num_frames, settings.get("fps")),
+                ActivityManager.security_module_from_config(config, camera_config),
+                *ActivityManager.frame_gating_from_config(config, camera_config),
+                **ActivityManager.frame_queue_from_config(config, camera_config),
+            )
+        )
+    manager = ActivityManager(
+        cameras,
+        ActivityManager.create_from_config(
+            "image_processor", config["image_processor"]
+        ),
+        create_detector(config),
+        metrics=metrics,
+        **config.get("activity_manager", {}),
+    )
+
+    threads = [threading.Thread(target=manager.process_frames, daemon=True)]
+    for camera in cameras:
+        for target in (manager.capture_frames, manager.write_video):
+            threads.append(threading.Thread(target=target, args=(camera,), daemon=True))
+
+    # Keep one-off model initialisation out of the measured run.
+    manager.warm_up()
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    finished = _wait_until_drained(manager, settings.get("timeout_s", 300))
+    elapsed = time.monotonic() - started
+
+    counters = dict(metrics.counters)
+    latencies = np.array(metrics.latencies) * 1000
+
+    def total(name: str) -> int:
+        return sum(counters.get((name, camera.name), 0) for camera in cameras)
+
+    # The pipeline threads stay blocked waiting for frames. The case runs in
+    # its own process, so they end with it.
+    manager.running = False
+    for camera in cameras:
+        camera.camera_input.stop_capture()
+        camera.security_module.close()
+    manager.close_event_stores()
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "name": settings.get("name", "default"),
+        "completed": finished,
+        "cameras": len(cameras),
+        "elapsed_s": round(elapsed, 3),
+        "warmup_s": round(metrics.histograms["warmup", ""].sum, 3),
+        "fps": round(total("frames_written") / elapsed, 2),
+        "latency_p50_ms": round(float(np.percentile(latencies, 50)), 2)
+        if len(latencies)
+        else None,
+        "latency_p99_ms": round(float(np.percentile(latencies, 99)), 2)
+        if len(latencies)
+        else None,
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere.
+        "peak_rss_mb": round(
+            peak_rss / (2**20 if sys.platform == "darwin" else 2**10), 1
+        ),
+        "frames_captured": total("frames_captured"),
+        "frames_written": total("frames_written"),
+        "frames_dropped": total("frames_dropped"),
+        "frames_stale": total("frames_stale"),
+        "inferences_run": total("inferences_run"),
+        "inferences_skipped": total("inferences_skipped"),
+    }
+
+
+def _wait_until_drained(manager: ActivityManager, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if all(_drained(manager, camera) for camera in manager.cameras):
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def _drained(manager: ActivityManager, camera: CameraStream) -> bool:
+    counters = manager.metrics.counters
+    handled = (
+        counters["frames_written", camera.name]
+        + counters["frames_dropped", camera.name]
+    )
+    return (
+        camera.camera_input.finished.is_set()
+        and handled >= counters["frames_captured", camera.name]
+    )
+
+
+def _run_case_process(settings: dict[str, Any], results):
+    try:
+        results.put(run_case(settings))
+    except Exception as e:
+        results.put({"name": settings.get("name", "default"), "error": repr(e)})
+
+
+def run_suite(suite: dict[str, Any]) -> dict[str, Any]:
+    """Run every case of a benchmark suite, each in a fresh process.
+
+    A fresh process per case keeps peak memory and warmed-up caches from one
+    case out of the next.
+
+    Returns:
+        dict[str, Any]: Run metadata and one result per case
+    """
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for settings in build_cases(suite):
+        logger.info(f"Running {settings.get('name', 'default')}")
+        queue = context.Queue()
+        process = context.Process(target=_run_case_process, args=(settings, queue))
+        process.start()
+        result = None
+        while result is None:
+            try:
+                result = queue.get(timeout=1)
+            except Empty:
+                if not process.is_alive():
+                    result = {
+                        "name": settings.get("name", "default"),
+                        "error": f"Exited with code {process.exitcode}",
+                    }
+        process.join()
+        results.append(result)
+        logger.info(f"Finished {result['name']}: {result}")
+    return {"metadata": run_metadata(), "results": results}
+
+
+def run_metadata() -> dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
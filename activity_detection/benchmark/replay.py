@@ -0,0 +1,91 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from activity_detection.inputs.camera_input import CameraInputInterface
+
+
+class ReplayInput(CameraInputInterface):
+    def __init__(
+        self, frames: list[np.ndarray], num_frames: int, fps: float | None = None
+    ):
+        """Camera input that replays a clip held in memory.
+
+        The clip is looped until num_frames frames have been returned, after
+        which get_frame blocks until stop_capture is called. Unlike the real
+        cameras it is not throttled unless fps is given, so the pipeline runs
+        as fast as it can.
+
+        Args:
+            frames (list[np.ndarray]): The clip to replay
+            num_frames (int): Total number of frames to return
+            fps (float | None): Replay in real time at this frame rate
+        """
+        if not frames:
+            raise ValueError("A replay needs at least one frame")
+        self.frames = frames
+        self.num_frames = num_frames
+        self.fps = fps
+        self.position = 0
+        self.started = None
+        self.finished = threading.Event()
+        self.stopped = threading.Event()
+
+    def start_capture(self):
+        self.started = time.monotonic()
+
+    def stop_capture(self):
+        self.stopped.set()
+
+    def get_frame(self) -> np.ndarray:
+        if self.position >= self.num_frames:
+            self.finished.set()
+            self.stopped.wait()
+            return self.frames[-1].copy()
+        if self.fps:
+            delay = self.started + self.position / self.fps - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        # Cameras return a new array for every frame, and the pipeline draws
+        # on the frames it is given.
+        frame = self.frames[self.position % len(self.frames)].copy()
+        self.position += 1
+        return frame
+
+
+def synthetic_clip(
+    width: int = 1280, height: int = 720, length: int = 60, seed: int = 0
+) -> list[np.ndarray]:
+    """A noisy static scene with a bright box moving across it."""
+    rng = np.random.default_rng(seed)
+    background = rng.integers(0, 64, (height, width, 3), dtype=np.uint8)
+    box_width, box_height = max(1, width // 10), max(1, height // 3)
+    frames = []
+    for i in range(length):
+        frame = background.copy()
+        x = (width - box_width) * i // max(1, length - 1)
+        y = (height - box_height) // 2
+        frame[y : y + box_height, x : x + box_width] = 200
+        frames.append(frame)
+    return frames
+
+
+def load_clip(path: str, max_frames: int | None = None) -> list[np.ndarray]:
+    """Decode a recorded video into memory so decoding is not benchmarked."""
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise IOError(f"Cannot open video: {path}")
+    frames = []
+    try:
+        while max_frames is None or len(frames) < max_frames:
+            ret, frame = capture.read()
+            if not ret:
+                break
+            frames.append(frame)
+    finally:
+        capture.release()
+    if not frames:
+        raise IOError(f"No frames in video: {path}")
+    return frames
@@ -0,0 +1,47 @@
+import time
+
+import numpy as np
+
+from activity_detection.classifiers.interfaces import ActivityDetectionInterface
+from activity_detection.classifiers.types import Detections, Prediction
+
+
+class StubActivityDetector(ActivityDetectionInterface):
+    def __init__(
+        self,
+        latency_ms: float = 10,
+        per_image_ms: float = 0,
+        detect: bool = False,
+        input_size: int | None = 640,
+    ):
+        """Detector that sleeps instead of running a model.
+
+        A batch takes latency_ms plus per_image_ms for every image in it, so
+        the rest of the pipeline can be benchmarked without model weights.
+
+        Args:
+            latency_ms (float): Fixed cost of one detector call
+            per_image_ms (float): Extra cost of every image in a call
+            detect (bool): Report one box per image, so recordings are written
+            input_size (int | None): Input size reported to the image processor
+        """
+        super().__init__()
+        self.latency = latency_ms / 1000
+        self.per_image = per_image_ms / 1000
+        self.detect = detect
+        self.input_size = input_size
+
+    def set_input_size(self, input_size: int):
+        if self.input_size is None:
+            super().set_input_size(input_size)
+        self.input_size = input_size
+
+    def detect_activity(self, image) -> Prediction:
+        return self.detect_batch([image])[0]
+
+    def detect_batch(self, images: list) -> list[Prediction]:
+        time.sleep(self.latency + self.per_image * len(images))
+        if not self.detect:
+            return [Prediction(detected=False) for _ in images]
+        box = Detections(xyxy=np.array([[10, 10, 50, 100]], dtype=np.float32))
+        return [Prediction(detected=True, detections=box) for _ in images]
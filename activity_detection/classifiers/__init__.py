@@ -1,9 +1,26 @@
-from .moondream_classifier import MoondreamActivityDetector
-from .yolo_classifiers import YOLOActivityDetector, YOLOWorldActivityDetector
+import importlib
+
+# Detectors are imported on first access, as each pulls in its own heavy
+# dependencies (torch, ultralytics or transformers).
+_MODULES = {
+    "CascadeActivityDetector": ".cascade",
+    "MoondreamActivityDetector": ".moondream_classifier",
+    "RemoteActivityDetector": ".remote",
+    "YOLOActivityDetector": ".yolo_classifiers",
+    "YOLOWorldActivityDetector": ".yolo_classifiers",
+}
+
+
+def __getattr__(name: str):
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_MODULES[name], __name__), name)
 
 
 __all__ = [
+    "CascadeActivityDetector",
     "MoondreamActivityDetector",
+    "RemoteActivityDetector",
     "YOLOActivityDetector",
     "YOLOWorldActivityDetector",
 ]
@@ -0,0 +1,224 @@
+from collections import Counter
+from dataclasses import replace
+from typing import Any
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from activity_detection.classifiers.interfaces import (
+    ActivityDetectionInterface,
+)
+from activity_detection.classifiers.types import Detections, Prediction
+
+
+class CascadeActivityDetector(ActivityDetectionInterface):
+    RELOADABLE = ("uncertain_min", "uncertain_max", "crop", "crop_padding")
+
+    def __init__(
+        self,
+        fast: ActivityDetectionInterface | dict[str, Any],
+        heavy: ActivityDetectionInterface | dict[str, Any],
+        uncertain_min: float = 0.25,
+        uncertain_max: float = 0.6,
+        crop: bool = True,
+        crop_padding: float = 0.2,
+    ):
+        """Run a fast detector on every image and a heavy one only when unsure.
+
+        The fast detector's confidence in an image is its Prediction
+        confidence if it gives one, or else its most confident box. At or
+        above uncertain_max the fast result is accepted and below
+        uncertain_min the image counts as empty. In between, the image is
+        escalated: the heavy detector looks at the region around the
+        uncertain boxes (or the whole image, without crop or boxes) and its
+        answer replaces the fast one. Escalations from a whole batch go
+        through the heavy detector together.
+
+        The fast detector must report boxes down to uncertain_min, so its own
+        confidence threshold should be no higher than that.
+
+        Args:
+            fast (ActivityDetectionInterface | dict[str, Any]): The fast
+                detector, or its activity_detector config
+            heavy (ActivityDetectionInterface | dict[str, Any]): The heavy
+                detector, or its activity_detector config
+            uncertain_min (float): Lowest fast confidence that is escalated
+            uncertain_max (float): Fast confidence that is trusted outright
+            crop (bool): Show the heavy detector only the uncertain region
+            crop_padding (float): Context added around the region, as a
+                fraction of its width and height
+        """
+        super().__init__()
+        self._check_settings(uncertain_min, uncertain_max, crop_padding)
+        self.fast = self._detector(fast)
+        self.heavy = self._detector(heavy)
+        self.uncertain_min = uncertain_min
+        self.uncertain_max = uncertain_max
+        self.crop = crop
+        self.crop_padding = crop_padding
+        # Images are preprocessed for the fast detector, which sees them all.
+        self.input_size = self.fast.input_size
+        self.counts: Counter[str] = Counter()
+
+        threshold = getattr(self.fast, "confidence_threshold", None)
+        if threshold is not None and threshold > uncertain_min:
+            self.logger.warning(
+                f"The fast detector drops boxes below {threshold}, so nothing "
+                f"between {uncertain_min} and {threshold} will be escalated."
+            )
+
+    @staticmethod
+    def _check_settings(
+        uncertain_min: float, uncertain_max: float, crop_padding: float
+    ):
+        if not 0 <= uncertain_min <= uncertain_max <= 1:
+            raise ValueError(
+                "Uncertain band must satisfy 0 <= uncertain_min <= uncertain_max <= 1"
+            )
+        if crop_padding < 0:
+            raise ValueError("Crop padding must not be negative")
+
+    def reconfigure(self, **settings):
+        self._check_settings(
+            settings.get("uncertain_min", self.uncertain_min),
+            settings.get("uncertain_max", self.uncertain_max),
+            settings.get("crop_padding", self.crop_padding),
+        )
+        super().reconfigure(**settings)
+
+    def set_input_size(self, input_size: int):
+        # Only the fast detector sees the processed frames.
+        self.fast.set_input_size(input_size)
+        self.input_size = input_size
+
+    @staticmethod
+    def _detector(
+        detector: ActivityDetectionInterface | dict[str, Any],
+    ) -> ActivityDetectionInterface:
+        if isinstance(detector, ActivityDetectionInterface):
+            return detector
+        # Imported here, as the manager imports this package.
+        from activity_detection.activity_manager import ActivityManager
+
+        return ActivityManager.create_from_config("activity_detector", detector)
+
+    def detect_activity(self, image: Image) -> Prediction:
+        return self.detect_batch([image])[0]
+
+    def detect_batch(self, images: list[Image]) -> list[Prediction]:
+        """Detect with the fast detector and escalate the uncertain images.
+
+        Args:
+            images (list[Image]): The input images to analyze
+
+        Returns:
+            list[Prediction]: One prediction per image, in the same order
+        """
+        predictions = self.fast.detect_batch(images)
+        self.counts["fast"] += len(images)
+
+        escalated = []
+        for index, (image, prediction) in enumerate(zip(images, predictions)):
+            confidence = self._confidence(prediction)
+            if confidence >= self.uncertain_max:
+                self.counts["accepted"] += 1
+            elif confidence < self.uncertain_min:
+                self.counts["rejected"] += 1
+                predictions[index] = Prediction(detected=False, confidence=confidence)
+            else:
+                escalated.append((index, *self._region(image, prediction)))
+        if not escalated:
+            return predictions
+
+        self.counts["escalated"] += len(escalated)
+        heavy_predictions = self.heavy.detect_batch(
+            [region for _, region, _, _ in escalated]
+        )
+        for (index, _, origin, uncertain), heavy in zip(escalated, heavy_predictions):
+            if heavy.detected:
+                self.counts["confirmed"] += 1
+            predictions[index] = self._combine(heavy, origin, uncertain)
+        return predictions
+
+    def stats(self) -> dict[str, int]:
+        """Images seen by the fast detector, and how many of them it
+        accepted, rejected or escalated and the heavy detector confirmed."""
+        return {
+            key: self.counts[key]
+            for key in ("fast", "accepted", "rejected", "escalated", "confirmed")
+        }
+
+    @staticmethod
+    def _confidence(prediction: Prediction) -> float:
+        if prediction.confidence is not None:
+            return prediction.confidence
+        if len(prediction.detections) == 0:
+            return 0.0
+        return float(prediction.detections.confidence.max())
+
+    def _region(
+        self, image, prediction: Prediction
+    ) -> tuple[Any, tuple[float, float], Detections]:
+        """The part of the image to escalate, its top-left corner and the
+        uncertain boxes it covers."""
+        detections = prediction.detections
+        uncertain = detections[
+            (detections.confidence >= self.uncertain_min)
+            & (detections.confidence < self.uncertain_max)
+        ]
+        if not self.crop or len(uncertain) == 0:
+            return self._to_pil(image), (0.0, 0.0), uncertain
+
+        if isinstance(image, np.ndarray):
+            height, width = image.shape[:2]
+        else:
+            width, height = image.size
+        x1, y1 = uncertain.xyxy[:, :2].min(axis=0)
+        x2, y2 = uncertain.xyxy[:, 2:].max(axis=0)
+        pad_x = (x2 - x1) * self.crop_padding
+        pad_y = (y2 - y1) * self.crop_padding
+        left = int(max(0, x1 - pad_x))
+        top = int(max(0, y1 - pad_y))
+        right = int(min(width, np.ceil(x2 + pad_x)))
+        bottom = int(min(height, np.ceil(y2 + pad_y)))
+        right, bottom = max(right, left + 1), max(bottom, top + 1)
+
+        if isinstance(image, np.ndarray):
+            region = self._to_pil(image[top:bottom, left:right])
+        else:
+            region = image.crop((left, top, right, bottom))
+        return region, (float(left), float(top)), uncertain
+
+    @staticmethod
+    def _to_pil(image):
+        """The image as the heavy detector gets it.
+
+        Arrays are BGR (see LetterboxImageProcessor) and may be reused
+        buffers, so the heavy detector gets an RGB PIL copy, which every
+        detector accepts.
+        """
+        if isinstance(image, np.ndarray):
+            return Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        return image
+
+    @staticmethod
+    def _combine(
+        heavy: Prediction, origin: tuple[float, float], uncertain: Detections
+    ) -> Prediction:
+        """The heavy detector's verdict, with boxes in the full image.
+
+        Heavy detectors that only answer yes or no keep the fast detector's
+        uncertain boxes when they confirm.
+        """
+        if not heavy.detected:
+            return Prediction(detected=False, confidence=heavy.confidence)
+        if len(heavy.detections) == 0:
+            return Prediction(
+                detected=True, detections=uncertain, confidence=heavy.confidence
+            )
+        offset = np.array([*origin, *origin], dtype=np.float32)
+        return replace(
+            heavy,
+            detections=replace(heavy.detections, xyxy=heavy.detections.xyxy + offset),
+        )
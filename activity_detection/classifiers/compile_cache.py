@@ -0,0 +1,30 @@
+import os
+
+DEFAULT_COMPILE_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "activity_detection", "torch_compile"
+)
+
+
+def enable_compile_cache(cache_dir: str | None = None) -> str:
+    """Keep torch.compile's compiled kernels and graphs on disk.
+
+    With the cache in place a restart loads the compiled artifacts instead
+    of compiling again, so only the first run after a model, input shape or
+    PyTorch change pays for compilation. Applies to the whole process.
+
+    Args:
+        cache_dir (str | None): Cache directory. Defaults to
+            DEFAULT_COMPILE_CACHE_DIR.
+
+    Returns:
+        str: The cache directory in use
+    """
+    import torch._inductor.config
+
+    cache_dir = os.path.expanduser(cache_dir or DEFAULT_COMPILE_CACHE_DIR)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Read by Inductor whenever it looks for its cache, so setting it now
+    # still applies to an already imported torch.
+    os.environ["TORCHINDUCTOR_CACHE_DIR"] = cache_dir
+    torch._inductor.config.fx_graph_cache = True
+    return cache_dir
@@ -0,0 +1,107 @@
+import hashlib
+import os
+import shutil
+
+from ultralytics.engine.model import Model
+
+from activity_detection.logging_config import setup_logger
+
+BACKENDS = ("torch", "onnx", "openvino")
+DEFAULT_EXPORT_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "activity_detection", "exports"
+)
+# What Ultralytics names the exported artifact, after the weights' stem.
+EXPORT_SUFFIXES = {"onnx": ".onnx", "openvino": "_openvino_model"}
+
+logger = setup_logger("export")
+
+
+def export_key(
+    model_path: str,
+    backend: str,
+    input_size: int,
+    int8: bool = False,
+    calibration_data: str | None = None,
+) -> str:
+    """Name of the cached export for a model, backend and input size.
+
+    Local weights are identified by their contents, so replacing a weights
+    file with new ones of the same name does not reuse a stale export.
+    """
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    digest = hashlib.sha256()
+    if os.path.isfile(model_path):
+        with open(model_path, "rb") as weights:
+            for block in iter(lambda: weights.read(1 << 20), b""):
+                digest.update(block)
+    else:
+        digest.update(model_path.encode())
+    if int8:
+        digest.update(str(calibration_data).encode())
+    precision = "int8" if int8 else "fp32"
+    return f"{stem}-{digest.hexdigest()[:12]}-{backend}-{input_size}-{precision}"
+
+
+def exported_model(
+    model: Model,
+    model_path: str,
+    backend: str,
+    input_size: int,
+    int8: bool = False,
+    calibration_data: str | None = None,
+    export_dir: str | None = None,
+) -> str:
+    """Path of the model exported to a CPU runtime, exporting it if needed.
+
+    Exports are cached in export_dir under export_key, so each model is only
+    exported once per backend, input size and precision. They have a dynamic
+    batch size, so batched inference still works.
+
+    Args:
+        model (Model): The loaded PyTorch model, ready to export
+        model_path (str): Path of the model's weights
+        backend (str): "onnx" or "openvino"
+        input_size (int): Input size to export for
+        int8 (bool): Apply INT8 post-training quantization. OpenVINO only.
+        calibration_data (str | None): Ultralytics dataset YAML whose
+            validation images calibrate the INT8 quantization
+        export_dir (str | None): Cache directory. Defaults to
+            DEFAULT_EXPORT_DIR.
+
+    Returns:
+        str: Path of the exported model
+    """
+    if backend not in EXPORT_SUFFIXES:
+        raise ValueError(
+            f"Invalid backend: {backend}. Expected one of {tuple(EXPORT_SUFFIXES)}"
+        )
+    if int8 and backend != "openvino":
+        raise ValueError("INT8 quantization needs the openvino backend")
+    if int8 and not calibration_data:
+        raise ValueError("INT8 quantization needs calibration data")
+
+    export_dir = os.path.expanduser(export_dir or DEFAULT_EXPORT_DIR)
+    key = export_key(model_path, backend, input_size, int8, calibration_data)
+    target = os.path.join(export_dir, key + EXPORT_SUFFIXES[backend])
+    if os.path.exists(target):
+        logger.info(f"Using cached {backend} export {target}")
+        return target
+
+    logger.info(f"Exporting {model_path} to {backend}. This only happens once.")
+    kwargs = {"int8": True, "data": calibration_data} if int8 else {}
+    path = model.export(
+        format=backend, imgsz=input_size, dynamic=True, device="cpu", **kwargs
+    )
+    # Ultralytics exports next to the weights. Move the result into the cache
+    # under a temporary name first, so an interrupted move is never mistaken
+    # for a finished export.
+    os.makedirs(export_dir, exist_ok=True)
+    partial = f"{target}.partial"
+    if os.path.isdir(partial):
+        shutil.rmtree(partial)
+    elif os.path.exists(partial):
+        os.remove(partial)
+    shutil.move(path, partial)
+    os.replace(partial, target)
+    logger.info(f"Saved {backend} export to {target}")
+    return target
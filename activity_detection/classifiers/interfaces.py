@@ -3,16 +3,72 @@ from abc import ABC, abstractmethod
 from PIL import Image
 
 from activity_detection.classifiers.types import Prediction
-from activity_detection.devices import get_device
 from activity_detection.logging_config import setup_logger
 
 
 class ActivityDetectionInterface(ABC):
+    # Constructor arguments reconfigure() can change without reloading the
+    # model, stored in attributes of the same name.
+    RELOADABLE: tuple[str, ...] = ()
+
     def __init__(self):
+        # Imported here, as it loads torch, which a remote detector never needs.
+        from activity_detection.devices import get_device
+
         self.logger = setup_logger(self.__class__.__name__)
         self.device = get_device()
+        # Square input resolution the model runs at, if it has a fixed one.
+        self.input_size: int | None = None
         self.logger.info(f"Using device: {self.device.value}")
 
     @abstractmethod
     def detect_activity(self, image: Image) -> Prediction:
         pass
+
+    def detect_batch(self, images: list[Image]) -> list[Prediction]:
+        """Detect activity in a batch of images.
+
+        Detectors that can run several images through the model at once should
+        override this. The default implementation runs detect_activity on each
+        image in turn.
+
+        Args:
+            images (list[Image]): The input images to analyze
+
+        Returns:
+            list[Prediction]: One prediction per image, in the same order
+        """
+        return [self.detect_activity(image) for image in images]
+
+    def stats(self) -> dict[str, int]:
+        """Counters describing the detector's work so far, if it keeps any.
+
+        They are reported as detector_<name> metrics.
+        """
+        return {}
+
+    def reconfigure(self, **settings):
+        """Change settings of a running detector, keeping the loaded model.
+
+        Args:
+            **settings: New values for arguments listed in RELOADABLE
+
+        Raises:
+            ValueError: If a setting can only change with a restart
+        """
+        fixed = sorted(set(settings) - set(self.RELOADABLE))
+        if fixed:
+            raise ValueError(f"Changing {', '.join(fixed)} requires a restart")
+        for name, value in settings.items():
+            setattr(self, name, value)
+
+    def set_input_size(self, input_size: int):
+        """Run the loaded model at another input resolution.
+
+        Args:
+            input_size (int): The new square input resolution
+
+        Raises:
+            ValueError: If the detector cannot change its input size
+        """
+        raise ValueError(f"{type(self).__name__} cannot change its input size")
@@ -6,16 +6,71 @@ from transformers import (
     PreTrainedTokenizer,
 )
 
+from activity_detection.classifiers.compile_cache import enable_compile_cache
 from activity_detection.classifiers.types import Prediction
 from activity_detection.classifiers.interfaces import (
     ActivityDetectionInterface,
 )
 from PIL import Image
 
+MODES = ("score", "generate")
+
 
 class MoondreamActivityDetector(ActivityDetectionInterface):
-    def __init__(self, model_id: str, revision: str):
+    QUESTION = (
+        "Is there a person close to the camera in this image? "
+        "(Only answer 'YES' or 'NO')"
+    )
+    # Spellings the answer may start with. Their first tokens are pooled, so
+    # the score does not depend on which casing the model prefers.
+    YES = ("yes", "Yes", "YES", " yes", " Yes", " YES")
+    NO = ("no", "No", "NO", " no", " No", " NO")
+    RELOADABLE = ("threshold", "temperature")
+
+    def __init__(
+        self,
+        model_id: str,
+        revision: str,
+        mode: str = "score",
+        threshold: float = 0.5,
+        temperature: float = 1.0,
+        compile: bool = False,
+        compile_cache_dir: str | None = None,
+    ):
+        """Ask Moondream whether a person is close to the camera.
+
+        In score mode the answer is never generated. The image and the
+        question go through the model once and the logits of the "yes" and
+        "no" tokens for the first answer token are compared, giving the
+        probability of "yes" as the prediction's confidence. Dividing the
+        logit difference by a temperature fitted on labelled frames
+        calibrates that probability. The question is tokenized and embedded
+        once, and images in a batch are encoded and scored together.
+
+        In generate mode the model writes a free-form answer, which must be
+        "yes" or "no".
+
+        Args:
+            model_id (str): Hugging Face model ID
+            revision (str): Model revision
+            mode (str): "score" or "generate"
+            threshold (float): Confidence at or above which a person is
+                detected, in score mode
+            temperature (float): Divides the yes/no logit difference
+            compile (bool): torch.compile the text model used for scoring
+            compile_cache_dir (str | None): Where compiled artifacts are kept
+                between restarts (see enable_compile_cache)
+        """
         super().__init__()
+        if mode not in MODES:
+            raise ValueError(f"Invalid mode: {mode}. Expected one of {MODES}")
+        if temperature <= 0:
+            raise ValueError("Temperature must be positive")
+        if compile and mode != "score":
+            raise ValueError("Only score mode can be compiled")
+        self.mode = mode
+        self.threshold = threshold
+        self.temperature = temperature
         self.model: PreTrainedModel = AutoModelForCausalLM.from_pretrained(
             model_id,
             trust_remote_code=True,
@@ -25,6 +80,42 @@ class MoondreamActivityDetector(ActivityDetectionInterface):
         self.tokenizer: PreTrainedTokenizer = AutoTokenizer.from_pretrained(
             model_id, revision=revision, use_fast=True
         )
+        if mode == "score":
+            self._prepare_scoring()
+        # Scored sequences always have the same length, so only a new batch
+        # size makes the compiled model recompile, and warm-up covers those.
+        self.text_model = self.model.text_model
+        if compile:
+            enable_compile_cache(compile_cache_dir)
+            self.text_model = torch.compile(self.text_model)
+
+    def reconfigure(self, **settings):
+        if settings.get("temperature", self.temperature) <= 0:
+            raise ValueError("Temperature must be positive")
+        super().reconfigure(**settings)
+
+    def _prepare_scoring(self):
+        # Moondream's prompt format is "<image>\n\nQuestion: ...\n\nAnswer:"
+        # after a BOS token. Everything but the image is constant, so embed
+        # it once.
+        embed = self.model.text_model.get_input_embeddings()
+        with torch.inference_mode():
+            self.prefix_embeds = embed(self._tokens([self.tokenizer.bos_token_id]))
+            self.suffix_embeds = embed(
+                self._tokens(self._encode(f"\n\nQuestion: {self.QUESTION}\n\nAnswer:"))
+            )
+        self.yes_ids = self._first_token_ids(self.YES)
+        self.no_ids = self._first_token_ids(self.NO)
+
+    def _encode(self, text: str) -> list[int]:
+        return self.tokenizer.encode(text, add_special_tokens=False)
+
+    def _tokens(self, ids: list[int]) -> torch.Tensor:
+        return torch.tensor([ids], device=self.device.value)
+
+    def _first_token_ids(self, words: tuple[str, ...]) -> torch.Tensor:
+        ids = sorted({self._encode(word)[0] for word in words})
+        return torch.tensor(ids, device=self.device.value)
 
     def detect_activity(self, image: Image) -> Prediction:
         """Detect if there is a person close to the camera in the input image.
@@ -33,11 +124,59 @@ class MoondreamActivityDetector(ActivityDetectionInterface):
             image (Image): The input image to analyze
 
         Returns:
-            bool: True if a person is close to the camera, False otherwise
+            Prediction: Whether a person is close to the camera and, in score
+                mode, the confidence that one is
         """
-        prompt = "Is there a person close to the camera in this image? (Only answer 'YES' or 'NO')"
+        if self.mode == "score":
+            return self.detect_batch([image])[0]
         encoded_image = self.model.encode_image(image)
-        answer: str = self.model.answer_question(encoded_image, prompt, self.tokenizer)
+        answer: str = self.model.answer_question(
+            encoded_image, self.QUESTION, self.tokenizer
+        )
         if answer.lower() not in ["yes", "no"]:
             raise ValueError("Invalid answer from the model")
         return Prediction(detected=answer.lower() == "yes")
+
+    def detect_batch(self, images: list[Image]) -> list[Prediction]:
+        """Score a batch of images with one image encoder and one text model call.
+
+        Args:
+            images (list[Image]): The input images to analyze
+
+        Returns:
+            list[Prediction]: One prediction per image, in the same order
+        """
+        if self.mode != "score":
+            return super().detect_batch(images)
+        confidences = self.score(images)
+        return [
+            Prediction(detected=confidence >= self.threshold, confidence=confidence)
+            for confidence in confidences
+        ]
+
+    @torch.inference_mode()
+    def score(self, images: list[Image]) -> list[float]:
+        """Probability that the answer for each image is "yes" rather than "no".
+
+        Args:
+            images (list[Image]): The input images to score
+
+        Returns:
+            list[float]: One probability per image, in the same order
+        """
+        image_embeds = self.model.encode_image(list(images)).to(self.device.value)
+        batch_size = len(image_embeds)
+        # Every sequence has the same length, so no padding or attention mask
+        # is needed.
+        inputs_embeds = torch.cat(
+            [
+                self.prefix_embeds.expand(batch_size, -1, -1),
+                image_embeds.to(self.prefix_embeds.dtype),
+                self.suffix_embeds.expand(batch_size, -1, -1),
+            ],
+            dim=1,
+        )
+        logits = self.text_model(inputs_embeds=inputs_embeds).logits[:, -1]
+        yes = torch.logsumexp(logits[:, self.yes_ids], dim=-1)
+        no = torch.logsumexp(logits[:, self.no_ids], dim=-1)
+        return torch.sigmoid((yes - no) / self.temperature).float().tolist()
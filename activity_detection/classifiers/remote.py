@@ -0,0 +1,187 @@
+import threading
+import time
+import weakref
+from multiprocessing.connection import Client, Connection
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+from PIL import Image
+
+from activity_detection.classifiers.interfaces import ActivityDetectionInterface
+from activity_detection.classifiers.types import Prediction
+from activity_detection.logging_config import setup_logger
+from activity_detection.serving.protocol import (
+    DEFAULT_ADDRESS,
+    ImageSpec,
+    image_array,
+    parse_address,
+    read_authkey,
+)
+
+
+def _free_block(shared_memory: SharedMemory):
+    shared_memory.close()
+    shared_memory.unlink()
+
+
+class RemoteActivityDetector(ActivityDetectionInterface):
+    RECONNECT_INTERVAL = 0.5
+
+    def __init__(
+        self,
+        address: str = DEFAULT_ADDRESS,
+        authkey: str | None = None,
+        shared_memory: bool = True,
+        timeout_s: float = 30,
+        connect_timeout_s: float = 120,
+    ):
+        """Detector that sends images to a DetectorServer.
+
+        The model is loaded once, by the server, and batched across every
+        pipeline that uses it, so a pipeline using this detector never loads
+        torch or a model. Images are copied into a shared memory block and
+        only their place in it is sent, unless shared_memory is off or the
+        address is a TCP one, as the server may then run on another host. A
+        lost connection is retried once per call, so the server can restart
+        underneath.
+
+        Args:
+            address (str): The server's Unix socket path, or "host:port"
+            authkey (str | None): Shared secret, if the server requires one.
+                Defaults to the ACTIVITY_DETECTION_AUTHKEY environment
+                variable.
+            shared_memory (bool): Pass images through shared memory
+            timeout_s (float): Longest to wait for an answer
+            connect_timeout_s (float): Longest to wait for the server to
+                start, as it may still be loading its model
+        """
+        # Not calling super().__init__(): the device is the server's concern,
+        # and finding it would import torch.
+        self.logger = setup_logger(self.__class__.__name__)
+        self.address = parse_address(address)
+        self.authkey = read_authkey(authkey)
+        self.use_shared_memory = shared_memory and isinstance(self.address, str)
+        self.timeout = timeout_s
+        self.connection: Connection | None = None
+        self.block: SharedMemory | None = None
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.reconnects = 0
+        self.input_size: int | None = self._connect(connect_timeout_s)["input_size"]
+
+    def _connect(self, timeout: float) -> dict:
+        """Connect to the server, waiting up to timeout for it to listen.
+
+        Returns:
+            dict: The server's description of its detector
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self.connection = Client(self.address, authkey=self.authkey)
+                break
+            except (ConnectionRefusedError, FileNotFoundError):
+                if time.monotonic() >= deadline:
+                    raise ConnectionError(
+                        f"No detector server at {self.address} after {timeout}s"
+                    )
+                time.sleep(self.RECONNECT_INTERVAL)
+        self.connection.send(("info",))
+        info = self._receive()
+        self.logger.info(f"Connected to detector server at {self.address}")
+        return info
+
+    def _disconnect(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def _receive(self):
+        if not self.connection.poll(self.timeout):
+            # A late answer would be taken for the next request's.
+            self._disconnect()
+            raise TimeoutError(f"No answer from {self.address} in {self.timeout}s")
+        return self.connection.recv()
+
+    def detect_activity(self, image: Image) -> Prediction:
+        return self.detect_batch([image])[0]
+
+    def detect_batch(self, images: list[Image]) -> list[Prediction]:
+        """Detect activity in a batch of images on the server.
+
+        Raises:
+            ConnectionError: If the server cannot be reached
+            TimeoutError: If the server does not answer in time
+            RuntimeError: If detection fails on the server
+        """
+        if not images:
+            return []
+        with self.lock:
+            message = self._request(images)
+            for attempt in range(2):
+                try:
+                    if self.connection is None:
+                        self._connect(self.timeout)
+                        self.reconnects += 1
+                    self.connection.send(message)
+                    status, payload = self._receive()
+                    break
+                except TimeoutError:
+                    raise
+                except (EOFError, OSError) as e:
+                    self._disconnect()
+                    if attempt:
+                        raise ConnectionError(
+                            f"Lost the detector server at {self.address}"
+                        ) from e
+                    self.logger.warning("Lost the detector server. Reconnecting.")
+            self.requests += 1
+        if status == "error":
+            raise RuntimeError(f"Detector server failed: {payload}")
+        return payload
+
+    def _request(self, images: list) -> tuple:
+        arrays = [image_array(image) for image in images]
+        if not self.use_shared_memory:
+            return (
+                "detect",
+                None,
+                [
+                    ImageSpec(kind, mode, array.shape, array.dtype.str, data=array)
+                    for kind, mode, array in arrays
+                ],
+            )
+        self._reserve(sum(array.nbytes for _, _, array in arrays))
+        specs = []
+        offset = 0
+        for kind, mode, array in arrays:
+            view = np.ndarray(
+                array.shape, dtype=array.dtype, buffer=self.block.buf, offset=offset
+            )
+            np.copyto(view, array)
+            specs.append(ImageSpec(kind, mode, array.shape, array.dtype.str, offset))
+            offset += array.nbytes
+        del view
+        return "detect", self.block.name, specs
+
+    def _reserve(self, size: int):
+        """Make sure the shared memory block holds at least size bytes."""
+        if self.block is not None and self.block.size >= size:
+            return
+        # Doubled, so a growing batch does not reallocate every time.
+        capacity = max(size, 2 * self.block.size if self.block else 1)
+        if self.block is not None:
+            self._finalizer()
+        self.block = SharedMemory(create=True, size=capacity)
+        self._finalizer = weakref.finalize(self, _free_block, self.block)
+
+    def stats(self) -> dict[str, int]:
+        return {"requests": self.requests, "reconnects": self.reconnects}
+
+    def close(self):
+        """Disconnect and free the shared memory block."""
+        with self.lock:
+            self._disconnect()
+            if self.block is not None:
+                self._finalizer()
+                self.block = None
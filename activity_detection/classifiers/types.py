@@ -1,11 +1,55 @@
+from dataclasses import dataclass, field
+
 import numpy as np
-from dataclasses import dataclass
 
-from torch.functional import Tensor
-from dataclasses import field
+
+@dataclass
+class Detections:
+    """Columnar detection results for one image.
+
+    Row i of every array describes the same box. Columns that a detector does
+    not produce are filled in with defaults: a confidence of 1, class 0 and a
+    track ID of -1 (untracked).
+    """
+
+    xyxy: np.ndarray = field(default_factory=lambda: np.empty((0, 4), dtype=np.float32))
+    confidence: np.ndarray | None = None
+    class_id: np.ndarray | None = None
+    track_id: np.ndarray | None = None
+
+    def __post_init__(self):
+        self.xyxy = np.asarray(self.xyxy, dtype=np.float32).reshape(-1, 4)
+        count = len(self.xyxy)
+        if self.confidence is None:
+            self.confidence = np.ones(count, dtype=np.float32)
+        if self.class_id is None:
+            self.class_id = np.zeros(count, dtype=np.int64)
+        if self.track_id is None:
+            self.track_id = np.full(count, -1, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.xyxy)
+
+    def __getitem__(self, index) -> "Detections":
+        return Detections(
+            xyxy=self.xyxy[index],
+            confidence=self.confidence[index],
+            class_id=self.class_id[index],
+            track_id=self.track_id[index],
+        )
 
 
 @dataclass
 class Prediction:
     detected: bool
-    bounding_box: np.ndarray | Tensor = field(default_factory=lambda: np.array([]))
+    detections: Detections = field(default_factory=Detections)
+    # Confidence in the image-level decision, for detectors that give one.
+    confidence: float | None = None
+
+    @property
+    def bounding_box(self) -> np.ndarray:
+        return self.detections.xyxy
+
+    @property
+    def track_ids(self) -> np.ndarray:
+        return self.detections.track_id
@@ -1,3 +1,4 @@
+import logging
 from abc import ABC, abstractmethod
 
 import numpy as np
@@ -5,71 +6,216 @@ import torch
 from PIL import Image
 from ultralytics import YOLO, YOLOWorld
 from ultralytics.engine.model import Model
-from ultralytics.engine.results import Boxes
+from ultralytics.engine.results import Results
 
 from activity_detection.classifiers.interfaces import (
     ActivityDetectionInterface,
 )
-from activity_detection.classifiers.types import Prediction
+from activity_detection.classifiers.compile_cache import enable_compile_cache
+from activity_detection.classifiers.export import BACKENDS, exported_model
+from activity_detection.classifiers.types import Detections, Prediction
+from activity_detection.devices import DeviceType
+from activity_detection.logging_config import every
 
 
 class BaseYOLODetector(ActivityDetectionInterface, ABC):
-    def __init__(self, model_path: str, confidence_threshold: float = 0.5):
+    RELOADABLE = ("confidence_threshold",)
+
+    def __init__(
+        self,
+        model_path: str,
+        confidence_threshold: float = 0.5,
+        input_size: int = 640,
+        backend: str = "torch",
+        int8: bool = False,
+        calibration_data: str | None = None,
+        export_dir: str | None = None,
+        compile: bool | str = False,
+        compile_cache_dir: str | None = None,
+    ):
+        """Detect people with a YOLO model.
+
+        With the torch backend the PyTorch weights run on the best available
+        device. The onnx and openvino backends export the model once for the
+        input size (see exported_model) and run it on the CPU through ONNX
+        Runtime or OpenVINO, the latter optionally quantized to INT8. They
+        need the onnx or openvino extra installed.
+
+        Args:
+            model_path (str): Path or name of the PyTorch weights
+            confidence_threshold (float): Minimum confidence of a detection
+            input_size (int): Square input resolution the model runs at
+            backend (str): One of BACKENDS
+            int8 (bool): Quantize the exported model to INT8. OpenVINO only.
+            calibration_data (str | None): Dataset YAML whose validation
+                images calibrate INT8 quantization
+            export_dir (str | None): Where exported models are cached
+            compile (bool | str): torch.compile the model, optionally naming
+                the compile mode. Torch backend only.
+            compile_cache_dir (str | None): Where compiled artifacts are kept
+                between restarts (see enable_compile_cache)
+        """
         super().__init__()
-        self.model = self.load_model(model_path).to(self.device.value)
+        if backend not in BACKENDS:
+            raise ValueError(f"Invalid backend: {backend}. Expected one of {BACKENDS}")
+        if int8 and backend != "openvino":
+            raise ValueError("INT8 quantization needs the openvino backend")
+        if compile and backend != "torch":
+            raise ValueError("Only the torch backend can be compiled")
+        self.backend = backend
+        if compile:
+            enable_compile_cache(compile_cache_dir)
+        model = self.load_model(model_path)
+        self.prepare_model(model)
+        if backend == "torch":
+            self.model = model.to(self.device.value)
+            if compile:
+                self._compile(compile)
+        else:
+            self.device = DeviceType.CPU
+            path = exported_model(
+                model,
+                model_path,
+                backend,
+                input_size,
+                int8,
+                calibration_data,
+                export_dir,
+            )
+            self.model = YOLO(path, task="detect")
         self.confidence_threshold = confidence_threshold
+        self.input_size = input_size
+        self.person_class_ids = self._find_person_class_ids(self.model.names)
 
     @abstractmethod
     def load_model(self, model_path: str) -> Model:
         pass
 
+    def prepare_model(self, model: Model):
+        """Adjust the loaded PyTorch model before it is moved or exported."""
+        pass
+
+    def set_input_size(self, input_size: int):
+        # Exported models are exported with dynamic input shapes, so they
+        # take any size too.
+        if input_size is None or input_size <= 0:
+            raise ValueError("Input size must be positive")
+        self.input_size = input_size
+
+    def _compile(self, mode: bool | str):
+        # The predictor fuses the network and calls it through its forward,
+        # so the network is fused first and only its forward is compiled.
+        # Compiling the module itself would be undone by that fusing.
+        network = self.model.model.fuse(verbose=False).eval()
+        network.forward = torch.compile(
+            network.forward, **({"mode": mode} if isinstance(mode, str) else {})
+        )
+
     def detect_activity(self, image: Image) -> Prediction:
-        """Detect if there are people in the input image and return their bounding boxes.
+        """Detect if there are people in the input image and return their
+        bounding boxes.
         Args:
             image (Image): The input image to analyze
         Returns:
-            Prediction: A Prediction object containing a detection flag and a list of bounding boxes
+            Prediction: A Prediction object containing a detection flag and
+                the detected boxes
+        """
+        results = self.model.predict(image, **self._predict_kwargs())
+        return self._results_to_predictions(results)[0]
+
+    def detect_batch(self, images: list[Image]) -> list[Prediction]:
+        """Detect people in a batch of images with a single model call.
+        Args:
+            images (list[Image]): The input images to analyze
+        Returns:
+            list[Prediction]: One prediction per image, in the same order
+        """
+        results = self.model.predict(list(images), **self._predict_kwargs())
+        return self._results_to_predictions(results)
+
+    def _predict_kwargs(self) -> dict:
+        # Let the model drop other classes and low-confidence boxes during
+        # NMS rather than filtering them in Python afterwards.
+        return {
+            "classes": self.person_class_ids or None,
+            "conf": self.confidence_threshold,
+            "imgsz": self.input_size,
+            "verbose": False,
+            # Exported models run on the CPU runtime they were exported for.
+            **({"device": "cpu"} if self.backend != "torch" else {}),
+        }
+
+    def _results_to_predictions(self, results: list[Results]) -> list[Prediction]:
+        """Convert model results to predictions with whole-tensor operations.
+
+        Boxes are filtered by class on the model's device, then copied to the
+        host in a single transfer for the whole batch. Confidence is only
+        filtered by predict (see _predict_kwargs), so there is one threshold
+        boundary, inclusive as Ultralytics applies it.
         """
-        person_detected = False
-        bounding_boxes = []
-        results = self.model.predict(image)
+        filtered = []
         for result in results:
-            boxes: Boxes = result.boxes
-            for box in boxes:
-                if (
-                    "person" in result.names.values()
-                    and box.conf > self.confidence_threshold
-                ):
-                    person_detected = True
-                    co_ords = (
-                        box.xyxy.cpu().numpy().flatten()
-                        if isinstance(box.xyxy, torch.Tensor)
-                        else box.xyxy.flatten()
-                    )
-                    bounding_boxes.append(co_ords)
-        num_people = len(bounding_boxes)
-        self.logger.info(f"Number of people detected: {num_people}")
-        return Prediction(
-            detected=person_detected, bounding_box=np.array(bounding_boxes)
-        )
+            boxes = result.boxes
+            person_ids = torch.as_tensor(
+                self._find_person_class_ids(result.names), device=boxes.data.device
+            )
+            keep = torch.isin(boxes.cls.long(), person_ids)
+            # Columns: x1, y1, x2, y2, confidence, class
+            filtered.append(boxes.data[keep][:, [0, 1, 2, 3, -2, -1]])
+        if not filtered:
+            return []
+
+        counts = [len(boxes) for boxes in filtered]
+        host = torch.cat(filtered).cpu().numpy()
+
+        predictions = []
+        for rows in np.split(host, np.cumsum(counts)[:-1]):
+            detections = Detections(
+                xyxy=rows[:, :4],
+                confidence=rows[:, 4],
+                class_id=rows[:, 5].astype(np.int64),
+            )
+            predictions.append(
+                Prediction(detected=len(detections) > 0, detections=detections)
+            )
+
+        if self.logger.isEnabledFor(logging.DEBUG):
+            counts = [len(prediction.detections) for prediction in predictions]
+            self.logger.debug(f"Number of people detected: {counts}", extra=every(1))
+        return predictions
+
+    @staticmethod
+    def _find_person_class_ids(names: dict[int, str]) -> list[int]:
+        return [class_id for class_id, name in names.items() if name == "person"]
 
 
 class YOLOWorldActivityDetector(BaseYOLODetector):
     def __init__(
-        self, model_path: str = "yolov8m-worldv2.pt", confidence_threshold: float = 0.5
+        self,
+        model_path: str = "yolov8m-worldv2.pt",
+        confidence_threshold: float = 0.5,
+        input_size: int = 640,
+        **backend_kwargs,
     ):
-        super().__init__(model_path, confidence_threshold)
-        self.model.set_classes(["person"])
+        super().__init__(model_path, confidence_threshold, input_size, **backend_kwargs)
 
     def load_model(self, model_path: str) -> Model:
         return YOLOWorld(model_path)
 
+    def prepare_model(self, model: Model):
+        # Set before exporting, as exported models have fixed classes.
+        model.set_classes(["person"])
+
 
 class YOLOActivityDetector(BaseYOLODetector):
     def __init__(
-        self, model_path: str = "yolo11m.pt", confidence_threshold: float = 0.5
+        self,
+        model_path: str = "yolo11m.pt",
+        confidence_threshold: float = 0.5,
+        input_size: int = 640,
+        **backend_kwargs,
     ):
-        super().__init__(model_path, confidence_threshold)
+        super().__init__(model_path, confidence_threshold, input_size, **backend_kwargs)
 
     def load_model(self, model_path: str) -> Model:
         return YOLO(model_path)
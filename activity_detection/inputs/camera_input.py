@@ -1,3 +1,5 @@
+import os
+import threading
 import time
 
 import cv2
@@ -8,6 +10,13 @@ import numpy as np
 from activity_detection.logging_config import setup_logger
 
 
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mkv", ".mov", ".m4v", ".ts")
+
+
+class EndOfStream(IOError):
+    """Raised by inputs that have no more frames to give."""
+
+
 class CameraInputInterface(ABC):
     @abstractmethod
     def start_capture(self):
@@ -21,16 +30,52 @@ class CameraInputInterface(ABC):
     def get_frame(self) -> np.ndarray:
         pass
 
+    def get_frame_with_timestamp(self) -> tuple[np.ndarray, float]:
+        """Get the next frame with the time.monotonic() it was captured at.
+
+        Inputs that know when a frame was captured, rather than when it was
+        returned, should override this.
+        """
+        frame = self.get_frame()
+        return frame, time.monotonic()
+
 
 class CameraBase(CameraInputInterface):
-    def __init__(self):
+    MAX_RECONNECT_DELAY = 30
+
+    def __init__(self, reconnect_delay: float = 0.5):
+        """Live camera read by a background thread.
+
+        The reader thread keeps draining the stream with grab(), so OpenCV's
+        internal buffer never holds stale frames, and only decodes a frame
+        with retrieve() when get_frame is waiting for one. Frames are further
+        limited to target_fps by only decoding every frame_interval-th grab.
+        If the stream fails, the reader reconnects, doubling the delay between
+        attempts from reconnect_delay up to MAX_RECONNECT_DELAY seconds.
+
+        Args:
+            reconnect_delay (float): Seconds before the first reconnect attempt
+        """
         self.capture = None
         self.target_fps = 30
         self.original_fps = None
         self.frame_interval = None
         self.last_frame_time = None
+        self.reconnect_delay = reconnect_delay
+        self.latest_frame: np.ndarray | None = None
+        self.reconnects = 0
+        self.frames_grabbed = 0
+        self.frames_decoded = 0
+        self.frame_ready = threading.Condition()
+        self.frame_wanted = False
+        self.stopped = threading.Event()
+        self.reader: threading.Thread | None = None
         self.logger = setup_logger(self.__class__.__name__)
 
+    @abstractmethod
+    def open_capture(self) -> cv2.VideoCapture:
+        """Open the underlying stream."""
+
     def start_capture(self):
         """Start capturing frames from the camera."""
         if not self.capture:
@@ -43,57 +88,266 @@ class CameraBase(CameraInputInterface):
         if self.original_fps == 0:
             raise ValueError("Unable to fetch camera FPS")
 
-        self.frame_interval = int(self.original_fps / self.target_fps)
-        self.last_frame_time = time.time()
+        self.frame_interval = max(1, int(self.original_fps / self.target_fps))
+        self.last_frame_time = None
+        self.latest_frame = None
+        self.stopped.clear()
+        self.reader = threading.Thread(
+            target=self._read_frames,
+            name=f"reader-{self.__class__.__name__}",
+            daemon=True,
+        )
+        self.reader.start()
         self.logger.info(f"Camera capture started with target FPS: {self.target_fps}")
 
-    def stop_capture(self):
-        """Stop capturing frames from the camera."""
+    def set_target_fps(self, target_fps: float):
+        """Change the frame rate limit, also while capturing."""
+        if target_fps <= 0:
+            raise ValueError("Target FPS must be positive")
+        self.target_fps = target_fps
+        if self.original_fps:
+            self.frame_interval = max(1, int(self.original_fps / self.target_fps))
+
+    def stop_capture(self, timeout: float | None = None):
+        """Stop capturing frames from the camera.
+
+        The reader thread releases the stream once it stops. It may be
+        blocked on a stalled stream, in which case it is left behind after
+        timeout seconds, as a daemon thread, to release the stream whenever
+        it returns.
+
+        Args:
+            timeout (float | None): Seconds to wait for the reader thread
+        """
+        self.stopped.set()
+        with self.frame_ready:
+            self.frame_ready.notify_all()
+        reader, self.reader = self.reader, None
+        if reader is None:
+            self._release()
+        elif reader is not threading.current_thread():
+            reader.join(timeout)
+            if reader.is_alive():
+                self.logger.warning(
+                    "Camera reader is blocked on the stream. Not waiting for it."
+                )
+
+    def _release(self):
         if self.capture:
             self.capture.release()
             self.capture = None
             self.logger.info("Camera capture stopped")
 
     def get_frame(self) -> np.ndarray:
-        """Retrieve the current frame from the camera.
+        """Wait for the next frame from the camera.
 
         Returns:
             np.ndarray: The current frame from the camera
         """
-        if self.capture:
-            current_time = time.time()
-            elapsed_time = current_time - self.last_frame_time
+        return self.get_frame_with_timestamp()[0]
 
-            if elapsed_time < (1 / self.target_fps):
-                time.sleep((1 / self.target_fps) - elapsed_time)
+    def get_frame_with_timestamp(self) -> tuple[np.ndarray, float]:
+        """Wait for the next frame and the time.monotonic() it was grabbed at.
 
-            ret, frame = self.capture.read()
-            if ret:
-                self.last_frame_time = time.time()
-                return frame
-            else:
-                raise IOError("Failed to retrieve frame from camera")
-        else:
+        Raises:
+            EndOfStream: If capture is stopped while waiting
+        """
+        if not self.reader:
             raise IOError("Camera capture is not initialized")
+        with self.frame_ready:
+            self.latest_frame = None
+            self.frame_wanted = True
+            self.frame_ready.wait_for(
+                lambda: self.latest_frame is not None or self.stopped.is_set()
+            )
+            if self.latest_frame is None:
+                raise EndOfStream("Camera capture stopped")
+            return self.latest_frame, self.last_frame_time
+
+    def _read_frames(self):
+        try:
+            self._grab_frames()
+        except Exception:
+            self.logger.exception("Camera reader failed")
+        finally:
+            # Wake anyone waiting for a frame, who then gets EndOfStream.
+            self.stopped.set()
+            with self.frame_ready:
+                self.frame_ready.notify_all()
+            self._release()
+
+    def _grab_frames(self):
+        grabs_since_decode = self.frame_interval
+        delay = self.reconnect_delay
+        while not self.stopped.is_set():
+            if not self.capture.grab():
+                self._reconnect(delay)
+                delay = min(delay * 2, self.MAX_RECONNECT_DELAY)
+                continue
+            delay = self.reconnect_delay
+            grabbed_at = time.monotonic()
+            self.frames_grabbed += 1
+            grabs_since_decode += 1
+            # Decoding is the expensive step, so skip it for frames nobody
+            # is waiting for or that would exceed target_fps.
+            if not self.frame_wanted or grabs_since_decode < self.frame_interval:
+                continue
+            ret, frame = self.capture.retrieve()
+            if not ret:
+                continue
+            grabs_since_decode = 0
+            self.frames_decoded += 1
+            with self.frame_ready:
+                self.latest_frame = frame
+                self.last_frame_time = grabbed_at
+                self.frame_wanted = False
+                self.frame_ready.notify_all()
+
+    def _reconnect(self, delay: float):
+        self.logger.warning(f"Lost camera stream. Reconnecting in {delay:.1f}s.")
+        self.capture.release()
+        if self.stopped.wait(delay):
+            return
+        self.capture = self.open_capture()
+        self.reconnects += 1
+        if self.capture.isOpened():
+            self.logger.info("Camera stream reconnected")
 
 
 class IPCamera(CameraBase):
-    def __init__(self, camera_url: str):
-        super().__init__()
+    def __init__(self, camera_url: str, reconnect_delay: float = 0.5):
+        super().__init__(reconnect_delay)
         self.camera_url = camera_url
 
+    def open_capture(self) -> cv2.VideoCapture:
+        return cv2.VideoCapture(self.camera_url)
+
     def start_capture(self):
         """Start capturing the live stream from the IP camera."""
-        self.capture = cv2.VideoCapture(self.camera_url)
+        self.capture = self.open_capture()
         super().start_capture()
 
 
 class LocalCamera(CameraBase):
-    def __init__(self, camera_index: int = 0):
-        super().__init__()
+    def __init__(self, camera_index: int = 0, reconnect_delay: float = 0.5):
+        super().__init__(reconnect_delay)
         self.camera_index = camera_index
 
+    def open_capture(self) -> cv2.VideoCapture:
+        return cv2.VideoCapture(self.camera_index)
+
     def start_capture(self):
         """Start capturing frames from the local webcam."""
-        self.capture = cv2.VideoCapture(self.camera_index)
+        self.capture = self.open_capture()
         super().start_capture()
+
+
+def video_files(path: str) -> list[str]:
+    """The video file at path, or the video files in a directory, sorted by name."""
+    if not os.path.isdir(path):
+        return [path]
+    return sorted(
+        os.path.join(path, name)
+        for name in os.listdir(path)
+        if name.lower().endswith(VIDEO_EXTENSIONS)
+    )
+
+
+class VideoFileInput(CameraInputInterface):
+    def __init__(
+        self,
+        path: str,
+        realtime: bool = False,
+        start_frame: int = 0,
+        end_frame: int | None = None,
+    ):
+        """Read frames from a video file or a directory of video files.
+
+        Frames are read as fast as they are asked for, unless realtime is set,
+        in which case they are paced at the video's own frame rate. Files in a
+        directory are played one after the other in name order, skipping any
+        that cannot be opened. When every frame has been read, get_frame
+        raises EndOfStream.
+
+        Args:
+            path (str): A video file, or a directory of video files
+            realtime (bool): Pace frames at the video's frame rate
+            start_frame (int): First frame to read, for a single file
+            end_frame (int | None): Stop before this frame, for a single file
+        """
+        self.files = video_files(path)
+        if not self.files:
+            raise ValueError(f"No video files found in {path}")
+        if (start_frame or end_frame is not None) and len(self.files) > 1:
+            raise ValueError("Start and end frames need a single video file")
+        self.realtime = realtime
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.capture = None
+        self.file_index = -1
+        self.frame_index = 0
+        self.fps = None
+        self.last_frame_time = None
+        self.logger = setup_logger(self.__class__.__name__)
+
+    @property
+    def current_file(self) -> str | None:
+        return self.files[self.file_index] if self.capture else None
+
+    def start_capture(self):
+        self.file_index = -1
+        self._open_next_file()
+
+    def stop_capture(self):
+        if self.capture:
+            self.capture.release()
+            self.capture = None
+
+    def get_frame(self) -> np.ndarray:
+        """Read the next frame.
+
+        Returns:
+            np.ndarray: The next frame
+
+        Raises:
+            EndOfStream: When every file has been read
+        """
+        while self.capture:
+            if self.end_frame is None or self.frame_index < self.end_frame:
+                ret, frame = self.capture.read()
+                if ret:
+                    self.frame_index += 1
+                    if self.realtime:
+                        self._wait_for_frame_time()
+                    return frame
+            self._open_next_file()
+        raise EndOfStream("No more video frames")
+
+    def _open_next_file(self):
+        self.stop_capture()
+        while self.capture is None:
+            self.file_index += 1
+            if self.file_index >= len(self.files):
+                return
+            path = self.files[self.file_index]
+            capture = cv2.VideoCapture(path)
+            if capture.isOpened():
+                self.capture = capture
+            elif len(self.files) == 1:
+                raise IOError(f"Cannot open video: {path}")
+            else:
+                # One corrupt file should not end a whole directory.
+                self.logger.error(f"Cannot open video: {path}. Skipping it.")
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS) or None
+        self.frame_index = self.start_frame
+        if self.start_frame:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, self.start_frame)
+        self.last_frame_time = None
+        self.logger.info(f"Reading {path}")
+
+    def _wait_for_frame_time(self):
+        if self.fps and self.last_frame_time is not None:
+            delay = self.last_frame_time + 1 / self.fps - time.time()
+            if delay > 0:
+                time.sleep(delay)
+        self.last_frame_time = time.time()
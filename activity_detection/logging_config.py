@@ -1,17 +1,160 @@
+import atexit
+import json
 import logging
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import TextIO
 
+TEXT_FORMAT = "%(asctime)s - %(threadName)s - %(name)s - %(levelname)s - %(message)s"
+
+# Loggers only hand records to a queue. One listener thread per process
+# formats and writes them, so no thread ever waits on the terminal or a file.
+_queue: queue.SimpleQueue = queue.SimpleQueue()
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+_listener: QueueListener | None = None
+_lock = threading.Lock()
+_level = logging.INFO
+_loggers: set[str] = set()
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats each record as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "process": record.processName,
+            # Includes any traceback, which QueueHandler adds to the message.
+            "message": record.getMessage(),
+        }
+        return json.dumps(entry)
+
+
+class RateLimitFilter(logging.Filter):
+    def __init__(self):
+        """Lets through one record per call site and interval.
+
+        Only applies to records logged with extra=every(seconds), such as
+        per-frame messages. The next record let through says how many were
+        held back. Errors are never held back.
+        """
+        super().__init__()
+        self.last_logged: dict[tuple[str, int], float] = {}
+        self.suppressed: dict[tuple[str, int], int] = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        interval = getattr(record, "rate_limit_s", None)
+        if interval is None or record.levelno >= logging.ERROR:
+            return True
+        call_site = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self.lock:
+            if now - self.last_logged.get(call_site, -interval) < interval:
+                self.suppressed[call_site] = self.suppressed.get(call_site, 0) + 1
+                return False
+            self.last_logged[call_site] = now
+            suppressed = self.suppressed.pop(call_site, 0)
+        if suppressed:
+            record.msg = (
+                f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+            )
+            record.args = None
+        return True
+
+
+def every(seconds: float) -> dict:
+    """extra= for a log call that should be logged at most once per interval.
+
+    Example:
+        logger.debug(f"Detected {count} people", extra=every(5))
+    """
+    return {"rate_limit_s": seconds}
+
+
+class _QueueHandler(QueueHandler):
+    def enqueue(self, record: logging.LogRecord):
+        super().enqueue(record)
+        if _listener is None:
+            _start_listener()
 
-def setup_logger(name: str, level=logging.INFO):
-    logger = logging.getLogger(name)
-    logger.setLevel(level)
 
-    formatter = logging.Formatter(
-        "%(asctime)s - %(threadName)s - %(name)s - %(levelname)s - %(message)s"
+def _start_listener():
+    global _listener
+    with _lock:
+        if _listener is None:
+            _listener = QueueListener(_queue, _stream_handler)
+            _listener.start()
+            atexit.register(stop_logging)
+
+
+_queue_handler = _QueueHandler(_queue)
+_queue_handler.addFilter(RateLimitFilter())
+
+
+def stop_logging():
+    """Write every queued record and stop the listener thread.
+
+    Logging again starts a new one.
+    """
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+def configure_logging(
+    level: int | str | None = None,
+    json: bool = False,
+    stream: TextIO | None = None,
+):
+    """Configure logging for the whole process.
+
+    Applies to every logger made by setup_logger, before or after this call.
+
+    Args:
+        level (int | str | None): Level such as "INFO" or "DEBUG"
+        json (bool): Write one JSON object per record instead of text
+        stream (TextIO | None): Where records are written. Defaults to stderr.
+    """
+    global _level
+    if level is not None:
+        if isinstance(level, str):
+            level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            raise ValueError(f"Invalid log level: {level}")
+        _level = level
+        for name in _loggers:
+            logging.getLogger(name).setLevel(_level)
+    _stream_handler.setFormatter(
+        JsonFormatter() if json else logging.Formatter(TEXT_FORMAT)
     )
-    logging.getLogger("ultralytics").setLevel(logging.WARNING)
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
+    _stream_handler.setStream(stream or sys.stderr)
+
 
-    logger.addHandler(console_handler)
+def setup_logger(name: str, level: int | None = None) -> logging.Logger:
+    """The logger for a component, attached to the process's log queue.
 
+    Safe to call any number of times for the same name: the logger gets the
+    queue handler only once.
+
+    Args:
+        name (str): Logger name
+        level (int | None): Level for this logger. Defaults to the level set
+            by configure_logging.
+    """
+    logger = logging.getLogger(name)
+    logger.setLevel(_level if level is None else level)
+    _loggers.add(name)
+    logging.getLogger("ultralytics").setLevel(logging.WARNING)
+    if _queue_handler not in logger.handlers:
+        logger.addHandler(_queue_handler)
     return logger
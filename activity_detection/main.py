@@ -1,17 +1,32 @@
+# Imported first, so the startup report includes the time spent importing.
+from activity_detection.startup import startup
+
 import yaml
 
 from pathlib import Path
 from activity_detection.activity_manager import ActivityManager
+from activity_detection.logging_config import configure_logging
+from activity_detection.pipeline.process_pipeline import ProcessPipeline
 
 
 def main():
+    startup.mark("imports")
     current_dir = Path(__file__).parent.parent
     config_file = current_dir / "config.yaml"
     with open(config_file, "r") as file:
         config = yaml.safe_load(file)
+    configure_logging(**config.get("logging", {}))
+    startup.mark("config")
 
-    activity_manager = ActivityManager.from_config(config)
-    activity_manager.run_activity_detection()
+    if "process_pipeline" in config:
+        pipeline = ProcessPipeline.from_config(config)
+        startup.mark("components")
+        pipeline.run_activity_detection()
+    else:
+        activity_manager = ActivityManager.from_config(config)
+        startup.mark("components")
+        # Watched, so changes apply without reloading the model.
+        activity_manager.run_activity_detection(str(config_file))
 
 
 if __name__ == "__main__":
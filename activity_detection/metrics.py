@@ -0,0 +1,272 @@
+import bisect
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterator
+
+from activity_detection.logging_config import setup_logger
+
+PREFIX = "activity_detection"
+
+
+class Histogram:
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+    def __init__(self, buckets: tuple[float, ...] = BUCKETS):
+        """Latency histogram with fixed bucket upper bounds, in seconds."""
+        self.buckets = buckets
+        # One count per bucket plus one for values above the last bound.
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile.
+
+        Values above the last bucket report the last bound.
+        """
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.buckets[-1]
+
+
+class PipelineMetrics:
+    # Seconds over which FPS is measured.
+    FPS_INTERVAL = 5
+
+    def __init__(
+        self,
+        port: int | None = None,
+        host: str = "127.0.0.1",
+        summary_interval_s: float | None = 60,
+    ):
+        """Stage timings, counters and queue depths for the pipeline.
+
+        Stage timings are histograms labelled by stage and camera:
+        capture (reading a frame), preprocess, inference (one batch, shared by
+        all cameras), write (annotating and recording) and latency (capture
+        to prediction). Counters and queue-depth gauges are per camera.
+
+        Metrics are always collected. With a port they are also served in the
+        Prometheus text format at http://host:port/metrics, and with a
+        summary interval one line per camera is logged that often. With
+        either, each camera's FPS is measured every FPS_INTERVAL seconds from
+        the rate of its fps_counter.
+
+        Args:
+            port (int | None): Port for the metrics endpoint, or None for none
+            host (str): Address the endpoint listens on
+            summary_interval_s (float | None): Seconds between summary logs,
+                or None for no summary
+        """
+        if summary_interval_s is not None and summary_interval_s <= 0:
+            raise ValueError("Summary interval must be positive")
+        self.port = port
+        self.host = host
+        self.summary_interval = summary_interval_s
+        self.histograms: dict[tuple[str, str], Histogram] = defaultdict(Histogram)
+        self.counters: dict[tuple[str, str], int] = defaultdict(int)
+        self.gauges: dict[tuple[str, str], Callable[[], float]] = {}
+        self.fps: dict[str, float] = {}
+        # Frames counted by this counter make up a camera's FPS.
+        self.fps_counter = "frames_written"
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.server: ThreadingHTTPServer | None = None
+        self.threads: list[threading.Thread] = []
+        self.logger = setup_logger(self.__class__.__name__)
+
+    def observe(self, stage: str, camera: str, seconds: float):
+        with self.lock:
+            self.histograms[stage, camera].observe(seconds)
+
+    @contextmanager
+    def time(self, stage: str, camera: str = "") -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, camera, time.perf_counter() - started)
+
+    def count(self, name: str, camera: str, amount: int = 1):
+        with self.lock:
+            self.counters[name, camera] += amount
+
+    def add_gauge(self, name: str, camera: str, read: Callable[[], float]):
+        """Register a gauge whose value is read when metrics are reported."""
+        self.gauges[name, camera] = read
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self.lock:
+            histograms = {
+                key: (list(h.counts), h.count, h.sum, h.buckets)
+                for key, h in self.histograms.items()
+            }
+            counters = dict(self.counters)
+            fps = dict(self.fps)
+
+        lines = [f"# TYPE {PREFIX}_stage_seconds histogram"]
+        for (stage, camera), (counts, count, total, buckets) in sorted(
+            histograms.items()
+        ):
+            labels = f'stage="{stage}",camera="{camera}"'
+            cumulative = 0
+            for bound, bucket_count in zip(buckets, counts):
+                cumulative += bucket_count
+                lines.append(
+                    f'{PREFIX}_stage_seconds_bucket{{{labels},le="{bound}"}} '
+                    f"{cumulative}"
+                )
+            lines.append(f'{PREFIX}_stage_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"{PREFIX}_stage_seconds_sum{{{labels}}} {total}")
+            lines.append(f"{PREFIX}_stage_seconds_count{{{labels}}} {count}")
+
+        for name in sorted({name for name, _ in counters}):
+            lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+            for (counter, camera), value in sorted(counters.items()):
+                if counter == name:
+                    lines.append(f'{PREFIX}_{name}_total{{camera="{camera}"}} {value}')
+
+        for name in sorted({name for name, _ in self.gauges}):
+            lines.append(f"# TYPE {PREFIX}_{name} gauge")
+            for (gauge, camera), read in sorted(self.gauges.items()):
+                if gauge == name:
+                    lines.append(f'{PREFIX}_{name}{{camera="{camera}"}} {read()}')
+
+        lines.append(f"# TYPE {PREFIX}_fps gauge")
+        for camera, value in sorted(fps.items()):
+            lines.append(f'{PREFIX}_fps{{camera="{camera}"}} {value:.2f}')
+        return "\n".join(lines) + "\n"
+
+    def summary(self, camera: str) -> str:
+        """One line describing a camera's throughput, latency and losses."""
+        with self.lock:
+            latency = self.histograms.get(("latency", camera), Histogram())
+            inference = self.histograms.get(("inference", ""), Histogram())
+            counters = {
+                name: value
+                for (name, cam), value in self.counters.items()
+                if cam == camera
+            }
+            fps = self.fps.get(camera, 0.0)
+        parts = [
+            f"{camera}: {fps:.1f} fps",
+            f"latency mean {latency.mean * 1000:.0f} ms "
+            f"p95 <= {latency.quantile(0.95) * 1000:.0f} ms",
+            f"inference p95 <= {inference.quantile(0.95) * 1000:.0f} ms",
+        ]
+        parts += [
+            f"{name} {read()}"
+            for (name, cam), read in sorted(self.gauges.items())
+            if cam == camera
+        ]
+        parts += [f"{name} {value}" for name, value in sorted(counters.items())]
+        return ", ".join(parts)
+
+    def start(self, cameras: list[str]):
+        """Start the metrics endpoint and summary log, if configured.
+
+        Args:
+            cameras (list[str]): Names of the cameras to report on
+        """
+        self.stopped.clear()
+        if self.port is not None:
+            self.server = ThreadingHTTPServer((self.host, self.port), self._handler())
+            self.threads.append(
+                threading.Thread(
+                    target=self.server.serve_forever, name="metrics", daemon=True
+                )
+            )
+            host, port = self.server.server_address[:2]
+            self.logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+        if self.port is not None or self.summary_interval is not None:
+            self.threads.append(
+                threading.Thread(
+                    target=self._report,
+                    args=(cameras,),
+                    name="metrics-report",
+                    daemon=True,
+                )
+            )
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        self.threads = []
+
+    def update_fps(self, cameras: list[str], elapsed: float, written: dict[str, int]):
+        """Set each camera's FPS from the frames counted since the last update.
+
+        Args:
+            cameras (list[str]): The cameras to update
+            elapsed (float): Seconds since the last update
+            written (dict[str, int]): Frames counted per camera at the last
+                update, updated in place
+        """
+        with self.lock:
+            for camera in cameras:
+                total = self.counters[self.fps_counter, camera]
+                self.fps[camera] = (total - written.get(camera, 0)) / elapsed
+                written[camera] = total
+
+    def _report(self, cameras: list[str]):
+        """Update FPS every FPS_INTERVAL and log summaries, if configured."""
+        written: dict[str, int] = {}
+        last = time.monotonic()
+        next_summary = (
+            last + self.summary_interval
+            if self.summary_interval is not None
+            else float("inf")
+        )
+        while not self.stopped.wait(
+            min(self.FPS_INTERVAL, max(next_summary - time.monotonic(), 0))
+        ):
+            now = time.monotonic()
+            if now > last:
+                self.update_fps(cameras, now - last, written)
+                last = now
+            if now >= next_summary:
+                next_summary = now + self.summary_interval
+                for camera in cameras:
+                    self.logger.info(self.summary(camera))
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return MetricsHandler
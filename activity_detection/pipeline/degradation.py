@@ -0,0 +1,194 @@
+import time
+
+import numpy as np
+
+from activity_detection.logging_config import setup_logger
+
+# What a step can change, and whether a higher value is the cheaper one.
+DEGRADABLE_SETTINGS = {
+    "input_size": False,
+    "inference_stride": True,
+    "target_fps": False,
+}
+
+DEFAULT_STEPS = (
+    {"input_size": 480},
+    {"input_size": 320},
+    {"inference_stride": 2},
+    {"inference_stride": 3},
+    {"target_fps": 10},
+    {"target_fps": 5},
+)
+
+
+class DegradationController:
+    def __init__(
+        self,
+        target_latency_ms: float,
+        steps: list[dict[str, int]] | None = None,
+        quantile: float = 0.95,
+        max_queue_fill: float = 0.5,
+        headroom: float = 0.5,
+        interval_s: float = 2.0,
+        recover_after_s: float = 10.0,
+    ):
+        """Trades detection quality for speed to hold a latency target.
+
+        Every interval_s it compares the quantile of the capture-to-prediction
+        latency, and how full the frame queues are, with the target. Over the
+        target, or with queues fuller than max_queue_fill, it takes one step
+        down the list of steps. Once latency and queue fill have both stayed
+        under headroom times their limits for recover_after_s, it takes one
+        step back up. The window right after a step is ignored, as it still
+        holds frames queued before it.
+
+        Steps are cumulative: at level n, the first n steps apply. Each step
+        sets some of input_size (the detector's resolution), inference_stride
+        and target_fps (of live cameras), and a setting is only ever made
+        cheaper than configured, never more expensive.
+
+        Args:
+            target_latency_ms (float): Latency to stay under
+            steps (list[dict[str, int]] | None): Steps from full quality to
+                the cheapest, defaulting to DEFAULT_STEPS
+            quantile (float): Latency quantile compared with the target
+            max_queue_fill (float): Queue fill, from 0 to 1, to stay under
+            headroom (float): Fraction of the limits to be under to recover
+            interval_s (float): Seconds between decisions
+            recover_after_s (float): Seconds with headroom before recovering
+        """
+        steps = [dict(step) for step in (DEFAULT_STEPS if steps is None else steps)]
+        if target_latency_ms <= 0:
+            raise ValueError("Target latency must be positive")
+        if not 0 < quantile <= 1:
+            raise ValueError("Quantile must be in (0, 1]")
+        if not 0 < max_queue_fill <= 1:
+            raise ValueError("Max queue fill must be in (0, 1]")
+        if not 0 < headroom < 1:
+            raise ValueError("Headroom must be in (0, 1)")
+        if interval_s <= 0:
+            raise ValueError("Interval must be positive")
+        if recover_after_s < 0:
+            raise ValueError("Recover after must not be negative")
+        for step in steps:
+            unknown = sorted(set(step) - set(DEGRADABLE_SETTINGS))
+            if unknown or not step:
+                raise ValueError(
+                    f"Invalid degradation step: {step}. Expected some of "
+                    f"{tuple(DEGRADABLE_SETTINGS)}"
+                )
+            if any(value <= 0 for value in step.values()):
+                raise ValueError(f"Invalid degradation step: {step}")
+        self.target_latency = target_latency_ms / 1000
+        self.steps = steps
+        self.quantile = quantile
+        self.max_queue_fill = max_queue_fill
+        self.headroom = headroom
+        self.interval = interval_s
+        self.recover_after = recover_after_s
+        self.level = 0
+        self.limits: dict[str, int] = {}
+        self.latencies: list[float] = []
+        self.next_decision: float | None = None
+        self.settling = False
+        self.calm_since: float | None = None
+        self.logger = setup_logger(self.__class__.__name__)
+
+    def disable(self, setting: str):
+        """Drop a setting from the steps, for pipelines that cannot change it.
+
+        Only to be called before the first step is taken.
+        """
+        if any(setting in step for step in self.steps):
+            self.logger.info(f"Not degrading {setting}, which cannot be changed")
+        steps = [
+            {name: value for name, value in step.items() if name != setting}
+            for step in self.steps
+        ]
+        self.steps = [step for step in steps if step]
+
+    def observe(self, latency_s: float):
+        """Record the latency of one frame the detector ran on."""
+        self.latencies.append(latency_s)
+
+    def update(self, queue_fill: float, now: float | None = None) -> bool:
+        """Decide whether to change level, at most once per interval.
+
+        Args:
+            queue_fill (float): How full the fullest frame queue is, 0 to 1
+            now (float | None): The current time.monotonic()
+
+        Returns:
+            bool: Whether the level changed
+        """
+        now = time.monotonic() if now is None else now
+        if self.next_decision is None:
+            self.next_decision = now + self.interval
+        if now < self.next_decision:
+            return False
+        self.next_decision = now + self.interval
+        latencies, self.latencies = self.latencies, []
+        if self.settling:
+            self.settling = False
+            return False
+        latency = float(np.quantile(latencies, self.quantile)) if latencies else 0.0
+
+        if latency > self.target_latency or queue_fill > self.max_queue_fill:
+            self.calm_since = None
+            if self.level == len(self.steps):
+                return False
+            self._set_level(self.level + 1, "Degrading", latency, queue_fill)
+            return True
+
+        if (
+            latency > self.target_latency * self.headroom
+            or queue_fill > self.max_queue_fill * self.headroom
+        ):
+            self.calm_since = None
+            return False
+        if self.calm_since is None:
+            self.calm_since = now
+        if self.level == 0 or now - self.calm_since < self.recover_after:
+            return False
+        self.calm_since = None
+        self._set_level(self.level - 1, "Restoring", latency, queue_fill)
+        return True
+
+    def _set_level(self, level: int, change: str, latency: float, queue_fill: float):
+        self.level = level
+        self.limits = {}
+        for step in self.steps[:level]:
+            # Combined with the limits so far, so a step never undoes another.
+            self.limits.update(self.degrade(step))
+        self.settling = True
+        self.logger.info(
+            f"{change} to level {level} of {len(self.steps)} "
+            f"(p{self.quantile * 100:.0f} latency {latency * 1000:.0f} ms, "
+            f"target {self.target_latency * 1000:.0f} ms, frame queues "
+            f"{queue_fill:.0%} full): "
+            + (
+                ", ".join(f"{name} {value}" for name, value in self.limits.items())
+                or "full quality"
+            )
+        )
+
+    def degrade(self, settings: dict[str, int | None]) -> dict[str, int | None]:
+        """Settings as they apply at the current level.
+
+        Args:
+            settings (dict[str, int | None]): Configured values of some of
+                the degradable settings. None values are left alone.
+
+        Returns:
+            dict[str, int | None]: The same settings, made no more expensive
+                than the current level allows
+        """
+        degraded = dict(settings)
+        for name, value in settings.items():
+            limit = self.limits.get(name)
+            if value is None or limit is None:
+                continue
+            degraded[name] = (
+                max(value, limit) if DEGRADABLE_SETTINGS[name] else min(value, limit)
+            )
+        return degraded
@@ -0,0 +1,60 @@
+from queue import Full, Queue
+
+QUEUE_POLICIES = ("drop_oldest", "latest", "drop_newest", "block")
+
+
+class FrameQueue(Queue):
+    def __init__(self, maxsize: int = 100, policy: str = "drop_oldest"):
+        """Bounded frame queue that decides what to lose when it is full.
+
+        - drop_oldest: discard the oldest waiting frame to make room
+        - latest: keep only the newest frame (drop_oldest with a size of 1)
+        - drop_newest: discard the incoming frame
+        - block: wait for room, so the camera itself falls behind
+
+        Dropping old frames keeps what reaches the detector recent, which
+        matters more than processing every frame when alerts must be timely.
+
+        Args:
+            maxsize (int): Maximum number of waiting frames
+            policy (str): One of QUEUE_POLICIES
+        """
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(
+                f"Invalid queue policy: {policy}. Expected one of {QUEUE_POLICIES}"
+            )
+        if maxsize < 1:
+            raise ValueError("Queue size must be at least 1")
+        super().__init__(1 if policy == "latest" else maxsize)
+        self.policy = policy
+        self.dropped = 0
+
+    def push(self, item) -> bool:
+        """Add an item according to the queue policy.
+
+        Returns:
+            bool: Whether the queue grew by one item. It does not grow when an
+                item is dropped, whether that is the new or the oldest one.
+        """
+        if self.policy == "block":
+            self.put(item)
+            return True
+        if self.policy == "drop_newest":
+            try:
+                self.put_nowait(item)
+                return True
+            except Full:
+                self.dropped += 1
+                return False
+
+        # Swap under the queue's own lock, so a consumer never sees the
+        # queue briefly emptied between dropping a frame and adding one.
+        with self.not_full:
+            grew = self._qsize() < self.maxsize
+            if not grew:
+                self._get()
+                self.dropped += 1
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+        return grew
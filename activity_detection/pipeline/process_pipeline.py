@@ -0,0 +1,379 @@
+import multiprocessing
+import signal
+import threading
+import time
+from dataclasses import dataclass
+from multiprocessing.connection import wait
+from queue import Empty
+from typing import Any
+
+import numpy as np
+
+from activity_detection.activity_manager import ActivityManager, CameraStream
+from activity_detection.classifiers.types import Prediction
+from activity_detection.inputs.camera_input import EndOfStream
+from activity_detection.logging_config import (
+    configure_logging,
+    every,
+    setup_logger,
+)
+from activity_detection.metrics import PipelineMetrics
+from activity_detection.pipeline.shared_frames import SharedFrameRing
+from activity_detection.startup import startup
+
+
+@dataclass
+class CameraChannels:
+    """The shared frame ring and queues connecting one camera's processes.
+
+    Slot indices circulate capture -> detection -> recording -> capture:
+    free_slots holds slots capture may write to, frame_slots carries
+    (slot, shape, capture time) to detection and processed carries
+    (slot, shape, prediction) to recording, which returns the slot to
+    free_slots once it is done.
+    """
+
+    ring: SharedFrameRing
+    free_slots: Any
+    frame_slots: Any
+    processed: Any
+
+
+class SharedFrameQueue:
+    def __init__(self, channels: CameraChannels):
+        """Stands in for both of a CameraStream's queues in the detection
+        process, so ActivityManager.process_frames can run unchanged.
+
+        Frames are handed out as views into the shared ring, and processed
+        frames are passed on by slot index rather than by value.
+
+        Args:
+            channels (CameraChannels): The camera's ring and queues
+        """
+        self.channels = channels
+        # Maps each frame view handed out to the slot it lives in.
+        self.slots: dict[int, int] = {}
+
+    def get_nowait(self) -> tuple[float, np.ndarray]:
+        # frame_slots is a SimpleQueue, which is written synchronously before
+        # the frame semaphore is released, so empty() is reliable here.
+        if self.channels.frame_slots.empty():
+            raise Empty
+        slot, shape, captured_at = self.channels.frame_slots.get()
+        frame = self.channels.ring.view(slot, shape)
+        self.slots[id(frame)] = slot
+        return captured_at, frame
+
+    def put_nowait(self, item: tuple[np.ndarray, Prediction]):
+        frame, prediction = item
+        slot = self.slots.pop(id(frame))
+        self.channels.processed.put((slot, frame.shape, prediction))
+
+
+def _ignore_interrupts():
+    # Ctrl+C reaches every process in the group. Only the parent handles it,
+    # then shuts the children down in order.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _capture_frames(
+    config: dict[str, Any],
+    camera_config: dict[str, Any],
+    channels: CameraChannels,
+    frames_available,
+    stop_event,
+):
+    _ignore_interrupts()
+    configure_logging(**config.get("logging", {}))
+    logger = setup_logger(f"capture-{camera_config['name']}")
+    camera_input = ActivityManager.create_from_config(
+        "camera_input", camera_config["camera_input"]
+    )
+    camera_input.start_capture()
+    try:
+        while not stop_event.is_set():
+            try:
+                # The capture time is from time.monotonic(), which is
+                # system-wide, so the detection process can compare it.
+                frame, captured_at = camera_input.get_frame_with_timestamp()
+            except EndOfStream:
+                logger.info("No more frames")
+                return
+            if channels.free_slots.empty():
+                logger.warning("No free frame slots. Skipping frame.", extra=every(5))
+                continue
+            slot = channels.free_slots.get()
+            shape = channels.ring.write(slot, frame)
+            if shape is None:
+                channels.free_slots.put(slot)
+                logger.warning(
+                    f"Frame of shape {frame.shape} does not fit in a frame slot. "
+                    "Increase process_pipeline.max_frame_shape.",
+                    extra=every(5),
+                )
+                continue
+            channels.frame_slots.put((slot, shape, captured_at))
+            frames_available.release()
+    finally:
+        camera_input.stop_capture()
+        channels.ring.close()
+
+
+def _drain_when_set(manager: ActivityManager, drain_event):
+    """Let process_frames finish the queued frames and return once
+    drain_event is set, as ActivityManager.shutdown does for its thread."""
+    drain_event.wait()
+    manager.drain_deadline = time.monotonic() + manager.drain_timeout
+    manager.draining = True
+    # Wakes the processing loop once the frame queues are empty.
+    manager.frames_available.release()
+
+
+def _detect_activity(
+    config: dict[str, Any],
+    channels: dict[str, CameraChannels],
+    frames_available,
+    drain_event,
+):
+    _ignore_interrupts()
+    configure_logging(**config.get("logging", {}))
+    cameras = []
+    for camera_config in ActivityManager.camera_configs(config):
+        # Capture and recording happen in their own processes, so the
+        # camera only needs its frame gating state here.
+        camera = CameraStream(
+            camera_config["name"],
+            None,
+            None,
+            *ActivityManager.frame_gating_from_config(config, camera_config),
+        )
+        queue = SharedFrameQueue(channels[camera.name])
+        camera.frame_queue = queue
+        camera.processed_frame_queue = queue
+        cameras.append(camera)
+
+    manager = ActivityManager(
+        cameras,
+        ActivityManager.create_from_config(
+            "image_processor", config["image_processor"]
+        ),
+        ActivityManager.create_from_config(
+            "activity_detector", config["activity_detector"]
+        ),
+        metrics=PipelineMetrics(**config.get("metrics", {})),
+        # Its cameras have no frame rate to lower, as capture happens in
+        # other processes, so ActivityManager leaves target_fps alone.
+        degradation=ActivityManager.degradation_from_config(config),
+        **config.get("activity_manager", {}),
+    )
+    manager.frames_available = frames_available
+    # The detection process loads the model, so its startup is the slow one.
+    startup.mark("components")
+    manager.warm_up()
+    startup.mark("warm-up")
+    manager.logger.info(startup.report())
+    # Capture and write timings are taken in the other processes and are not
+    # reported here, and FPS counts the frames handed to the recorders.
+    manager.metrics.fps_counter = "frames_processed"
+    manager.metrics.start([camera.name for camera in cameras])
+    threading.Thread(
+        target=_drain_when_set, args=(manager, drain_event), daemon=True
+    ).start()
+    try:
+        manager.process_frames()
+    finally:
+        manager.metrics.stop()
+
+
+def _record_video(
+    config: dict[str, Any],
+    camera_config: dict[str, Any],
+    channels: CameraChannels,
+    stop_event,
+):
+    _ignore_interrupts()
+    configure_logging(**config.get("logging", {}))
+    # SQLite allows one writer at a time, but WAL mode lets the recording
+    # processes each keep their own connection to the same database.
+    event_store = ActivityManager.event_store_from_config(config)
+    security_module = ActivityManager.security_module_from_config(
+        config, camera_config, event_store
+    )
+    try:
+        # Keeps going until stop_event is set and every processed frame is
+        # written, so recordings get the frames detection drained.
+        while True:
+            try:
+                slot, shape, prediction = channels.processed.get(timeout=0.5)
+            except Empty:
+                if stop_event.is_set():
+                    break
+                continue
+            security_module.process_frame(channels.ring.view(slot, shape), prediction)
+            channels.free_slots.put(slot)
+    finally:
+        security_module.close()
+        if event_store:
+            event_store.close()
+        channels.ring.close()
+
+
+class ProcessPipeline:
+    JOIN_TIMEOUT = 10
+
+    def __init__(
+        self,
+        config: dict[str, Any],
+        ring_slots: int = 8,
+        max_frame_shape: tuple[int, ...] = (1080, 1920, 3),
+    ):
+        """Run capture, detection and recording in separate processes.
+
+        Every camera gets a capture and a recording process, and one detection
+        process runs the shared detector for all cameras, so decoding,
+        inference and drawing/encoding no longer contend for one GIL. Frames
+        stay in a shared-memory ring of ring_slots fixed-size slots per camera
+        and only slot indices and predictions go through queues. When every
+        slot is in use, capture drops frames rather than wait.
+
+        Each process builds its own components from the same config as
+        ActivityManager.from_config.
+
+        Args:
+            config (dict[str, Any]): The parsed config file
+            ring_slots (int): Frame slots per camera
+            max_frame_shape (tuple[int, ...]): Largest (height, width,
+                channels) frame a slot can hold
+        """
+        if ring_slots < 1:
+            raise ValueError("Ring slots must be at least 1")
+        camera_configs = ActivityManager.camera_configs(config)
+        names = [camera_config["name"] for camera_config in camera_configs]
+        if len(set(names)) != len(names):
+            raise ValueError("Camera names must be unique")
+
+        self.config = config
+        self.camera_configs = camera_configs
+        # Spawned rather than forked so no process inherits model weights or
+        # another process's threads and locks.
+        self.context = multiprocessing.get_context("spawn")
+        # Set in this order on shutdown: capture stops, detection finishes
+        # the captured frames, then recording finishes the processed ones.
+        self.stop_event = self.context.Event()
+        self.drain_event = self.context.Event()
+        self.detection_stopped = self.context.Event()
+        self.frames_available = self.context.Semaphore(0)
+        self.channels: dict[str, CameraChannels] = {}
+        for name in names:
+            free_slots = self.context.SimpleQueue()
+            for slot in range(ring_slots):
+                free_slots.put(slot)
+            self.channels[name] = CameraChannels(
+                ring=SharedFrameRing.create(ring_slots, tuple(max_frame_shape)),
+                free_slots=free_slots,
+                frame_slots=self.context.SimpleQueue(),
+                processed=self.context.Queue(),
+            )
+        self.logger = setup_logger(self.__class__.__name__)
+
+    def run_activity_detection(self):
+        self.logger.info(startup.report())
+        capture = []
+        recording = []
+        for camera_config in self.camera_configs:
+            name = camera_config["name"]
+            capture.append(
+                self.context.Process(
+                    target=_capture_frames,
+                    args=(
+                        self.config,
+                        camera_config,
+                        self.channels[name],
+                        self.frames_available,
+                        self.stop_event,
+                    ),
+                    name=f"capture-{name}",
+                )
+            )
+            recording.append(
+                self.context.Process(
+                    target=_record_video,
+                    args=(
+                        self.config,
+                        camera_config,
+                        self.channels[name],
+                        self.detection_stopped,
+                    ),
+                    name=f"record-{name}",
+                )
+            )
+        detection = self.context.Process(
+            target=_detect_activity,
+            args=(
+                self.config,
+                self.channels,
+                self.frames_available,
+                self.drain_event,
+            ),
+            name="detect",
+            daemon=True,
+        )
+        processes = [detection, *capture, *recording]
+
+        try:
+            for process in processes:
+                process.start()
+            self._wait_for_capture(processes, capture)
+        except KeyboardInterrupt:
+            self.logger.info("Interrupted by user. Stopping the program.")
+        finally:
+            # Stop capture first so no new frames arrive, then let detection
+            # finish the frames already captured, then let the recorders
+            # finish their videos.
+            self.stop_event.set()
+            self._join(capture)
+            self.drain_event.set()
+            self._join([detection])
+            self.detection_stopped.set()
+            self._join(recording)
+            for channels in self.channels.values():
+                channels.ring.close()
+                channels.ring.unlink()
+            self.logger.info("Activity detection stopped.")
+
+    def _wait_for_capture(self, processes: list, capture: list):
+        """Wait until every capture process has run out of frames, or any
+        process has failed or stopped early, as the rest cannot carry on
+        without it."""
+        running = list(processes)
+        while any(process in running for process in capture):
+            wait([process.sentinel for process in running])
+            finished = [process for process in running if process.exitcode is not None]
+            for process in finished:
+                running.remove(process)
+                if process.exitcode == 0:
+                    self.logger.info(f"{process.name} finished")
+                else:
+                    self.logger.error(
+                        f"{process.name} exited with code {process.exitcode}"
+                    )
+            if any(
+                process.exitcode != 0 or process not in capture for process in finished
+            ):
+                return
+
+    def _join(self, processes: list):
+        for process in processes:
+            if process.pid is None:
+                continue
+            process.join(timeout=self.JOIN_TIMEOUT)
+            if process.is_alive():
+                self.logger.error(
+                    f"{process.name} did not stop in time. Terminating it."
+                )
+                process.terminate()
+                process.join()
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]):
+        return cls(config, **config.get("process_pipeline", {}))
@@ -0,0 +1,79 @@
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+
+class SharedFrameRing:
+    def __init__(self, shared_memory: SharedMemory, slots: int, slot_bytes: int):
+        """Fixed-size frame slots in a block of shared memory.
+
+        Processes exchange frames by slot index: the writer copies a frame into
+        a free slot and the readers map the same slot as a NumPy view, so frame
+        data never goes through a pipe. Use create() in the owning process and
+        attach() everywhere else.
+
+        Args:
+            shared_memory (SharedMemory): The block holding every slot
+            slots (int): Number of slots
+            slot_bytes (int): Size of one slot, the largest frame it can hold
+        """
+        self.shared_memory = shared_memory
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.buffer = np.ndarray(
+            (slots, slot_bytes), dtype=np.uint8, buffer=shared_memory.buf
+        )
+
+    @classmethod
+    def create(cls, slots: int, max_frame_shape: tuple[int, ...]) -> "SharedFrameRing":
+        if slots < 1:
+            raise ValueError("A frame ring needs at least one slot")
+        slot_bytes = int(np.prod(max_frame_shape))
+        if slot_bytes < 1:
+            raise ValueError(f"Invalid frame shape: {max_frame_shape}")
+        shared_memory = SharedMemory(create=True, size=slots * slot_bytes)
+        return cls(shared_memory, slots, slot_bytes)
+
+    @classmethod
+    def attach(cls, name: str, slots: int, slot_bytes: int) -> "SharedFrameRing":
+        return cls(SharedMemory(name=name), slots, slot_bytes)
+
+    def __reduce__(self):
+        # Other processes attach to the same block instead of receiving a
+        # copy of its contents.
+        return SharedFrameRing.attach, (self.name, self.slots, self.slot_bytes)
+
+    @property
+    def name(self) -> str:
+        return self.shared_memory.name
+
+    def write(self, slot: int, frame: np.ndarray) -> tuple[int, ...] | None:
+        """Copy a uint8 frame into a slot.
+
+        Args:
+            slot (int): The slot to overwrite
+            frame (np.ndarray): The frame to store
+
+        Returns:
+            tuple[int, ...] | None: The frame's shape, needed to read it back,
+                or None if the frame does not fit in a slot
+        """
+        if frame.dtype != np.uint8 or frame.nbytes > self.slot_bytes:
+            return None
+        np.copyto(self.view(slot, frame.shape), frame)
+        return frame.shape
+
+    def view(self, slot: int, shape: tuple[int, ...]) -> np.ndarray:
+        """Map the frame stored in a slot without copying it.
+
+        The view is only valid until the slot is written again.
+        """
+        return self.buffer[slot, : int(np.prod(shape))].reshape(shape)
+
+    def close(self):
+        # Views into the block must be released before it can be closed.
+        self.buffer = None
+        self.shared_memory.close()
+
+    def unlink(self):
+        self.shared_memory.unlink()
@@ -1,17 +1,95 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, replace
 
 import cv2
 from PIL import Image
 import numpy as np
 
+from activity_detection.classifiers.types import Prediction
+
+
+@dataclass(frozen=True)
+class BoxTransform:
+    """Maps boxes from processed-image coordinates back to the source frame.
+
+    A processed image is the source frame scaled by (scale_x, scale_y) and
+    then offset by (pad_x, pad_y).
+    """
+
+    scale_x: float = 1.0
+    scale_y: float = 1.0
+    pad_x: float = 0.0
+    pad_y: float = 0.0
+    source_size: tuple[int, int] | None = None
+
+    def apply(self, prediction: Prediction) -> Prediction:
+        """Return the prediction with its boxes in source frame coordinates.
+
+        Args:
+            prediction (Prediction): Prediction on the processed image
+
+        Returns:
+            Prediction: The same prediction mapped onto the source frame
+        """
+        detections = prediction.detections
+        if len(detections) == 0:
+            return prediction
+
+        offset = np.array(
+            [self.pad_x, self.pad_y, self.pad_x, self.pad_y], dtype=np.float32
+        )
+        scale = np.array(
+            [self.scale_x, self.scale_y, self.scale_x, self.scale_y],
+            dtype=np.float32,
+        )
+        xyxy = (detections.xyxy - offset) / scale
+        if self.source_size:
+            width, height = self.source_size
+            np.clip(xyxy, 0, [width, height, width, height], out=xyxy)
+        return replace(prediction, detections=replace(detections, xyxy=xyxy))
+
 
 class ImageProcessingInterface(ABC):
     @abstractmethod
     def process_frame(self, frame) -> Image:
         pass
 
+    def get_transform(self, frame: np.ndarray) -> BoxTransform:
+        """Describe how process_frame maps this frame's coordinates.
+
+        Args:
+            frame (np.ndarray): The input frame
+
+        Returns:
+            BoxTransform: Transform from processed-image to frame coordinates
+        """
+        return BoxTransform()
+
+    def configure(self, input_size: int | None, max_batch_size: int):
+        """Adapt the processor to the detector it feeds.
+
+        Called once before processing starts. Processors that reuse output
+        buffers must keep at least max_batch_size of them, since a whole
+        batch is processed before the detector runs.
+
+        Args:
+            input_size (int | None): The detector's input size, if it has one
+            max_batch_size (int): The largest batch the detector will receive
+        """
+        pass
+
+    def set_input_size(self, input_size: int):
+        """Follow a change of the detector's input size while running.
+
+        Args:
+            input_size (int): The detector's new input size
+        """
+        pass
+
 
 class DefaultImageProcessor(ImageProcessingInterface):
+    OUTPUT_SIZE = (1920, 1080)
+
     def process_frame(self, frame: np.ndarray) -> Image:
         """Pre-process the frame from an array into an image.
 
@@ -24,8 +102,126 @@ class DefaultImageProcessor(ImageProcessingInterface):
         image = self._preprocess_frame(frame)
         return image
 
+    def get_transform(self, frame: np.ndarray) -> BoxTransform:
+        height, width = frame.shape[:2]
+        output_width, output_height = self.OUTPUT_SIZE
+        return BoxTransform(
+            scale_x=output_width / width,
+            scale_y=output_height / height,
+            source_size=(width, height),
+        )
+
     @staticmethod
     def _preprocess_frame(frame: np.ndarray) -> Image:
         image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-        image = image.resize((1920, 1080))
+        image = image.resize(DefaultImageProcessor.OUTPUT_SIZE)
         return image
+
+
+class LetterboxImageProcessor(ImageProcessingInterface):
+    def __init__(
+        self,
+        input_size: int | None = None,
+        stride: int = 32,
+        pad_value: int = 114,
+        num_buffers: int = 4,
+    ):
+        """Letterbox frames straight to the detector's input size.
+
+        Frames are resized once, keeping their aspect ratio, into reusable
+        NumPy buffers padded up to a multiple of stride. The output stays in
+        BGR channel order, which is what YOLO models expect from arrays, so
+        there is no colour conversion or PIL round-trip. Use with the YOLO
+        detectors; Moondream needs PIL images.
+
+        The returned array is a view of an internal buffer that is reused
+        after num_buffers further calls.
+
+        Args:
+            input_size (int | None): Length of the longest output side.
+                Defaults to the detector's input size, or 640.
+            stride (int): Output sides are padded up to a multiple of this
+            pad_value (int): Grey level used for the padding
+            num_buffers (int): Number of output buffers to rotate through
+        """
+        self.input_size = input_size
+        self.stride = stride
+        self.pad_value = pad_value
+        self.num_buffers = num_buffers
+        self._buffers: dict[tuple[int, int], list[np.ndarray]] = {}
+        self._next_buffer = 0
+
+    def configure(self, input_size: int | None, max_batch_size: int):
+        if self.input_size is None:
+            self.input_size = input_size
+        if self.num_buffers < max_batch_size:
+            self.num_buffers = max_batch_size
+            self._buffers.clear()
+
+    def set_input_size(self, input_size: int):
+        self.input_size = input_size
+        self._buffers.clear()
+
+    def process_frame(self, frame: np.ndarray) -> np.ndarray:
+        """Letterbox the frame into a reusable buffer.
+
+        Args:
+            frame (np.ndarray): The input BGR frame to process
+
+        Returns:
+            np.ndarray: The letterboxed BGR image
+        """
+        height, width = frame.shape[:2]
+        resized_width, resized_height, pad_x, pad_y, padded_shape = self._geometry(
+            width, height
+        )
+        buffer = self._get_buffer(padded_shape)
+        cv2.resize(
+            frame,
+            (resized_width, resized_height),
+            dst=buffer[pad_y : pad_y + resized_height, pad_x : pad_x + resized_width],
+            interpolation=cv2.INTER_AREA if resized_width < width else cv2.INTER_LINEAR,
+        )
+        return buffer
+
+    def get_transform(self, frame: np.ndarray) -> BoxTransform:
+        height, width = frame.shape[:2]
+        resized_width, resized_height, pad_x, pad_y, _ = self._geometry(width, height)
+        return BoxTransform(
+            scale_x=resized_width / width,
+            scale_y=resized_height / height,
+            pad_x=pad_x,
+            pad_y=pad_y,
+            source_size=(width, height),
+        )
+
+    def _geometry(self, width: int, height: int) -> tuple:
+        input_size = self.input_size or 640
+        scale = input_size / max(width, height)
+        resized_width = max(1, round(width * scale))
+        resized_height = max(1, round(height * scale))
+        padded_width = -(-resized_width // self.stride) * self.stride
+        padded_height = -(-resized_height // self.stride) * self.stride
+        pad_x = (padded_width - resized_width) // 2
+        pad_y = (padded_height - resized_height) // 2
+        return (
+            resized_width,
+            resized_height,
+            pad_x,
+            pad_y,
+            (padded_height, padded_width),
+        )
+
+    def _get_buffer(self, shape: tuple[int, int]) -> np.ndarray:
+        buffers = self._buffers.get(shape)
+        if buffers is None:
+            # The padding never changes for a given geometry, so it is only
+            # filled in once when the buffers are allocated.
+            buffers = [
+                np.full((*shape, 3), self.pad_value, dtype=np.uint8)
+                for _ in range(self.num_buffers)
+            ]
+            self._buffers[shape] = buffers
+        buffer = buffers[self._next_buffer % len(buffers)]
+        self._next_buffer += 1
+        return buffer
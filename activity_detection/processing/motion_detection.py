@@ -0,0 +1,95 @@
+from abc import ABC, abstractmethod
+
+import cv2
+import numpy as np
+
+
+class MotionDetectionInterface(ABC):
+    def __init__(self, max_skip_frames: int = 30):
+        if max_skip_frames < 0:
+            raise ValueError("Max skip frames must not be negative")
+        self.max_skip_frames = max_skip_frames
+        self.frames_since_detection = 0
+        self.inferences_run = 0
+        self.inferences_skipped = 0
+
+    @abstractmethod
+    def detect_motion(self, frame: np.ndarray) -> bool:
+        pass
+
+    def should_run_detector(self, frame: np.ndarray) -> bool:
+        """Decide whether the activity detector needs to see this frame.
+
+        Frames without motion are skipped, but never more than max_skip_frames
+        in a row so a motionless person is still re-checked periodically.
+
+        Args:
+            frame (np.ndarray): The raw BGR frame from the camera
+
+        Returns:
+            bool: True if the detector should run on the frame
+        """
+        motion = self.detect_motion(frame)
+        if motion or self.frames_since_detection >= self.max_skip_frames:
+            self.frames_since_detection = 0
+            self.inferences_run += 1
+            return True
+        self.frames_since_detection += 1
+        self.inferences_skipped += 1
+        return False
+
+
+class FrameDifferenceMotionDetector(MotionDetectionInterface):
+    def __init__(
+        self,
+        min_changed_fraction: float = 0.01,
+        pixel_threshold: int = 25,
+        max_skip_frames: int = 30,
+        downscale_width: int = 160,
+        background_rate: float = 0.05,
+    ):
+        """Motion detector comparing a downscaled grayscale frame against a
+        running background model.
+
+        Args:
+            min_changed_fraction (float): Fraction of pixels that must change
+                for the frame to count as motion. Lower is more sensitive.
+            pixel_threshold (int): Grayscale difference (0-255) above which a
+                pixel counts as changed
+            max_skip_frames (int): Maximum number of consecutive frames to skip
+            downscale_width (int): Width frames are shrunk to before comparing
+            background_rate (float): How quickly the background model adapts
+                to the current frame (0-1)
+        """
+        super().__init__(max_skip_frames)
+        self.min_changed_fraction = min_changed_fraction
+        self.pixel_threshold = pixel_threshold
+        self.downscale_width = downscale_width
+        self.background_rate = background_rate
+        self.background = None
+
+    def detect_motion(self, frame: np.ndarray) -> bool:
+        gray = self._downscale(frame)
+        if self.background is None or self.background.shape != gray.shape:
+            self.background = gray.astype(np.float32)
+            return True
+
+        difference = cv2.absdiff(gray, cv2.convertScaleAbs(self.background))
+        changed_fraction = (
+            np.count_nonzero(difference > self.pixel_threshold) / difference.size
+        )
+        cv2.accumulateWeighted(gray, self.background, self.background_rate)
+        return bool(changed_fraction >= self.min_changed_fraction)
+
+    def _downscale(self, frame: np.ndarray) -> np.ndarray:
+        height, width = frame.shape[:2]
+        scale = self.downscale_width / width
+        if scale < 1:
+            frame = cv2.resize(
+                frame,
+                (self.downscale_width, max(1, round(height * scale))),
+                interpolation=cv2.INTER_AREA,
+            )
+        if frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(frame, (5, 5), 0)
@@ -0,0 +1,192 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from activity_detection.classifiers.types import Detections, Prediction
+
+
+class ObjectTrackingInterface(ABC):
+    @abstractmethod
+    def update(self, prediction: Prediction) -> Prediction:
+        """Feed a fresh detector prediction for the current frame.
+
+        Args:
+            prediction (Prediction): The detector's prediction
+
+        Returns:
+            Prediction: The prediction with a stable track ID per box
+        """
+        pass
+
+    @abstractmethod
+    def predict(self) -> Prediction:
+        """Advance one frame without a detector result.
+
+        Returns:
+            Prediction: The tracked boxes propagated to the current frame
+        """
+        pass
+
+
+def box_iou(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """Pairwise intersection over union of two sets of xyxy boxes.
+
+    Args:
+        boxes_a (np.ndarray): Boxes of shape (N, 4)
+        boxes_b (np.ndarray): Boxes of shape (M, 4)
+
+    Returns:
+        np.ndarray: IoU matrix of shape (N, M)
+    """
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    area_a = np.prod(boxes_a[:, 2:] - boxes_a[:, :2], axis=1)
+    area_b = np.prod(boxes_b[:, 2:] - boxes_b[:, :2], axis=1)
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return np.divide(
+        intersection, union, out=np.zeros_like(intersection), where=union > 0
+    )
+
+
+class IoUTracker(ObjectTrackingInterface):
+    def __init__(self, iou_threshold: float = 0.3, max_missed: int = 3):
+        """Multi-object tracker associating boxes by IoU with a constant
+        velocity motion model.
+
+        Track state is kept as parallel NumPy arrays. Between detector runs
+        boxes are extrapolated from each track's last detection and velocity.
+
+        Args:
+            iou_threshold (float): Minimum IoU for a detection to continue a
+                track
+            max_missed (int): Number of consecutive detector runs a track may
+                go unmatched before it is dropped
+        """
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.frame_index = 0
+        self.next_track_id = 0
+        self.detected = False
+        self.track_ids = np.empty(0, dtype=np.int64)
+        self.last_boxes = np.empty((0, 4), dtype=np.float32)
+        self.last_frames = np.empty(0, dtype=np.int64)
+        self.velocities = np.empty((0, 4), dtype=np.float32)
+        self.confidences = np.empty(0, dtype=np.float32)
+        self.class_ids = np.empty(0, dtype=np.int64)
+        self.missed = np.empty(0, dtype=np.int64)
+
+    def update(self, prediction: Prediction) -> Prediction:
+        self.frame_index += 1
+        self.detected = prediction.detected
+        detections = prediction.detections
+        boxes = detections.xyxy
+        estimates = self._estimate_boxes()
+        matched_tracks, matched_detections = self._associate(estimates, boxes)
+
+        elapsed = (self.frame_index - self.last_frames[matched_tracks])[:, None]
+        self.velocities[matched_tracks] = (
+            boxes[matched_detections] - self.last_boxes[matched_tracks]
+        ) / elapsed
+        self.last_boxes[matched_tracks] = boxes[matched_detections]
+        self.last_frames[matched_tracks] = self.frame_index
+        self.confidences[matched_tracks] = detections.confidence[matched_detections]
+        self.class_ids[matched_tracks] = detections.class_id[matched_detections]
+        self.missed[matched_tracks] = 0
+
+        unmatched_tracks = np.ones(len(self.track_ids), dtype=bool)
+        unmatched_tracks[matched_tracks] = False
+        self.missed[unmatched_tracks] += 1
+
+        detection_track_ids = np.empty(len(detections), dtype=np.int64)
+        detection_track_ids[matched_detections] = self.track_ids[matched_tracks]
+        new_detections = np.ones(len(detections), dtype=bool)
+        new_detections[matched_detections] = False
+        new_ids = self._start_tracks(detections[new_detections])
+        detection_track_ids[new_detections] = new_ids
+
+        self._drop_lost_tracks()
+        return Prediction(
+            detected=prediction.detected,
+            detections=Detections(
+                xyxy=boxes,
+                confidence=detections.confidence,
+                class_id=detections.class_id,
+                track_id=detection_track_ids,
+            ),
+            confidence=prediction.confidence,
+        )
+
+    def predict(self) -> Prediction:
+        self.frame_index += 1
+        visible = self.missed == 0
+        return Prediction(
+            detected=self.detected,
+            detections=Detections(
+                xyxy=self._estimate_boxes()[visible],
+                confidence=self.confidences[visible],
+                class_id=self.class_ids[visible],
+                track_id=self.track_ids[visible],
+            ),
+        )
+
+    def _estimate_boxes(self) -> np.ndarray:
+        elapsed = (self.frame_index - self.last_frames)[:, None]
+        return (self.last_boxes + self.velocities * elapsed).astype(np.float32)
+
+    def _associate(
+        self, estimates: np.ndarray, detections: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Greedily match tracks to detections in order of decreasing IoU."""
+        if len(estimates) == 0 or len(detections) == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+
+        iou = box_iou(estimates, detections)
+        track_indices, detection_indices = np.nonzero(iou >= self.iou_threshold)
+        order = np.argsort(-iou[track_indices, detection_indices], kind="stable")
+
+        matched_tracks, matched_detections = [], []
+        used_tracks, used_detections = set(), set()
+        for track, detection in zip(
+            track_indices[order].tolist(), detection_indices[order].tolist()
+        ):
+            if track in used_tracks or detection in used_detections:
+                continue
+            used_tracks.add(track)
+            used_detections.add(detection)
+            matched_tracks.append(track)
+            matched_detections.append(detection)
+        return (
+            np.array(matched_tracks, dtype=np.int64),
+            np.array(matched_detections, dtype=np.int64),
+        )
+
+    def _start_tracks(self, detections: Detections) -> np.ndarray:
+        count = len(detections)
+        new_ids = np.arange(
+            self.next_track_id, self.next_track_id + count, dtype=np.int64
+        )
+        self.next_track_id += count
+        self.track_ids = np.concatenate([self.track_ids, new_ids])
+        self.last_boxes = np.concatenate([self.last_boxes, detections.xyxy])
+        self.last_frames = np.concatenate(
+            [self.last_frames, np.full(count, self.frame_index, dtype=np.int64)]
+        )
+        self.velocities = np.concatenate(
+            [self.velocities, np.zeros((count, 4), dtype=np.float32)]
+        )
+        self.confidences = np.concatenate([self.confidences, detections.confidence])
+        self.class_ids = np.concatenate([self.class_ids, detections.class_id])
+        self.missed = np.concatenate([self.missed, np.zeros(count, dtype=np.int64)])
+        return new_ids
+
+    def _drop_lost_tracks(self):
+        keep = self.missed <= self.max_missed
+        self.track_ids = self.track_ids[keep]
+        self.last_boxes = self.last_boxes[keep]
+        self.last_frames = self.last_frames[keep]
+        self.velocities = self.velocities[keep]
+        self.confidences = self.confidences[keep]
+        self.class_ids = self.class_ids[keep]
+        self.missed = self.missed[keep]
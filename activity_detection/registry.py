@@ -0,0 +1,102 @@
+import importlib
+from importlib.metadata import entry_points
+
+from activity_detection.logging_config import setup_logger
+from activity_detection.startup import startup
+
+# Plugins register components under this entry point group, named
+# "<component type>.<class name>", e.g. in pyproject.toml:
+#
+#   [tool.poetry.plugins."activity_detection.components"]
+#   "activity_detector.MyDetector" = "my_package.detectors:MyDetector"
+ENTRY_POINT_GROUP = "activity_detection.components"
+
+
+def _paths(module: str, *names: str) -> dict[str, str]:
+    """Import paths of classes in an activity_detection module."""
+    return {name: f"activity_detection.{module}:{name}" for name in names}
+
+
+# Components are listed by import path and only imported once a config asks
+# for them, so a YOLO config never loads transformers and a Moondream config
+# never loads ultralytics. Classes may also be registered directly.
+COMPONENT_MAPPING: dict[str, dict[str, str | type]] = {
+    "camera_input": _paths(
+        "inputs.camera_input", "IPCamera", "LocalCamera", "VideoFileInput"
+    ),
+    "image_processor": _paths(
+        "processing.image_processing",
+        "DefaultImageProcessor",
+        "LetterboxImageProcessor",
+    ),
+    "motion_detector": _paths(
+        "processing.motion_detection", "FrameDifferenceMotionDetector"
+    ),
+    "object_tracker": _paths("processing.tracking", "IoUTracker"),
+    "activity_detector": {
+        **_paths(
+            "classifiers.yolo_classifiers",
+            "YOLOActivityDetector",
+            "YOLOWorldActivityDetector",
+        ),
+        **_paths("classifiers.moondream_classifier", "MoondreamActivityDetector"),
+        **_paths("classifiers.cascade", "CascadeActivityDetector"),
+        **_paths("classifiers.remote", "RemoteActivityDetector"),
+    },
+    "security_logging": _paths("security.security_logging", "DefaultSecurityLogging"),
+    "event_store": _paths("security.event_store", "SQLiteEventStore"),
+    "video_capture": _paths(
+        "security.security_capture", "DefaultVideoCapture", "ProcessVideoCapture"
+    ),
+}
+
+logger = setup_logger("registry")
+_plugins_loaded = False
+
+
+def load_plugins():
+    """Add the components registered by installed plugins.
+
+    Only the entry point metadata is read here. Plugin classes are imported
+    when they are first used, like the built-in ones, and never replace a
+    built-in component of the same name.
+    """
+    global _plugins_loaded
+    if _plugins_loaded:
+        return
+    _plugins_loaded = True
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        component_type, _, class_name = entry_point.name.partition(".")
+        if component_type not in COMPONENT_MAPPING or not class_name:
+            logger.warning(f"Ignoring plugin with invalid name: {entry_point.name}")
+            continue
+        if class_name in COMPONENT_MAPPING[component_type]:
+            logger.warning(
+                f"Ignoring plugin {entry_point.value}: {component_type} "
+                f"{class_name} already exists"
+            )
+            continue
+        COMPONENT_MAPPING[component_type][class_name] = entry_point.value
+
+
+def resolve(component_type: str, class_name: str) -> type:
+    """Import and return the class registered for a component.
+
+    Raises:
+        ValueError: If the component type or class name is not registered
+    """
+    if component_type not in COMPONENT_MAPPING:
+        raise ValueError(f"Invalid component type: {component_type}")
+    components = COMPONENT_MAPPING[component_type]
+    if class_name not in components:
+        load_plugins()
+    if class_name not in components:
+        raise ValueError(f"Invalid class name for {component_type}: {class_name}")
+
+    target = components[class_name]
+    if isinstance(target, str):
+        module_name, _, attribute = target.partition(":")
+        with startup.step(f"import {class_name}"):
+            target = getattr(importlib.import_module(module_name), attribute)
+        components[class_name] = target
+    return target
@@ -0,0 +1,300 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+from activity_detection.classifiers.types import Prediction
+from activity_detection.logging_config import every, setup_logger
+
+
+@dataclass
+class EventRecord:
+    camera: str
+    started_at: float
+    ended_at: float | None
+    clips: list[str]
+
+
+@dataclass
+class DetectionRecord:
+    camera: str
+    timestamp: float
+    confidence: float | None
+    # One [x1, y1, x2, y2, confidence, track ID] row per box.
+    boxes: list[list[float]]
+
+
+class EventStoreInterface(ABC):
+    """Persists what the security modules saw. Times are Unix timestamps."""
+
+    @abstractmethod
+    def start_event(self, camera: str, started_at: float):
+        pass
+
+    @abstractmethod
+    def end_event(
+        self, camera: str, started_at: float, ended_at: float, clips: list[str]
+    ):
+        pass
+
+    @abstractmethod
+    def record_detection(self, camera: str, timestamp: float, prediction: Prediction):
+        pass
+
+    def close(self):
+        """Write anything pending and release the store."""
+        pass
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    camera TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    clips TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS events_camera_started ON events (camera, started_at);
+CREATE INDEX IF NOT EXISTS events_started ON events (started_at);
+CREATE TABLE IF NOT EXISTS detections (
+    id INTEGER PRIMARY KEY,
+    camera TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    confidence REAL,
+    boxes TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS detections_camera_time ON detections (camera, timestamp);
+CREATE INDEX IF NOT EXISTS detections_time ON detections (timestamp);
+"""
+
+
+class SQLiteEventStore(EventStoreInterface):
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 256,
+        flush_interval_s: float = 1.0,
+        busy_timeout_s: float = 5.0,
+    ):
+        """Event store in an SQLite database in WAL mode.
+
+        Writes are queued and a background thread inserts them in batches of
+        up to batch_size, waiting at most flush_interval_s for a batch to
+        fill, so recording never waits on the disk. WAL mode lets queries run
+        while the writer is busy, and lets the recording processes of a
+        process pipeline share one database. Events and detections are
+        indexed by camera and time, so time-range queries never scan the
+        whole table.
+
+        Args:
+            path (str): Database file, created if missing
+            batch_size (int): Most writes committed in one transaction
+            flush_interval_s (float): Longest a write waits to be committed
+            busy_timeout_s (float): How long to wait for another writer
+        """
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1")
+        if flush_interval_s <= 0:
+            raise ValueError("Flush interval must be positive")
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_s
+        self.busy_timeout = busy_timeout_s
+        self.logger = setup_logger(self.__class__.__name__)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+        connection.close()
+
+        # Holds (sql, params) writes, threading.Event flush markers and a
+        # final None.
+        self.writes: queue.SimpleQueue = queue.SimpleQueue()
+        self.closed = False
+        self.writer = threading.Thread(
+            target=self._write, name="event-store", daemon=True
+        )
+        self.writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=self.busy_timeout)
+        # Durable at every WAL checkpoint, which is enough for an index of
+        # recordings and far cheaper than syncing every commit.
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def start_event(self, camera: str, started_at: float):
+        self._queue(
+            "INSERT INTO events (camera, started_at) VALUES (?, ?)",
+            (camera, started_at),
+        )
+
+    def end_event(
+        self, camera: str, started_at: float, ended_at: float, clips: list[str]
+    ):
+        self._queue(
+            "UPDATE events SET ended_at = ?, clips = ? "
+            "WHERE camera = ? AND started_at = ?",
+            (ended_at, json.dumps(clips), camera, started_at),
+        )
+
+    def record_detection(self, camera: str, timestamp: float, prediction: Prediction):
+        detections = prediction.detections
+        boxes = [
+            [*map(float, xyxy), float(confidence), int(track_id)]
+            for xyxy, confidence, track_id in zip(
+                detections.xyxy, detections.confidence, detections.track_id
+            )
+        ]
+        confidence = prediction.confidence
+        if confidence is None and boxes:
+            confidence = max(box[4] for box in boxes)
+        self._queue(
+            "INSERT INTO detections (camera, timestamp, confidence, boxes) "
+            "VALUES (?, ?, ?, ?)",
+            (camera, timestamp, confidence, json.dumps(boxes)),
+        )
+
+    def _queue(self, sql: str, params: tuple):
+        if self.closed:
+            self.logger.warning(
+                "Event store is closed. Dropping write.", extra=every(5)
+            )
+            return
+        self.writes.put((sql, params))
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until every write queued so far is committed.
+
+        Returns:
+            bool: Whether the writes were committed within the timeout
+        """
+        if self.closed:
+            return True
+        committed = threading.Event()
+        self.writes.put(committed)
+        return committed.wait(timeout)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.writes.put(None)
+        self.writer.join()
+
+    def _write(self):
+        connection = self._connect()
+        try:
+            stopping = False
+            while not stopping:
+                batch = [self.writes.get()]
+                deadline = time.monotonic() + self.flush_interval
+                while batch[-1] is not None and len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self.writes.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                stopping = batch[-1] is None
+                self._commit(connection, batch)
+        finally:
+            connection.close()
+
+    def _commit(self, connection: sqlite3.Connection, batch: list):
+        writes = [item for item in batch if isinstance(item, tuple)]
+        try:
+            with connection:
+                for sql, params in writes:
+                    connection.execute(sql, params)
+        except sqlite3.Error as e:
+            self.logger.error(f"Failed to write {len(writes)} records: {e}")
+        for item in batch:
+            if isinstance(item, threading.Event):
+                item.set()
+
+    def events(
+        self, start: float, end: float, camera: str | None = None
+    ) -> list[EventRecord]:
+        """Events that overlap a time range, oldest first.
+
+        Events still in progress have no end time.
+
+        Args:
+            start (float): Start of the range, as a Unix timestamp
+            end (float): End of the range, as a Unix timestamp
+            camera (str | None): Only this camera's events
+        """
+        sql = (
+            "SELECT camera, started_at, ended_at, clips FROM events "
+            "WHERE started_at < ? AND (ended_at IS NULL OR ended_at >= ?)"
+        )
+        params: tuple = (end, start)
+        if camera is not None:
+            sql += " AND camera = ?"
+            params += (camera,)
+        rows = self._query(sql + " ORDER BY started_at", params)
+        return [
+            EventRecord(camera, started_at, ended_at, json.loads(clips))
+            for camera, started_at, ended_at, clips in rows
+        ]
+
+    def detections(
+        self,
+        start: float,
+        end: float,
+        camera: str | None = None,
+        limit: int | None = None,
+    ) -> list[DetectionRecord]:
+        """Frames with detections in [start, end), oldest first.
+
+        Args:
+            start (float): Start of the range, as a Unix timestamp
+            end (float): End of the range, as a Unix timestamp
+            camera (str | None): Only this camera's detections
+            limit (int | None): Return at most this many
+        """
+        sql = (
+            "SELECT camera, timestamp, confidence, boxes FROM detections "
+            "WHERE timestamp >= ? AND timestamp < ?"
+        )
+        params: tuple = (start, end)
+        if camera is not None:
+            sql += " AND camera = ?"
+            params += (camera,)
+        sql += " ORDER BY timestamp"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params += (limit,)
+        return [
+            DetectionRecord(camera, timestamp, confidence, json.loads(boxes))
+            for camera, timestamp, confidence, boxes in self._query(sql, params)
+        ]
+
+    def last_detection(
+        self, camera: str, before: float | None = None
+    ) -> DetectionRecord | None:
+        """The camera's most recent detection, optionally before a time."""
+        rows = self._query(
+            "SELECT camera, timestamp, confidence, boxes FROM detections "
+            "WHERE camera = ? AND timestamp < ? ORDER BY timestamp DESC LIMIT 1",
+            (camera, before if before is not None else float("inf")),
+        )
+        if not rows:
+            return None
+        camera, timestamp, confidence, boxes = rows[0]
+        return DetectionRecord(camera, timestamp, confidence, json.loads(boxes))
+
+    def _query(self, sql: str, params: tuple) -> list[tuple]:
+        # A connection per query, as queries may come from any thread.
+        connection = self._connect()
+        try:
+            return connection.execute(sql, params).fetchall()
+        finally:
+            connection.close()
@@ -0,0 +1,76 @@
+from typing import Iterator
+
+import numpy as np
+
+from activity_detection.logging_config import setup_logger
+
+
+class FrameRingBuffer:
+    def __init__(self, capacity: int):
+        """Fixed-memory ring buffer of the most recent frames.
+
+        All frames live in one contiguous array of shape
+        (capacity, height, width, channels) that is allocated on the first
+        push and reused from then on, so memory use is exactly
+        capacity * frame size bytes.
+
+        Args:
+            capacity (int): Number of frames to keep
+        """
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1")
+        self.capacity = capacity
+        self.frames: np.ndarray | None = None
+        self.start = 0
+        self.count = 0
+        self.logger = setup_logger(self.__class__.__name__)
+
+    @property
+    def nbytes(self) -> int:
+        return 0 if self.frames is None else self.frames.nbytes
+
+    def __len__(self) -> int:
+        return self.count
+
+    def push(self, frame: np.ndarray):
+        """Copy a frame into the buffer, overwriting the oldest when full.
+
+        Args:
+            frame (np.ndarray): The frame to store
+        """
+        if self.frames is None or self.frames.shape[1:] != frame.shape:
+            self._allocate(frame)
+
+        index = (self.start + self.count) % self.capacity
+        np.copyto(self.frames[index], frame)
+        if self.count < self.capacity:
+            self.count += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        """Iterate over the stored frames from oldest to newest.
+
+        The frames are views into the buffer and are only valid until the
+        next push.
+        """
+        for offset in range(self.count):
+            yield self.frames[(self.start + offset) % self.capacity]
+
+    def clear(self):
+        """Forget the stored frames while keeping the allocated memory."""
+        self.start = 0
+        self.count = 0
+
+    def _allocate(self, frame: np.ndarray):
+        if self.frames is not None:
+            self.logger.warning(
+                f"Frame shape changed from {self.frames.shape[1:]} to "
+                f"{frame.shape}. Reallocating buffer."
+            )
+        self.frames = np.empty((self.capacity, *frame.shape), dtype=frame.dtype)
+        self.clear()
+        self.logger.info(
+            f"Allocated {self.capacity} frame buffer "
+            f"({self.frames.nbytes / 2**20:.1f} MiB)"
+        )
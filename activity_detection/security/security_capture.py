@@ -1,10 +1,18 @@
 import datetime
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
 from abc import abstractmethod, ABC
+from queue import Full
+from typing import Callable
 
 import cv2
 import numpy as np
 
 from activity_detection.logging_config import setup_logger
+from activity_detection.security.segment_index import SegmentIndex
 
 
 class VideoCaptureInterface(ABC):
@@ -17,36 +25,432 @@ class VideoCaptureInterface(ABC):
         pass
 
     @abstractmethod
-    def capture_frame(self, frame: np.ndarray):
+    def capture_frame(self, frame: np.ndarray, timestamp: float | None = None):
+        """Record a frame.
+
+        Args:
+            frame (np.ndarray): The frame to record
+            timestamp (float | None): When the frame was seen, as a Unix
+                timestamp. Defaults to now.
+        """
         pass
 
+    def capture_frames(self, frames: list[tuple[np.ndarray, float]]):
+        """Record frames seen before the recording started.
 
-class DefaultVideoCapture(VideoCaptureInterface):
-    def __init__(self, output_dir: str):
+        Args:
+            frames (list[tuple[np.ndarray, float]]): (frame, Unix timestamp)
+                pairs, oldest first
+        """
+        for frame, timestamp in frames:
+            self.capture_frame(frame, timestamp)
+
+    def close(self):
+        """Release any resources held between recordings."""
+        self.stop_video_capture()
+
+    def clip_files(self) -> list[str]:
+        """Files of the latest recording, for indexing once it has stopped."""
+        return []
+
+    def on_clip_files(self, callback: Callable[[list[str]], None]):
+        """Call callback with the files of the latest recording once it has
+        stopped and they are all known.
+
+        Recorders that only learn of them later, like ProcessVideoCapture,
+        call it from another thread rather than make the caller wait.
+        """
+        callback(self.clip_files())
+
+
+def recording_prefix(camera_name: str | None) -> str:
+    prefix = "suspicious_activity"
+    if camera_name:
+        prefix = f"{prefix}_{camera_name}"
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"{prefix}_{timestamp}"
+
+
+class SegmentWriter:
+    def __init__(
+        self,
+        output_dir: str,
+        fps: float = 30,
+        segment_seconds: float | None = None,
+        max_segment_bytes: int | None = None,
+        camera_name: str | None = None,
+        index: bool = False,
+    ):
+        """Writes one recording as a sequence of mp4 segments.
+
+        The video writer is opened on the first frame so the frame size always
+        matches the camera. A new segment is started once the current one
+        spans segment_seconds of frame time or has grown past
+        max_segment_bytes. With the index enabled, every finished segment is
+        added to the SegmentIndex of the output directory.
+
+        Args:
+            output_dir (str): Directory the segments are written to
+            fps (float): Frame rate stored in the video files
+            segment_seconds (float | None): Maximum segment duration
+            max_segment_bytes (int | None): Maximum segment file size
+            camera_name (str | None): Camera recorded in the index
+            index (bool): Index the segments in the output directory
+        """
         self.output_dir = output_dir
+        self.fps = fps
+        self.segment_seconds = segment_seconds
+        self.max_segment_bytes = max_segment_bytes
+        self.camera_name = camera_name
+        self.index = SegmentIndex(output_dir) if index else None
         self.video_writer = None
+        self.base_name = None
         self.output_file = None
+        self.files: list[str] = []
+        # Times of the current segment's frames, and how many frames the
+        # recording had before it.
+        self.frame_times: list[float] = []
+        self.recording_frames = 0
         self.logger = setup_logger(self.__class__.__name__)
 
-    def start_video_capture(self):
+    def start(self, base_name: str):
+        self.stop()
+        self.base_name = base_name
+        self.files = []
+        self.recording_frames = 0
+
+    def write(self, frame: np.ndarray, timestamp: float | None = None):
+        if self.base_name is None:
+            return
+        if timestamp is None:
+            timestamp = time.time()
+        if self.video_writer and self._segment_full(timestamp):
+            self._close_segment()
         if not self.video_writer:
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            self.output_file = f"suspicious_activity_{timestamp}.mp4"
-            fourcc = cv2.VideoWriter.fourcc("m", "p", "4", "v")
-            frame_size = (1920, 1080)
-            self.video_writer = cv2.VideoWriter(
-                self.output_file, fourcc, 30, frame_size
-            )
+            self._open_segment(frame)
+        self.video_writer.write(frame)
+        self.frame_times.append(timestamp)
+
+    def stop(self) -> list[str]:
+        """Finish the recording.
 
+        Returns:
+            list[str]: The segment files written for this recording
+        """
+        if self.video_writer:
+            self._close_segment()
+        self.base_name = None
+        return self.files
+
+    def _segment_full(self, timestamp: float) -> bool:
+        if (
+            self.segment_seconds
+            and timestamp - self.frame_times[0] >= self.segment_seconds
+        ):
+            return True
+        return bool(
+            self.max_segment_bytes
+            and os.path.getsize(self.output_file) >= self.max_segment_bytes
+        )
+
+    def _open_segment(self, frame: np.ndarray):
+        os.makedirs(self.output_dir, exist_ok=True)
+        suffix = f"_{len(self.files):03d}" if self.files else ""
+        self.output_file = os.path.join(
+            self.output_dir, f"{self.base_name}{suffix}.mp4"
+        )
+        height, width = frame.shape[:2]
+        fourcc = cv2.VideoWriter.fourcc("m", "p", "4", "v")
+        self.video_writer = cv2.VideoWriter(
+            self.output_file, fourcc, self.fps, (width, height)
+        )
         if not self.video_writer.isOpened():
+            self.video_writer = None
             raise ValueError("Failed to open video writer")
+        self.files.append(self.output_file)
+        self.frame_times = []
+
+    def _close_segment(self):
+        self.video_writer.release()
+        self.video_writer = None
+        self.logger.info(f"Video saved: {self.output_file}")
+        if self.index and self.frame_times:
+            try:
+                self.index.add(
+                    self.output_file,
+                    self.camera_name,
+                    self.base_name,
+                    self.recording_frames,
+                    self.frame_times,
+                )
+            except sqlite3.Error as e:
+                self.logger.error(f"Failed to index {self.output_file}: {e}")
+        self.recording_frames += len(self.frame_times)
+        self.frame_times = []
+
+
+class DefaultVideoCapture(VideoCaptureInterface):
+    def __init__(
+        self,
+        output_dir: str,
+        camera_name: str | None = None,
+        fps: float = 30,
+        segment_seconds: float | None = 60,
+        max_segment_mb: float | None = None,
+        index: bool = True,
+    ):
+        """Video capture that encodes on the calling thread.
+
+        Recordings are split into segments of segment_seconds, so a crash
+        loses at most the segment being written and a time window can be
+        pulled from the index without opening a long file.
+
+        Args:
+            output_dir (str): Directory recordings are written to
+            camera_name (str | None): Included in recording file names
+            fps (float): Frame rate stored in the video files
+            segment_seconds (float | None): Start a new file after this long
+            max_segment_mb (float | None): Start a new file past this size
+            index (bool): Index the segments in output_dir (see SegmentIndex)
+        """
+        self.output_dir = output_dir
+        self.camera_name = camera_name
+        self.writer = SegmentWriter(
+            output_dir,
+            fps,
+            segment_seconds,
+            int(max_segment_mb * 2**20) if max_segment_mb else None,
+            camera_name,
+            index,
+        )
+        self.recording = False
+        self.output_file = None
+        self.logger = setup_logger(self.__class__.__name__)
+
+    def start_video_capture(self):
+        if not self.recording:
+            prefix = recording_prefix(self.camera_name)
+            self.output_file = os.path.join(self.output_dir, f"{prefix}.mp4")
+            self.writer.start(prefix)
+            self.recording = True
 
     def stop_video_capture(self):
-        if self.video_writer:
-            self.video_writer.release()
-            self.video_writer = None
-            self.logger.info(f"Video saved: {self.output_file}")
+        if self.recording:
+            self.writer.stop()
+            self.recording = False
 
-    def capture_frame(self, frame: np.ndarray):
-        if self.video_writer:
-            self.video_writer.write(frame)
+    def capture_frame(self, frame: np.ndarray, timestamp: float | None = None):
+        if self.recording:
+            self.writer.write(frame, timestamp)
+
+    def clip_files(self) -> list[str]:
+        return list(self.writer.files)
+
+
+def _encode_frames(
+    frame_queue: multiprocessing.Queue,
+    results: multiprocessing.Queue,
+    output_dir: str,
+    fps: float,
+    segment_seconds: float | None,
+    max_segment_bytes: int | None,
+    camera_name: str | None = None,
+    index: bool = False,
+):
+    """Encoder process loop: writes frames from the queue until it gets None.
+
+    The segment files of each finished recording are put on results, with
+    the recording's name.
+    """
+    writer = SegmentWriter(
+        output_dir, fps, segment_seconds, max_segment_bytes, camera_name, index
+    )
+    recording = None
+    while True:
+        message = frame_queue.get()
+        if message is None:
+            break
+        command, payload = message
+        try:
+            if command == "start":
+                recording = payload
+                writer.start(payload)
+            elif command == "frame":
+                writer.write(*payload)
+            elif command == "stop":
+                results.put((recording, writer.stop()))
+        except ValueError as e:
+            writer.logger.error(f"Encoder error: {e}")
+    writer.stop()
+
+
+class ProcessVideoCapture(VideoCaptureInterface):
+    CONTROL_TIMEOUT = 10
+
+    def __init__(
+        self,
+        output_dir: str,
+        camera_name: str | None = None,
+        fps: float = 30,
+        queue_size: int = 64,
+        segment_seconds: float | None = 60,
+        max_segment_mb: float | None = None,
+        index: bool = True,
+    ):
+        """Video capture that encodes in a separate process.
+
+        Frames are handed to the encoder through a bounded queue so encoding
+        never blocks the pipeline. If the encoder falls behind and the queue
+        is full, frames are dropped and counted rather than waited on. The
+        pre-event frames are queued all at once when an event starts, so the
+        queue should have room for them.
+
+        The encoder reports the segment files of each recording once it has
+        written them, to a reporting thread (see on_clip_files).
+
+        Args:
+            output_dir (str): Directory recordings are written to
+            camera_name (str | None): Included in recording file names
+            fps (float): Frame rate stored in the video files
+            queue_size (int): Maximum number of frames waiting to be encoded
+            segment_seconds (float | None): Start a new file after this long
+            max_segment_mb (float | None): Start a new file past this size
+            index (bool): Index the segments in output_dir (see SegmentIndex)
+        """
+        self.output_dir = output_dir
+        self.camera_name = camera_name
+        self.recording = False
+        self.output_file = None
+        self.prefix: str | None = None
+        # The latest recording the encoder reported, and its segment files.
+        self.clips: tuple[str | None, list[str]] = (None, [])
+        # Callbacks waiting for the encoder's report, by recording.
+        self.clip_callbacks: dict[str, Callable[[list[str]], None]] = {}
+        self.clips_lock = threading.Lock()
+        self.dropped_frames = 0
+        self.recording_dropped_frames = 0
+        self.logger = setup_logger(self.__class__.__name__)
+
+        # Spawned rather than forked so the encoder does not inherit the
+        # parent's threads, locks or model weights.
+        context = multiprocessing.get_context("spawn")
+        self.frame_queue = context.Queue(maxsize=queue_size)
+        self.results = context.Queue()
+        self.encoder = context.Process(
+            target=_encode_frames,
+            args=(
+                self.frame_queue,
+                self.results,
+                output_dir,
+                fps,
+                segment_seconds,
+                int(max_segment_mb * 2**20) if max_segment_mb else None,
+                camera_name,
+                index,
+            ),
+            name=f"encoder-{camera_name or 'default'}",
+            daemon=True,
+        )
+        self.encoder.start()
+        self.reporter = threading.Thread(
+            target=self._report_clips,
+            name=f"clips-{camera_name or 'default'}",
+            daemon=True,
+        )
+        self.reporter.start()
+
+    def start_video_capture(self):
+        if not self.recording:
+            prefix = recording_prefix(self.camera_name)
+            self.prefix = prefix
+            self.output_file = os.path.join(self.output_dir, f"{prefix}.mp4")
+            self.recording_dropped_frames = 0
+            self._send(("start", prefix))
+            self.recording = True
+
+    def stop_video_capture(self):
+        if self.recording:
+            self._send(("stop", None))
+            self.recording = False
+            if self.recording_dropped_frames:
+                self.logger.warning(
+                    f"Encoder fell behind: dropped {self.recording_dropped_frames} "
+                    f"frames from {self.output_file}"
+                )
+
+    def capture_frame(self, frame: np.ndarray, timestamp: float | None = None):
+        if not self.recording:
+            return
+        if timestamp is None:
+            timestamp = time.time()
+        try:
+            # The queue pickles frames on a background thread, so send a copy
+            # the caller is free to reuse.
+            self.frame_queue.put_nowait(("frame", (frame.copy(), timestamp)))
+        except Full:
+            self.dropped_frames += 1
+            self.recording_dropped_frames += 1
+
+    def clip_files(self) -> list[str]:
+        # Only the encoder knows which segments it rolled over to, so until
+        # it reports them only the first one is known.
+        if self.prefix is None:
+            return []
+        with self.clips_lock:
+            if self.clips[0] == self.prefix:
+                return list(self.clips[1])
+        return [self.output_file]
+
+    def on_clip_files(self, callback: Callable[[list[str]], None]):
+        if self.prefix is None:
+            callback([])
+            return
+        with self.clips_lock:
+            files = list(self.clips[1]) if self.clips[0] == self.prefix else None
+            if files is None:
+                self.clip_callbacks[self.prefix] = callback
+        if files is not None:
+            callback(files)
+
+    def _report_clips(self):
+        """Hand the encoder's reports to the callbacks waiting for them,
+        until it gets None."""
+        while True:
+            report = self.results.get()
+            if report is None:
+                return
+            prefix, files = report
+            with self.clips_lock:
+                self.clips = (prefix, files)
+                callback = self.clip_callbacks.pop(prefix, None)
+            if callback is not None:
+                callback(list(files))
+
+    def close(self):
+        self.stop_video_capture()
+        if self.encoder.is_alive():
+            self._send(None)
+            self.encoder.join(timeout=self.CONTROL_TIMEOUT)
+        if self.encoder.is_alive():
+            self.logger.error("Encoder did not finish in time. Terminating it.")
+            self.encoder.terminate()
+            # Don't wait on frames the encoder will never read.
+            self.frame_queue.cancel_join_thread()
+        # Anything the encoder reported is ahead of this in the queue.
+        self.results.put(None)
+        self.reporter.join(timeout=self.CONTROL_TIMEOUT)
+        with self.clips_lock:
+            callbacks, self.clip_callbacks = self.clip_callbacks, {}
+        for prefix, callback in callbacks.items():
+            output_file = os.path.join(self.output_dir, f"{prefix}.mp4")
+            self.logger.error(f"Encoder did not report the segments of {output_file}")
+            callback([output_file])
+        self.frame_queue.close()
+        self.results.close()
+
+    def _send(self, message):
+        """Send a control message, which unlike frames must not be dropped."""
+        try:
+            self.frame_queue.put(message, timeout=self.CONTROL_TIMEOUT)
+        except Full:
+            self.logger.error(f"Encoder is not responding. Lost message: {message}")
@@ -1,6 +1,11 @@
+import time
+from collections import deque
+
 import cv2
 import numpy as np
 
+from activity_detection.security.event_store import EventStoreInterface
+from activity_detection.security.frame_buffer import FrameRingBuffer
 from activity_detection.security.security_capture import VideoCaptureInterface
 from activity_detection.security.security_logging import SecurityLoggingInterface
 from activity_detection.classifiers.types import Prediction
@@ -12,12 +17,27 @@ class SecurityModule:
         video_capture: VideoCaptureInterface,
         security_logging: SecurityLoggingInterface,
         stop_threshold: int = 75,  # 3 seconds
+        pre_event_frames: int = 0,
+        event_store: EventStoreInterface | None = None,
+        camera_name: str = "default",
     ):
         self.video_capture = video_capture
         self.security_logging = security_logging
+        # Records detections, events and their clips, if configured.
+        self.event_store = event_store
+        self.camera_name = camera_name
+        self.event_started_at = None
         self.suspicious_activity = False
         self.no_activity_count = 0
         self.stop_threshold = stop_threshold
+        # Frames seen before an event starts, written to the start of the
+        # recording so clips show how the person arrived.
+        self.pre_event_buffer = (
+            FrameRingBuffer(pre_event_frames) if pre_event_frames > 0 else None
+        )
+        # When each buffered frame was seen, so the recording is indexed
+        # with the right times.
+        self.pre_event_times: deque[float] = deque(maxlen=max(pre_event_frames, 0))
 
     def process_frame(self, frame: np.ndarray, prediction: Prediction):
         """Process the frame and log any suspicious activity.
@@ -25,32 +45,88 @@ class SecurityModule:
         stop capturing video when no suspicious activity is detected for
         a certain number of frames (stop_threshold). This reduces the risk of
         missing anything, while making sure we mitigate false negatives as well
-        and spamming too many videos.
+        and spamming too many videos. When a pre-event buffer is configured,
+        the frames leading up to the detection are written first.
         Args:
             frame (np.ndarray): The frame to process
             suspicious_activity (bool): Whether suspicious activity is detected
             co_ords (List[List[float]]): List of bounding box coordinates
         """
+        now = time.time()
         if prediction.detected:
             if not self.suspicious_activity:
                 self.video_capture.start_video_capture()
                 self.security_logging.log_suspicious_activity()
                 self.suspicious_activity = True
+                self._flush_pre_event_buffer()
+                self.event_started_at = now
+                if self.event_store:
+                    self.event_store.start_event(self.camera_name, now)
             self.no_activity_count = 0
+            if self.event_store:
+                self.event_store.record_detection(self.camera_name, now, prediction)
         else:
             if self.suspicious_activity:
                 self.no_activity_count += 1
                 if self.no_activity_count >= self.stop_threshold:
-                    self.video_capture.stop_video_capture()
+                    self._end_event(now)
                     self.security_logging.log_no_suspicious_activity()
-                    self.suspicious_activity = False
-                    self.no_activity_count = 0
 
-        for coord in prediction.bounding_box:
-            x1, y1, x2, y2 = map(int, coord)
+        for coord, track_id in zip(
+            prediction.detections.xyxy.astype(int).tolist(),
+            prediction.detections.track_id.tolist(),
+        ):
+            x1, y1, x2, y2 = coord
             cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+            if track_id < 0:
+                continue
+            cv2.putText(
+                frame,
+                f"#{track_id}",
+                (x1, max(y1 - 5, 0)),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.5,
+                (0, 255, 0),
+                1,
+            )
 
         if self.suspicious_activity:
-            self.video_capture.capture_frame(frame)
+            self.video_capture.capture_frame(frame, now)
+        elif self.pre_event_buffer is not None:
+            self.pre_event_buffer.push(frame)
+            self.pre_event_times.append(now)
 
         return frame
+
+    def close(self):
+        """End any event in progress and release the recorder.
+
+        The event store may be shared between cameras, so it is left for the
+        owner to close.
+        """
+        if self.suspicious_activity:
+            self._end_event(time.time())
+        self.video_capture.close()
+
+    def _end_event(self, ended_at: float):
+        self.video_capture.stop_video_capture()
+        self.suspicious_activity = False
+        self.no_activity_count = 0
+        if self.event_store:
+            camera_name, started_at = self.camera_name, self.event_started_at
+            # The event is recorded once its clips are known, which for some
+            # recorders is only after they have finished encoding.
+            self.video_capture.on_clip_files(
+                lambda clips: self.event_store.end_event(
+                    camera_name, started_at, ended_at, clips
+                )
+            )
+
+    def _flush_pre_event_buffer(self):
+        if self.pre_event_buffer is None:
+            return
+        self.video_capture.capture_frames(
+            list(zip(self.pre_event_buffer, self.pre_event_times))
+        )
+        self.pre_event_buffer.clear()
+        self.pre_event_times.clear()
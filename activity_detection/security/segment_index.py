@@ -0,0 +1,164 @@
+import os
+import sqlite3
+from bisect import bisect_left
+from dataclasses import dataclass
+
+import numpy as np
+
+# Kept next to the segments it indexes, so a recordings directory can be
+# moved or copied as a whole.
+INDEX_FILE = "segments.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    file TEXT NOT NULL,
+    camera TEXT,
+    recording TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    ended_at REAL NOT NULL,
+    first_frame INTEGER NOT NULL,
+    frame_times BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS segments_camera_started ON segments (camera, started_at);
+CREATE INDEX IF NOT EXISTS segments_started ON segments (started_at);
+CREATE INDEX IF NOT EXISTS segments_ended ON segments (ended_at);
+"""
+
+
+@dataclass(frozen=True)
+class ClipSegment:
+    """The frames [start_frame, end_frame) of one segment file that fall in a
+    requested time window, with the times of the first and last of them."""
+
+    path: str
+    camera: str | None
+    recording: str
+    start_frame: int
+    end_frame: int
+    started_at: float
+    ended_at: float
+    # Offset of the segment's first frame within its recording.
+    recording_frame: int
+
+
+class SegmentIndex:
+    def __init__(self, directory: str, busy_timeout_s: float = 5.0):
+        """Index of the recorded segments in a directory.
+
+        Every finished segment gets a row with its camera, recording, wall
+        clock time range and the time of each of its frames, so a time
+        window maps to segment files and frame offsets without opening any
+        video. Each encoder writes one row per segment, so several cameras
+        and encoder processes can share a directory.
+
+        Args:
+            directory (str): Directory holding the segments and the index
+            busy_timeout_s (float): How long to wait for another writer
+        """
+        self.directory = directory
+        self.path = os.path.join(directory, INDEX_FILE)
+        self.busy_timeout = busy_timeout_s
+        os.makedirs(directory, exist_ok=True)
+        connection = self._connect()
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=self.busy_timeout)
+
+    def add(
+        self,
+        path: str,
+        camera: str | None,
+        recording: str,
+        first_frame: int,
+        frame_times: list[float],
+    ):
+        """Index a finished segment.
+
+        Args:
+            path (str): The segment file, inside the index directory
+            camera (str | None): Camera that recorded it
+            recording (str): Name of the recording it belongs to
+            first_frame (int): Offset of its first frame within the recording
+            frame_times (list[float]): Unix timestamp of each frame
+        """
+        if not frame_times:
+            raise ValueError("A segment needs at least one frame")
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute(
+                    "INSERT INTO segments (file, camera, recording, started_at, "
+                    "ended_at, first_frame, frame_times) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        os.path.relpath(path, self.directory),
+                        camera,
+                        recording,
+                        frame_times[0],
+                        frame_times[-1],
+                        first_frame,
+                        np.asarray(frame_times, dtype=np.float64).tobytes(),
+                    ),
+                )
+        finally:
+            connection.close()
+
+    def window(
+        self, start: float, end: float, camera: str | None = None
+    ) -> list[ClipSegment]:
+        """The recorded frames in [start, end), as slices of segment files.
+
+        The files are returned as they are, so a window is cut without
+        re-encoding: read each slice's frames, for example with
+        VideoFileInput's start_frame and end_frame, or hand the files and
+        offsets to a player.
+
+        Args:
+            start (float): Start of the window, as a Unix timestamp
+            end (float): End of the window, as a Unix timestamp
+            camera (str | None): Only this camera's segments
+
+        Returns:
+            list[ClipSegment]: One slice per segment with frames in the
+                window, oldest first
+        """
+        sql = (
+            "SELECT file, camera, recording, first_frame, frame_times "
+            "FROM segments WHERE started_at < ? AND ended_at >= ?"
+        )
+        params: tuple = (end, start)
+        if camera is not None:
+            sql += " AND camera = ?"
+            params += (camera,)
+        connection = self._connect()
+        try:
+            rows = connection.execute(sql + " ORDER BY started_at", params).fetchall()
+        finally:
+            connection.close()
+
+        clips = []
+        for file, camera, recording, first_frame, frame_times in rows:
+            times = np.frombuffer(frame_times, dtype=np.float64).tolist()
+            start_frame = bisect_left(times, start)
+            end_frame = bisect_left(times, end)
+            if start_frame == end_frame:
+                continue
+            clips.append(
+                ClipSegment(
+                    path=os.path.join(self.directory, file),
+                    camera=camera,
+                    recording=recording,
+                    start_frame=start_frame,
+                    end_frame=end_frame,
+                    started_at=times[start_frame],
+                    ended_at=times[end_frame - 1],
+                    recording_frame=first_frame,
+                )
+            )
+        return clips
@@ -0,0 +1,48 @@
+import argparse
+import signal
+from pathlib import Path
+
+import yaml
+
+from activity_detection.activity_manager import ActivityManager
+from activity_detection.logging_config import configure_logging
+from activity_detection.serving.protocol import DEFAULT_ADDRESS
+from activity_detection.serving.server import DetectorServer
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load the detector once and serve it to every pipeline."
+    )
+    parser.add_argument(
+        "--config",
+        default=str(Path(__file__).parent.parent.parent / "config.yaml"),
+        help="Config file with a detector_server section",
+    )
+    parser.add_argument("--address", help="Unix socket path, or host:port")
+    args = parser.parse_args()
+
+    with open(args.config, "r") as file:
+        config = yaml.safe_load(file)
+    configure_logging(**config.get("logging", {}))
+    settings = dict(config.get("detector_server") or {})
+    # The pipelines' own activity_detector is usually the remote one, so the
+    # served model can be given here instead.
+    detector_config = settings.pop("activity_detector", config["activity_detector"])
+    address = args.address or settings.pop("address", DEFAULT_ADDRESS)
+    settings.pop("address", None)
+
+    detector = ActivityManager.create_from_config("activity_detector", detector_config)
+    server = DetectorServer(detector, address, **settings)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        server.logger.info(f"Stopped after serving {server.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import os
+from dataclasses import dataclass
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+from PIL import Image
+
+# Where the server listens unless configured otherwise.
+DEFAULT_ADDRESS = "/tmp/activity_detection.sock"
+# Environment variable holding the shared secret, when it is not configured.
+AUTHKEY_ENV = "ACTIVITY_DETECTION_AUTHKEY"
+
+
+def parse_address(address: str) -> str | tuple[str, int]:
+    """A Unix socket path, or a (host, port) pair for "host:port"."""
+    host, separator, port = address.rpartition(":")
+    if separator and host and port.isdigit() and "/" not in address:
+        return host, int(port)
+    return address
+
+
+def read_authkey(authkey: str | None) -> bytes | None:
+    """The configured shared secret, or the one in AUTHKEY_ENV, if any."""
+    authkey = authkey or os.environ.get(AUTHKEY_ENV)
+    return authkey.encode() if authkey else None
+
+
+@dataclass(frozen=True)
+class ImageSpec:
+    """Where to find one image of a request.
+
+    The pixels are either in the client's shared memory block at offset, or
+    sent along in data.
+    """
+
+    # "pil" for a PIL image, with its mode, or "array" for a NumPy array.
+    kind: str
+    mode: str | None
+    shape: tuple[int, ...]
+    dtype: str
+    offset: int = 0
+    data: np.ndarray | None = None
+
+
+def image_array(image) -> tuple[str, str | None, np.ndarray]:
+    """The kind, PIL mode and pixels of an image passed to a detector."""
+    if isinstance(image, Image.Image):
+        return "pil", image.mode, np.asarray(image)
+    return "array", None, np.asarray(image)
+
+
+def read_image(spec: ImageSpec, shared_memory: SharedMemory | None):
+    """Rebuild an image from its spec.
+
+    Arrays are views into the shared memory block, valid until the client
+    sends its next request.
+    """
+    if spec.data is not None:
+        array = spec.data
+    else:
+        array = np.ndarray(
+            spec.shape, dtype=spec.dtype, buffer=shared_memory.buf, offset=spec.offset
+        )
+    if spec.kind == "pil":
+        return Image.fromarray(array, spec.mode)
+    return array
+
+
+def attach(name: str) -> SharedMemory:
+    """Attach to a client's block without taking over its cleanup.
+
+    The client owns the block. Without this, this process's resource tracker
+    would unlink it when this process exits.
+    """
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python before 3.13 always tracks attached blocks.
+        shared_memory = SharedMemory(name=name)
+        resource_tracker.unregister(shared_memory._name, "shared_memory")
+        return shared_memory
@@ -0,0 +1,262 @@
+import os
+import queue
+import socket
+import threading
+import time
+from collections import Counter
+from multiprocessing.connection import Client, Connection, Listener
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING
+
+from activity_detection.classifiers.types import Prediction
+from activity_detection.logging_config import setup_logger
+from activity_detection.serving.protocol import (
+    AUTHKEY_ENV,
+    attach,
+    parse_address,
+    read_authkey,
+    read_image,
+)
+
+if TYPE_CHECKING:
+    from activity_detection.classifiers.interfaces import ActivityDetectionInterface
+
+
+def _release(shared_memory: SharedMemory | None):
+    if shared_memory is None:
+        return
+    try:
+        shared_memory.close()
+    except BufferError:
+        # The detector still holds a view of the last batch. The mapping is
+        # released once that goes.
+        pass
+
+
+class _Request:
+    """Images from one client call, waiting for the batcher."""
+
+    def __init__(self, images: list):
+        self.images = images
+        self.done = threading.Event()
+        self.predictions: list[Prediction] = []
+        self.error: str | None = None
+
+
+class DetectorServer:
+    def __init__(
+        self,
+        detector: "ActivityDetectionInterface",
+        address: str,
+        max_batch_size: int = 8,
+        batch_timeout_ms: float = 5,
+        authkey: str | None = None,
+    ):
+        """Serves one detector to any number of pipeline processes.
+
+        Clients (see RemoteActivityDetector) connect over a Unix socket, or
+        TCP for "host:port" addresses, and each gets its own thread. Their
+        requests are merged into batches: the batcher takes the first waiting
+        request, then more from any client until the batch holds
+        max_batch_size images or batch_timeout_ms has passed, and runs the
+        detector once for all of them. A request is never split.
+
+        Clients on the same host put their images in shared memory and only
+        send where they are, so pixels never go through the socket.
+
+        Messages are pickled, so anyone who can connect can run code in the
+        server. A TCP address therefore needs an authkey, given here or in
+        the ACTIVITY_DETECTION_AUTHKEY environment variable. Without one, a
+        Unix socket is only protected by its file permissions.
+
+        Args:
+            detector (ActivityDetectionInterface): The detector to serve
+            address (str): Unix socket path, or "host:port"
+            max_batch_size (int): Images the batcher aims to run at once
+            batch_timeout_ms (float): Longest a request waits for others
+            authkey (str | None): Shared secret clients must present
+        """
+        if max_batch_size < 1:
+            raise ValueError("Batch size must be at least 1")
+        if batch_timeout_ms < 0:
+            raise ValueError("Batch timeout must not be negative")
+        self.detector = detector
+        self.address = parse_address(address)
+        self.max_batch_size = max_batch_size
+        self.batch_timeout = batch_timeout_ms / 1000
+        self.authkey = read_authkey(authkey)
+        if self.authkey is None and not isinstance(self.address, str):
+            raise ValueError(
+                f"Serving on {address} needs an authkey, in the config or in "
+                f"{AUTHKEY_ENV}"
+            )
+        self.requests: queue.SimpleQueue = queue.SimpleQueue()
+        self.counts: Counter[str] = Counter()
+        self.stopped = threading.Event()
+        self.connections: set[Connection] = set()
+        self.connections_lock = threading.Lock()
+        self.logger = setup_logger(self.__class__.__name__)
+        self._remove_stale_socket()
+        self.listener = Listener(self.address, authkey=self.authkey)
+        self.batcher = threading.Thread(
+            target=self._run_batches, name="batcher", daemon=True
+        )
+        self.batcher.start()
+
+    def _remove_stale_socket(self):
+        if not isinstance(self.address, str) or not os.path.exists(self.address):
+            return
+        try:
+            Client(self.address, authkey=self.authkey).close()
+        except (ConnectionRefusedError, FileNotFoundError):
+            # Left behind by a server that did not shut down.
+            os.unlink(self.address)
+            return
+        except Exception:
+            # Something answered, if only to refuse the key.
+            pass
+        raise ValueError(f"A server is already listening on {self.address}")
+
+    def stats(self) -> dict[str, int]:
+        """Clients, requests, batches and images served so far."""
+        return dict(self.counts)
+
+    def serve_forever(self):
+        """Accept clients until close() is called."""
+        self.logger.info(f"Serving {type(self.detector).__name__} on {self.address}")
+        while not self.stopped.is_set():
+            try:
+                connection = self.listener.accept()
+            except OSError:
+                # The listener was closed.
+                break
+            except Exception as e:
+                self.logger.warning(f"Rejected a client: {e}")
+                continue
+            self.counts["clients"] += 1
+            with self.connections_lock:
+                self.connections.add(connection)
+            threading.Thread(
+                target=self._serve_client,
+                args=(connection,),
+                name=f"client-{self.counts['clients']}",
+                daemon=True,
+            ).start()
+
+    def close(self):
+        if self.stopped.is_set():
+            return
+        self.stopped.set()
+        self.requests.put(None)
+        # accept() is not interrupted by closing the listener, so wake it.
+        try:
+            Client(self.address, authkey=self.authkey).close()
+        except Exception:
+            pass
+        self.listener.close()
+        self.batcher.join()
+        # Clients see the connection drop and reconnect to the next server.
+        with self.connections_lock:
+            connections, self.connections = self.connections, set()
+        family = socket.AF_UNIX if isinstance(self.address, str) else socket.AF_INET
+        for connection in connections:
+            # Shut down rather than closed, as its thread may be reading it.
+            try:
+                with socket.fromfd(
+                    connection.fileno(), family, socket.SOCK_STREAM
+                ) as client_socket:
+                    client_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _serve_client(self, connection: Connection):
+        shared_memory: SharedMemory | None = None
+        try:
+            while True:
+                message = connection.recv()
+                if message[0] == "info":
+                    connection.send({"input_size": self.detector.input_size})
+                    continue
+                _, block_name, specs = message
+                if block_name and (
+                    shared_memory is None or shared_memory.name != block_name
+                ):
+                    # The client grew its block, so the old one is gone.
+                    _release(shared_memory)
+                    shared_memory = None
+                    try:
+                        shared_memory = attach(block_name)
+                    except FileNotFoundError:
+                        error = (
+                            f"No shared memory block {block_name} on the server. "
+                            "Clients on other hosts need shared_memory: false."
+                        )
+                        self.logger.error(error)
+                        connection.send(("error", error))
+                        continue
+                request = _Request([read_image(spec, shared_memory) for spec in specs])
+                self.requests.put(request)
+                request.done.wait()
+                if request.error is not None:
+                    connection.send(("error", request.error))
+                else:
+                    connection.send(("ok", request.predictions))
+        except (EOFError, OSError):
+            pass
+        finally:
+            with self.connections_lock:
+                self.connections.discard(connection)
+            connection.close()
+            _release(shared_memory)
+
+    def _run_batches(self):
+        while True:
+            first = self.requests.get()
+            if first is None:
+                return
+            batch = [first]
+            size = len(first.images)
+            deadline = time.monotonic() + self.batch_timeout
+            stopping = False
+            while size < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    request = (
+                        self.requests.get(timeout=remaining)
+                        if remaining > 0
+                        else self.requests.get_nowait()
+                    )
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+                size += len(request.images)
+            self._detect(batch)
+            if stopping:
+                return
+
+    def _detect(self, batch: list[_Request]):
+        images = [image for request in batch for image in request.images]
+        try:
+            predictions = self.detector.detect_batch(images)
+        except Exception as e:
+            self.logger.error(f"Detection failed for a batch of {len(images)}: {e}")
+            for request in batch:
+                request.error = str(e)
+                request.images = []
+                request.done.set()
+            return
+        self.counts["batches"] += 1
+        self.counts["requests"] += len(batch)
+        self.counts["images"] += len(images)
+        start = 0
+        for request in batch:
+            end = start + len(request.images)
+            request.predictions = predictions[start:end]
+            start = end
+            # Drop the views into the client's shared memory, which it is
+            # free to overwrite once it has the answer.
+            request.images = []
+            request.done.set()
@@ -0,0 +1,56 @@
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class StartupTimer:
+    def __init__(self):
+        """Times the phases of starting the application.
+
+        The clock starts when this module is first imported. mark() closes a
+        phase, such as imports or loading the config, and step() times one
+        piece of work within a phase, such as importing or creating a
+        component.
+        """
+        self.started = time.perf_counter()
+        self.last_mark = self.started
+        self.phases: list[tuple[str, float]] = []
+        self.steps: list[tuple[str, float]] = []
+
+    def mark(self, phase: str):
+        """End a phase, which took the time since the previous mark."""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last_mark))
+        self.last_mark = now
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((name, time.perf_counter() - started))
+
+    def report(self) -> str:
+        """One line with the total time, each phase, the slowest steps and
+        the peak memory so far."""
+        total = time.perf_counter() - self.started
+        parts = [f"{phase} {seconds:.2f}s" for phase, seconds in self.phases]
+        slowest = sorted(self.steps, key=lambda step: step[1], reverse=True)[:5]
+        if slowest:
+            parts.append(
+                "slowest steps: "
+                + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in slowest)
+            )
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere.
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (
+            2**20 if sys.platform == "darwin" else 2**10
+        )
+        parts.append(f"peak RSS {peak_rss:.0f} MB")
+        return f"Started in {total:.2f}s: " + ", ".join(parts)
+
+
+# Shared by everything started in this process.
+startup = StartupTimer()
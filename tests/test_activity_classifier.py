@@ -1,6 +1,8 @@
 import pytest
+import torch
 from unittest.mock import patch, MagicMock
 from PIL import Image
+from ultralytics.engine.results import Boxes
 from activity_detection.classifiers.types import Prediction
 from activity_detection.classifiers import (
     MoondreamActivityDetector,
@@ -15,25 +17,28 @@ def mock_image():
 
 @pytest.fixture
 def mock_moondream_model():
-    with patch(
-        "transformers.AutoModelForCausalLM.from_pretrained"
-    ) as mock_model, patch(
-        "transformers.AutoTokenizer.from_pretrained"
-    ) as mock_tokenizer:
+    with (
+        patch("transformers.AutoModelForCausalLM.from_pretrained") as mock_model,
+        patch("transformers.AutoTokenizer.from_pretrained") as mock_tokenizer,
+    ):
         mock_model.return_value.to.return_value.answer_question.return_value = "YES"
         yield mock_model, mock_tokenizer
 
 
+def make_boxes(*rows):
+    data = torch.tensor(rows, dtype=torch.float32).reshape(-1, 6)
+    return Boxes(data, (100, 100))
+
+
 @pytest.fixture
 def mock_yolo_model():
     with patch(
         "activity_detection.classifiers.yolo_classifiers.YOLOActivityDetector.load_model"
     ) as mock_yolo:
         mock_model = MagicMock()
+        mock_model.names = {0: "person"}
         mock_result = MagicMock()
-        mock_box = MagicMock()
-        mock_box.conf = 0.8
-        mock_result.boxes = [mock_box]
+        mock_result.boxes = make_boxes([10, 20, 30, 40, 0.8, 0])
         mock_result.names = {0: "person"}
         mock_model.predict.return_value = [mock_result]
         mock_yolo.return_value.to.return_value = mock_model
@@ -53,7 +58,7 @@ def test_detect_activity_with_person(
     mock_model = request.getfixturevalue(mock_model_fixture)
 
     if detector_class == MoondreamActivityDetector:
-        detector = detector_class("model_id", "revision")
+        detector = detector_class("model_id", "revision", mode="generate")
     else:
         detector = detector_class()
 
@@ -66,7 +71,7 @@ def test_detect_activity_with_person(
         mock_model[0].return_value.to.return_value.answer_question.assert_called_once()
     else:
         mock_model.return_value.to.return_value.predict.assert_called_once_with(
-            mock_image
+            mock_image, classes=[0], conf=0.5, imgsz=640, verbose=False
         )
 
 
@@ -91,7 +96,7 @@ def test_detect_activity_without_person(
         mock_model[
             0
         ].return_value.to.return_value.answer_question.return_value = model_output
-        detector = detector_class("model_id", "revision")
+        detector = detector_class("model_id", "revision", mode="generate")
     else:
         mock_model.return_value.to.return_value.predict.return_value[
             0
@@ -108,7 +113,7 @@ def test_detect_activity_without_person(
     "detector_class, mock_model_fixture, model_output",
     [
         (MoondreamActivityDetector, "mock_moondream_model", "INVALID"),
-        (YOLOActivityDetector, "mock_yolo_model", 0.3),
+        (YOLOActivityDetector, "mock_yolo_model", 0.5),
     ],
 )
 def test_detect_activity_edge_cases(
@@ -120,13 +125,143 @@ def test_detect_activity_edge_cases(
         mock_model[
             0
         ].return_value.to.return_value.answer_question.return_value = model_output
-        detector = detector_class("model_id", "revision")
+        detector = detector_class("model_id", "revision", mode="generate")
         with pytest.raises(ValueError, match="Invalid answer from the model"):
             detector.detect_activity(mock_image)
     else:
-        mock_model.return_value.to.return_value.predict.return_value[0].boxes[
+        mock_model.return_value.to.return_value.predict.return_value[
             0
-        ].conf = model_output
+        ].boxes = make_boxes([10, 20, 30, 40, model_output, 0])
         detector = detector_class()
         result = detector.detect_activity(mock_image)
-        assert result.detected is False
+        # predict keeps boxes at the threshold, and nothing filters them again.
+        assert result.detected is True
+
+
+def test_yolo_detect_batch_single_predict_call(mock_yolo_model, mock_image):
+    mock_model = mock_yolo_model.return_value.to.return_value
+    mock_result = mock_model.predict.return_value[0]
+    empty_result = MagicMock()
+    empty_result.boxes = make_boxes()
+    empty_result.names = {0: "person"}
+    mock_model.predict.return_value = [mock_result, empty_result]
+    detector = YOLOActivityDetector()
+
+    results = detector.detect_batch([mock_image, mock_image])
+
+    mock_model.predict.assert_called_once_with(
+        [mock_image, mock_image], classes=[0], conf=0.5, imgsz=640, verbose=False
+    )
+    assert [result.detected for result in results] == [True, False]
+    assert results[0].detections.xyxy.tolist() == [[10, 20, 30, 40]]
+
+
+def test_yolo_post_processing_filters_by_class(mock_yolo_model, mock_image):
+    mock_model = mock_yolo_model.return_value.to.return_value
+    mock_model.names = {0: "person", 1: "car"}
+    mock_result = mock_model.predict.return_value[0]
+    mock_result.names = {0: "person", 1: "car"}
+    mock_result.boxes = make_boxes(
+        [0, 0, 10, 10, 0.9, 0],
+        [0, 0, 20, 20, 0.9, 1],
+        [0, 0, 30, 30, 0.4, 0],
+        [5, 5, 15, 15, 0.7, 0],
+    )
+    detector = YOLOActivityDetector()
+
+    result = detector.detect_activity(mock_image)
+
+    # Confidence is left to predict's conf, which the mock does not apply.
+    assert result.detections.xyxy.tolist() == [
+        [0, 0, 10, 10],
+        [0, 0, 30, 30],
+        [5, 5, 15, 15],
+    ]
+    assert result.detections.confidence.tolist() == pytest.approx([0.9, 0.4, 0.7])
+    assert result.detections.class_id.tolist() == [0, 0, 0]
+
+
+class FakeTokenizer:
+    bos_token_id = 0
+    vocab = {"yes": 1, "Yes": 2, "YES": 3, "no": 4, "No": 5, "NO": 6}
+
+    def encode(self, text, add_special_tokens=False):
+        word = text.strip()
+        return [self.vocab[word]] if word in self.vocab else [7, 8, 9]
+
+
+class FakeTextModel(torch.nn.Module):
+    def __init__(self, answer_logits):
+        super().__init__()
+        self.embedding = torch.nn.Embedding(10, 4)
+        self.answer_logits = answer_logits
+        self.calls = []
+
+    def get_input_embeddings(self):
+        return self.embedding
+
+    def forward(self, inputs_embeds):
+        self.calls.append(inputs_embeds.shape)
+        logits = torch.zeros(*inputs_embeds.shape[:2], 10)
+        logits[:, -1] = self.answer_logits[: len(inputs_embeds)]
+        return MagicMock(logits=logits)
+
+
+@pytest.fixture
+def scoring_moondream():
+    def make(answer_logits, **kwargs):
+        model = MagicMock()
+        model.text_model = FakeTextModel(answer_logits)
+        model.encode_image.side_effect = lambda images: torch.zeros(len(images), 3, 4)
+        with (
+            patch("transformers.AutoModelForCausalLM.from_pretrained") as mock_model,
+            patch(
+                "transformers.AutoTokenizer.from_pretrained",
+                return_value=FakeTokenizer(),
+            ),
+        ):
+            mock_model.return_value.to.return_value = model
+            return MoondreamActivityDetector("model_id", "revision", **kwargs), model
+
+    return make
+
+
+def test_moondream_scores_yes_against_no_in_one_pass(scoring_moondream, mock_image):
+    # "Yes" is 2 logits ahead of "no" for the first image and behind for the second.
+    logits = torch.tensor(
+        [
+            [0, 0, 2, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 3, 0, 0, 0, 0],
+        ],
+        dtype=torch.float32,
+    )
+    detector, model = scoring_moondream(logits)
+
+    results = detector.detect_batch([mock_image, mock_image])
+
+    model.encode_image.assert_called_once_with([mock_image, mock_image])
+    model.answer_question.assert_not_called()
+    # BOS, three image embeddings and the question tokens, in one call.
+    assert model.text_model.calls == [torch.Size([2, 1 + 3 + 3, 4])]
+    assert [result.detected for result in results] == [True, False]
+    assert results[0].confidence > 0.5 > results[1].confidence
+    assert results[0].confidence + results[1].confidence < 1
+
+
+def test_moondream_temperature_and_threshold(scoring_moondream, mock_image):
+    logits = torch.zeros(1, 10)
+    logits[0, 1] = 2.0
+    confident, _ = scoring_moondream(logits)
+    softened, _ = scoring_moondream(logits, temperature=4.0, threshold=0.9)
+
+    sharp = confident.detect_activity(mock_image)
+    soft = softened.detect_activity(mock_image)
+
+    assert 0.5 < soft.confidence < sharp.confidence
+    assert sharp.detected is True
+    assert soft.detected is False
+
+
+def test_moondream_rejects_invalid_mode(mock_moondream_model):
+    with pytest.raises(ValueError, match="Invalid mode"):
+        MoondreamActivityDetector("model_id", "revision", mode="chat")
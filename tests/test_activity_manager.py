@@ -0,0 +1,523 @@
+import copy
+import threading
+import time
+from queue import Queue
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from activity_detection.activity_manager import ActivityManager, CameraStream
+from activity_detection.classifiers.types import Detections, Prediction
+from activity_detection.inputs.camera_input import EndOfStream, IPCamera
+from activity_detection.pipeline.degradation import DegradationController
+from activity_detection.processing.image_processing import BoxTransform
+from activity_detection.registry import COMPONENT_MAPPING
+
+
+def make_camera(name):
+    return CameraStream(name, MagicMock(), MagicMock())
+
+
+def queue_frame(manager, camera, frame, captured_at=None):
+    camera.frame_queue.put((captured_at or time.monotonic(), frame))
+    manager.frames_available.release()
+
+
+@pytest.fixture
+def manager():
+    activity_detector = MagicMock()
+    activity_detector.detect_batch.side_effect = lambda images: [
+        Prediction(detected=bool(image.any())) for image in images
+    ]
+    image_processor = MagicMock()
+    image_processor.process_frame.side_effect = lambda frame: frame
+    image_processor.get_transform.return_value = BoxTransform()
+    return ActivityManager(
+        [make_camera("front"), make_camera("back")],
+        image_processor,
+        activity_detector,
+        batch_size=3,
+        batch_timeout_ms=10,
+    )
+
+
+def test_collect_batch_stops_at_batch_size(manager):
+    front = manager.cameras[0]
+    for i in range(5):
+        queue_frame(manager, front, np.full((2, 2), i))
+
+    batch = manager._collect_batch()
+
+    assert [frame[0, 0] for _, _, frame in batch] == [0, 1, 2]
+    assert front.frame_queue.qsize() == 2
+
+
+def test_collect_batch_returns_partial_batch_after_timeout(manager):
+    queue_frame(manager, manager.cameras[0], np.zeros((2, 2)))
+
+    batch = manager._collect_batch()
+
+    assert len(batch) == 1
+
+
+def test_collect_batch_round_robins_between_cameras(manager):
+    front, back = manager.cameras
+    for i in range(3):
+        queue_frame(manager, front, np.full((2, 2), i))
+    queue_frame(manager, back, np.full((2, 2), 10))
+
+    batch = manager._collect_batch()
+
+    assert [(camera.name, frame[0, 0]) for camera, _, frame in batch] == [
+        ("front", 0),
+        ("back", 10),
+        ("front", 1),
+    ]
+
+
+def test_process_frames_fans_out_predictions_to_each_camera(manager):
+    front, back = manager.cameras
+    frames = [np.zeros((2, 2)), np.ones((2, 2)), np.zeros((2, 2))]
+    queue_frame(manager, front, frames[0])
+    queue_frame(manager, back, frames[1])
+    queue_frame(manager, front, frames[2])
+
+    def stop_after_batch(images):
+        manager.running = False
+        return [Prediction(detected=bool(image.any())) for image in images]
+
+    manager.activity_detector.detect_batch.side_effect = stop_after_batch
+    manager.process_frames()
+
+    manager.activity_detector.detect_batch.assert_called_once()
+    front_results = [front.processed_frame_queue.get_nowait() for _ in range(2)]
+    back_frame, back_prediction = back.processed_frame_queue.get_nowait()
+    assert front_results[0][0] is frames[0]
+    assert front_results[1][0] is frames[2]
+    assert back_frame is frames[1]
+    assert back_prediction.detected is True
+
+
+def test_process_frames_does_not_wait_for_a_stuck_writer(manager):
+    front, back = manager.cameras
+    front.processed_frame_queue = Queue(maxsize=1)
+    front.processed_frame_queue.put("unwritten")
+    queue_frame(manager, front, np.zeros((2, 2)))
+    queue_frame(manager, back, np.ones((2, 2)))
+
+    def stop_after_batch(images):
+        manager.running = False
+        return [Prediction(detected=bool(image.any())) for image in images]
+
+    manager.activity_detector.detect_batch.side_effect = stop_after_batch
+    processing = threading.Thread(target=manager.process_frames, daemon=True)
+    processing.start()
+    processing.join(timeout=5)
+
+    assert not processing.is_alive()
+    assert back.processed_frame_queue.get_nowait()[1].detected is True
+    assert manager.metrics.counters["frames_dropped", "front"] == 1
+    assert manager.metrics.counters["frames_processed", "front"] == 0
+    assert 'activity_detection_frames_dropped_total{camera="front"} 1' in (
+        manager.metrics.render()
+    )
+    assert "frames_dropped 1" in manager.metrics.summary("front")
+
+
+def test_process_frames_skips_a_batch_the_detector_fails_on(manager):
+    front = manager.cameras[0]
+    front.last_prediction = Prediction(detected=True)
+    queue_frame(manager, front, np.ones((2, 2)))
+    queue_frame(manager, front, np.ones((2, 2)))
+    manager.batch_size = 1
+    batches = []
+
+    def fail_then_stop(images):
+        batches.append(images)
+        if len(batches) == 1:
+            raise ConnectionError("Detector server is restarting")
+        manager.running = False
+        return [Prediction(detected=False) for _ in images]
+
+    manager.activity_detector.detect_batch.side_effect = fail_then_stop
+    manager.process_frames()
+
+    results = [front.processed_frame_queue.get_nowait() for _ in range(2)]
+    assert [prediction.detected for _, prediction in results] == [True, False]
+    assert manager.metrics.counters["inference_errors", ""] == 1
+    assert manager.metrics.counters["inferences_skipped", "front"] == 1
+
+
+def test_process_frames_maps_boxes_to_source_frame(manager):
+    front = manager.cameras[0]
+    manager.image_processor.get_transform.return_value = BoxTransform(
+        scale_x=0.5, scale_y=0.5, pad_x=0, pad_y=10, source_size=(100, 100)
+    )
+    queue_frame(manager, front, np.ones((100, 100)))
+
+    def stop_after_batch(images):
+        manager.running = False
+        return [
+            Prediction(detected=True, detections=Detections(xyxy=[[5, 15, 25, 35]]))
+        ]
+
+    manager.activity_detector.detect_batch.side_effect = stop_after_batch
+    manager.process_frames()
+
+    _, prediction = front.processed_frame_queue.get_nowait()
+    assert prediction.bounding_box.tolist() == [[10, 10, 50, 50]]
+
+
+def test_invalid_batch_size():
+    with pytest.raises(ValueError, match="Batch size must be at least 1"):
+        ActivityManager([make_camera("front")], MagicMock(), MagicMock(), 0)
+
+
+def test_camera_names_must_be_unique():
+    with pytest.raises(ValueError, match="Camera names must be unique"):
+        ActivityManager(
+            [make_camera("front"), make_camera("front")], MagicMock(), MagicMock()
+        )
+
+
+@patch("activity_detection.activity_manager.ActivityManager.create_object")
+def test_from_config_shares_detector_between_cameras(mock_create_object):
+    mock_create_object.side_effect = lambda component_type, *args, **kwargs: MagicMock(
+        name=component_type
+    )
+    config = {
+        "image_processor": {"DefaultImageProcessor": {}},
+        "activity_detector": {"YOLOActivityDetector": {"args": [0.9]}},
+        "security_logging": {"DefaultSecurityLogging": {}},
+        "video_capture": {"DefaultVideoCapture": {"args": ["videos"]}},
+        "cameras": [
+            {"name": "front", "camera_input": {"LocalCamera": {"args": [0]}}},
+            {"name": "back", "camera_input": {"LocalCamera": {"args": [1]}}},
+        ],
+    }
+
+    manager = ActivityManager.from_config(config)
+
+    assert [camera.name for camera in manager.cameras] == ["front", "back"]
+    detector_calls = [
+        call
+        for call in mock_create_object.call_args_list
+        if call.args[0] == "activity_detector"
+    ]
+    assert len(detector_calls) == 1
+    front, back = manager.cameras
+    assert front.security_module is not back.security_module
+    mock_create_object.assert_any_call(
+        "video_capture", "DefaultVideoCapture", "videos", camera_name="back"
+    )
+
+
+def test_process_frames_reuses_last_prediction_when_gated(manager):
+    front = manager.cameras[0]
+    front.motion_detector = MagicMock()
+    front.motion_detector.should_run_detector.side_effect = [True, False, False]
+    frames = [np.ones((2, 2)), np.zeros((2, 2)), np.zeros((2, 2))]
+    for frame in frames:
+        queue_frame(manager, front, frame)
+
+    def stop_after_batch(images):
+        manager.running = False
+        return [Prediction(detected=bool(image.any())) for image in images]
+
+    manager.activity_detector.detect_batch.side_effect = stop_after_batch
+    manager.process_frames()
+
+    images = manager.activity_detector.detect_batch.call_args.args[0]
+    assert len(images) == 1
+    results = [front.processed_frame_queue.get_nowait() for _ in frames]
+    assert [prediction.detected for _, prediction in results] == [True, True, True]
+
+
+def test_degradation_steps_down_input_size_stride_and_frame_rate():
+    activity_detector = MagicMock()
+    activity_detector.input_size = 640
+    image_processor = MagicMock()
+    camera = CameraStream("front", IPCamera("rtsp://example.com"), MagicMock())
+    degradation = DegradationController(
+        100,
+        steps=[{"input_size": 320, "inference_stride": 2, "target_fps": 10}],
+    )
+    manager = ActivityManager(
+        [camera], image_processor, activity_detector, degradation=degradation
+    )
+    degradation.next_decision = 0
+    degradation.observe(1.0)
+
+    manager._adapt()
+
+    assert degradation.level == 1
+    activity_detector.set_input_size.assert_called_with(320)
+    image_processor.set_input_size.assert_called_with(320)
+    assert manager._inference_stride() == 2
+    assert camera.camera_input.target_fps == 10
+    assert manager.metrics.counters["degradation_steps", ""] == 1
+    assert 'activity_detection_degradation_level{camera=""} 1' in (
+        manager.metrics.render()
+    )
+
+
+def test_degradation_skips_input_size_the_detector_cannot_change():
+    activity_detector = MagicMock()
+    activity_detector.input_size = None
+    activity_detector.set_input_size.side_effect = ValueError
+    degradation = DegradationController(
+        100, steps=[{"input_size": 320}, {"inference_stride": 2}]
+    )
+
+    ActivityManager(
+        [make_camera("front")], MagicMock(), activity_detector, degradation=degradation
+    )
+
+    assert degradation.steps == [{"inference_stride": 2}]
+
+
+def test_degradation_skips_target_fps_without_live_cameras():
+    activity_detector = MagicMock()
+    activity_detector.input_size = 640
+    degradation = DegradationController(
+        100, steps=[{"inference_stride": 2}, {"target_fps": 10}]
+    )
+
+    ActivityManager(
+        [make_camera("front")], MagicMock(), activity_detector, degradation=degradation
+    )
+
+    assert degradation.steps == [{"inference_stride": 2}]
+
+
+def test_process_frames_uses_tracker_between_strided_inferences(manager):
+    manager.inference_stride = 2
+    front = manager.cameras[0]
+    front.object_tracker = MagicMock()
+    front.object_tracker.update.side_effect = lambda prediction: prediction
+    front.object_tracker.predict.return_value = Prediction(detected=True)
+    frames = [np.zeros((2, 2)), np.zeros((2, 2)), np.zeros((2, 2))]
+    for frame in frames:
+        queue_frame(manager, front, frame)
+
+    def stop_after_batch(images):
+        manager.running = False
+        return [Prediction(detected=False) for _ in images]
+
+    manager.activity_detector.detect_batch.side_effect = stop_after_batch
+    manager.process_frames()
+
+    assert len(manager.activity_detector.detect_batch.call_args.args[0]) == 2
+    assert front.object_tracker.update.call_count == 2
+    front.object_tracker.predict.assert_called_once()
+    results = [front.processed_frame_queue.get_nowait() for _ in frames]
+    assert [prediction.detected for _, prediction in results] == [False, True, False]
+
+
+def test_process_frames_skips_detector_on_stale_frames(manager):
+    manager.max_frame_age = 0.5
+    front = manager.cameras[0]
+    queue_frame(manager, front, np.ones((2, 2)), captured_at=time.monotonic() - 1)
+    queue_frame(manager, front, np.ones((2, 2)))
+
+    def stop_after_batch(images):
+        manager.running = False
+        return [Prediction(detected=True) for _ in images]
+
+    manager.activity_detector.detect_batch.side_effect = stop_after_batch
+    manager.process_frames()
+
+    assert len(manager.activity_detector.detect_batch.call_args.args[0]) == 1
+    assert manager.metrics.counters["frames_stale", "front"] == 1
+    assert manager.metrics.histograms["latency", "front"].count == 1
+    results = [front.processed_frame_queue.get_nowait() for _ in range(2)]
+    assert [prediction.detected for _, prediction in results] == [False, True]
+
+
+def test_capture_frames_does_not_count_replaced_frames(manager):
+    front = CameraStream("front", MagicMock(), MagicMock(), queue_policy="latest")
+    manager.cameras = [front]
+    frames = [np.zeros((2, 2)), np.ones((2, 2))]
+
+    def get_frame_with_timestamp():
+        if len(frames) == 1:
+            manager.running = False
+        return frames.pop(0), time.monotonic()
+
+    front.camera_input.get_frame_with_timestamp.side_effect = get_frame_with_timestamp
+    manager.capture_frames(front)
+
+    assert manager.metrics.counters["frames_dropped", "front"] == 1
+    assert manager.frames_available.acquire(False)
+    assert not manager.frames_available.acquire(False)
+    _, _, frame = manager._next_frame()
+    assert frame.all()
+
+
+def test_warm_up_runs_single_and_full_batches_at_the_frame_shape(manager):
+    manager.warmup_frame_shape = (48, 64, 3)
+
+    manager.warm_up()
+
+    sizes = [
+        len(call.args[0])
+        for call in manager.activity_detector.detect_batch.call_args_list
+    ]
+    assert sizes == [1, 3, 1, 3]
+    frame = manager.image_processor.process_frame.call_args.args[0]
+    assert frame.shape == (48, 64, 3)
+    assert frame.dtype == np.uint8
+    assert manager.metrics.histograms["warmup", ""].count == 1
+
+
+def test_warm_up_can_be_disabled():
+    manager = ActivityManager(
+        [make_camera("front")], MagicMock(), MagicMock(), warmup_runs=0
+    )
+
+    manager.warm_up()
+
+    manager.activity_detector.detect_batch.assert_not_called()
+
+
+def endless_input():
+    camera_input = MagicMock()
+
+    def get_frame_with_timestamp():
+        time.sleep(0.001)
+        return np.ones((2, 2)), time.monotonic()
+
+    camera_input.get_frame_with_timestamp.side_effect = get_frame_with_timestamp
+    return camera_input
+
+
+def test_run_drains_queued_frames_once_every_camera_has_ended(manager):
+    manager.warmup_runs = 0
+    for camera in manager.cameras:
+        camera.camera_input.get_frame_with_timestamp.side_effect = [
+            (np.ones((2, 2)), time.monotonic()) for _ in range(5)
+        ] + [EndOfStream()]
+
+    manager.run_activity_detection()
+
+    for camera in manager.cameras:
+        assert camera.security_module.process_frame.call_count == 5
+        camera.security_module.close.assert_called_once()
+
+
+def test_stop_finishes_the_captured_frames_and_returns(manager):
+    manager.warmup_runs = 0
+    for camera in manager.cameras:
+        camera.camera_input = endless_input()
+    threading.Timer(0.2, manager.stop).start()
+
+    manager.run_activity_detection()
+
+    for camera in manager.cameras:
+        captured = manager.metrics.counters["frames_captured", camera.name]
+        assert captured > 0
+        assert manager.metrics.counters["frames_written", camera.name] == captured
+        assert not camera.capture_thread.is_alive()
+        assert not camera.write_thread.is_alive()
+
+
+class FakeDetector:
+    def __init__(self, model_path, confidence_threshold=0.5):
+        pass
+
+
+@pytest.fixture
+def reloadable(monkeypatch):
+    monkeypatch.setitem(
+        COMPONENT_MAPPING["activity_detector"], "FakeDetector", FakeDetector
+    )
+    manager = ActivityManager(
+        [make_camera("front"), make_camera("back")],
+        MagicMock(),
+        MagicMock(),
+        warmup_runs=0,
+    )
+    manager.config = {
+        "image_processor": {"DefaultImageProcessor": {}},
+        "activity_detector": {"FakeDetector": {"args": ["model.pt", 0.5]}},
+        "security_logging": {"DefaultSecurityLogging": {}},
+        "video_capture": {"DefaultVideoCapture": {"args": ["videos"]}},
+        "security_module": {"stop_threshold": 10},
+        "activity_manager": {"batch_size": 1},
+        "cameras": [
+            {"name": "front", "camera_input": {"LocalCamera": {"args": [0]}}},
+            {"name": "back", "camera_input": {"LocalCamera": {"args": [1]}}},
+        ],
+    }
+    return manager
+
+
+@patch("activity_detection.activity_manager.ActivityManager.camera_from_config")
+def test_reload_changes_settings_in_place(mock_camera_from_config, reloadable):
+    config = copy.deepcopy(reloadable.config)
+    config["activity_detector"]["FakeDetector"]["args"][1] = 0.7
+    config["security_module"]["stop_threshold"] = 20
+    config["activity_manager"] = {"batch_size": 8, "inference_stride": 2}
+
+    reloadable.reload(config)
+
+    reloadable.activity_detector.reconfigure.assert_called_once_with(
+        confidence_threshold=0.7
+    )
+    assert reloadable.inference_stride == 2
+    assert [camera.security_module.stop_threshold for camera in reloadable.cameras] == [
+        20,
+        20,
+    ]
+    # Batch size needs a restart, so the running config keeps the old one.
+    assert reloadable.config["activity_manager"] == {
+        "batch_size": 1,
+        "inference_stride": 2,
+    }
+    mock_camera_from_config.assert_not_called()
+
+
+def test_reload_keeps_the_model_when_it_changes(reloadable):
+    config = copy.deepcopy(reloadable.config)
+    config["activity_detector"] = {"OtherDetector": {"args": ["big.pt"]}}
+
+    reloadable.reload(config)
+
+    reloadable.activity_detector.reconfigure.assert_not_called()
+    assert reloadable.config["activity_detector"] == {
+        "FakeDetector": {"args": ["model.pt", 0.5]}
+    }
+
+
+@patch("activity_detection.activity_manager.ActivityManager.camera_from_config")
+def test_reload_restarts_only_the_cameras_that_changed(
+    mock_camera_from_config, reloadable
+):
+    def camera_from_config(config, camera_config, event_store=None):
+        camera = make_camera(camera_config["name"])
+        camera.camera_input.get_frame_with_timestamp.side_effect = EndOfStream
+        return camera
+
+    mock_camera_from_config.side_effect = camera_from_config
+    old_front, old_back = reloadable.cameras
+    config = copy.deepcopy(reloadable.config)
+    config["cameras"] = [
+        {"name": "front", "camera_input": {"IPCamera": {"args": ["rtsp://front"]}}},
+        {"name": "side", "camera_input": {"LocalCamera": {"args": [2]}}},
+    ]
+
+    reloadable.reload(config)
+
+    assert [camera.name for camera in reloadable.cameras] == ["front", "side"]
+    assert reloadable.cameras[0] is not old_front
+    assert [
+        call.args[1]["name"] for call in mock_camera_from_config.call_args_list
+    ] == ["front", "side"]
+    for old in (old_front, old_back):
+        old.camera_input.stop_capture.assert_called_once()
+        old.security_module.close.assert_called_once()
+    assert reloadable.camera_names == ["front", "side"]
+    reloadable.shutdown()
+    for camera in reloadable.cameras:
+        assert not camera.write_thread.is_alive()
@@ -0,0 +1,125 @@
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+import pytest
+
+from activity_detection.activity_manager import ActivityManager
+from activity_detection.archive.chunks import split_frames
+from activity_detection.archive.scan import (
+    Event,
+    EventBuilder,
+    merge_events,
+    scan_archive,
+)
+from activity_detection.classifiers.types import Detections, Prediction
+
+
+def write_video(path, num_frames, person_frames=()):
+    writer = cv2.VideoWriter(
+        str(path), cv2.VideoWriter.fourcc("m", "p", "4", "v"), 10, (64, 48)
+    )
+    for i in range(num_frames):
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        if i in person_frames:
+            frame[:] = 255
+        writer.write(frame)
+    writer.release()
+
+
+class BrightFrameDetector:
+    """Reports a person in every frame that is not black."""
+
+    input_size = None
+
+    def detect_batch(self, images):
+        return [
+            Prediction(
+                detected=bool(image.any()),
+                detections=Detections(xyxy=[[0, 0, 10, 10]], confidence=np.array([0.8]))
+                if image.any()
+                else Detections(),
+            )
+            for image in images
+        ]
+
+
+def test_split_frames_at_exact_counts():
+    assert split_frames(10, 4) == [(0, 4), (4, 8), (8, 10)]
+
+
+def test_split_frames_moves_boundaries_to_keyframes():
+    assert split_frames(100, 30, keyframes=[0, 25, 50, 75]) == [
+        (0, 50),
+        (50, 100),
+    ]
+
+
+def test_event_builder_ends_events_after_stop_threshold():
+    builder = EventBuilder("video.mp4", fps=10, stop_threshold=2)
+    detected = Prediction(detected=True)
+    for index, prediction in enumerate(
+        [detected, Prediction(False), detected, Prediction(False), Prediction(False)]
+    ):
+        builder.add(index, prediction)
+    builder.add(5, detected)
+
+    events = builder.finish()
+
+    assert [(event.start_s, event.end_s) for event in events] == [(0, 0.3), (0.5, 0.6)]
+    assert events[0].detected_frames == 2
+
+
+def test_event_builder_uses_image_level_confidence_without_boxes():
+    builder = EventBuilder("video.mp4", fps=10, stop_threshold=2)
+
+    builder.add(0, Prediction(detected=True, confidence=0.7))
+    builder.add(1, Prediction(detected=True, confidence=0.9))
+
+    assert builder.finish()[0].max_confidence == 0.9
+
+
+def test_merge_events_joins_events_split_by_chunks():
+    events = [
+        Event("b.mp4", 0, 1, 10, 0.5),
+        Event("a.mp4", 10, 12, 20, 0.7),
+        Event("a.mp4", 0, 5, 50, 0.9),
+        Event("a.mp4", 5.5, 8, 25, 0.6),
+    ]
+
+    merged = merge_events(events, max_gap_s=1)
+
+    assert [(e.path, e.start_s, e.end_s) for e in merged] == [
+        ("a.mp4", 0, 8),
+        ("a.mp4", 10, 12),
+        ("b.mp4", 0, 1),
+    ]
+    assert merged[0].detected_frames == 75
+    assert merged[0].max_confidence == 0.9
+
+
+def test_scan_archive_merges_chunks_into_one_timeline(tmp_path):
+    write_video(tmp_path / "a.mp4", 40, person_frames=range(5, 25))
+    write_video(tmp_path / "b.mp4", 20)
+    (tmp_path / "corrupt.mp4").write_bytes(b"not a video")
+    create_object = ActivityManager.create_object
+    config = {
+        "image_processor": {"LetterboxImageProcessor": {}},
+        "activity_detector": {"StubDetector": {}},
+        "security_module": {"stop_threshold": 5},
+        "activity_manager": {"batch_size": 4},
+    }
+
+    with patch.object(ActivityManager, "create_object") as mock_create_object:
+        mock_create_object.side_effect = lambda component_type, *args, **kwargs: (
+            BrightFrameDetector()
+            if component_type == "activity_detector"
+            else create_object(component_type, *args, **kwargs)
+        )
+        events = scan_archive(config, str(tmp_path), workers=1, chunk_seconds=1)
+
+    assert len(events) == 1
+    assert events[0].path.endswith("a.mp4")
+    assert events[0].start_s == pytest.approx(0.5)
+    assert events[0].end_s == pytest.approx(2.5)
+    assert events[0].detected_frames == 20
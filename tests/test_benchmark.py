@@ -0,0 +1,77 @@
+import numpy as np
+
+from activity_detection.benchmark.harness import build_cases, run_case
+from activity_detection.benchmark.replay import ReplayInput, synthetic_clip
+
+
+def test_replay_input_stops_after_num_frames():
+    clip = [np.full((2, 2, 3), i, dtype=np.uint8) for i in range(2)]
+    replay = ReplayInput(clip, 3)
+    replay.start_capture()
+
+    frames = [replay.get_frame()[0, 0, 0] for _ in range(3)]
+
+    assert frames == [0, 1, 0]
+    assert not replay.finished.is_set()
+    replay.stop_capture()
+    replay.get_frame()
+    assert replay.finished.is_set()
+
+
+def test_build_cases_replaces_config_sections():
+    suite = {
+        "defaults": {
+            "frames": 10,
+            "config": {
+                "image_processor": {"DefaultImageProcessor": {}},
+                "activity_manager": {"batch_size": 2},
+            },
+        },
+        "cases": [
+            {"name": "a"},
+            {
+                "name": "b",
+                "config": {"image_processor": {"LetterboxImageProcessor": {}}},
+            },
+        ],
+    }
+
+    a, b = build_cases(suite)
+
+    assert a["frames"] == b["frames"] == 10
+    assert b["config"]["image_processor"] == {"LetterboxImageProcessor": {}}
+    assert b["config"]["activity_manager"] == {"batch_size": 2}
+
+
+def test_run_case_reports_every_frame(tmp_path):
+    settings = {
+        "name": "stub",
+        "frames": 20,
+        "cameras": 2,
+        "source": {"synthetic": {"width": 64, "height": 48, "length": 5}},
+        "config": {
+            "image_processor": {"LetterboxImageProcessor": {}},
+            "activity_detector": {
+                "StubActivityDetector": {"kwargs": {"latency_ms": 0, "detect": True}}
+            },
+            "security_logging": {"DefaultSecurityLogging": {}},
+            "video_capture": {"DefaultVideoCapture": {"args": [str(tmp_path)]}},
+            "frame_queue": {"policy": "block"},
+        },
+        "timeout_s": 30,
+    }
+
+    result = run_case(settings)
+
+    assert result["completed"] is True
+    assert result["frames_written"] == 40
+    assert result["frames_dropped"] == 0
+    assert result["latency_p99_ms"] >= result["latency_p50_ms"]
+    assert result["peak_rss_mb"] > 0
+
+
+def test_synthetic_clip_moves_a_box():
+    clip = synthetic_clip(64, 48, length=3)
+
+    assert len(clip) == 3
+    assert not np.array_equal(clip[0], clip[-1])
@@ -1,6 +1,16 @@
+import os
+import threading
+import time
+
+import cv2
 import pytest
 from unittest.mock import Mock, patch
-from activity_detection.inputs.camera_input import IPCamera, LocalCamera
+from activity_detection.inputs.camera_input import (
+    EndOfStream,
+    IPCamera,
+    LocalCamera,
+    VideoFileInput,
+)
 import numpy as np
 
 
@@ -49,16 +59,18 @@ def test_get_frame_success(mock_video_capture):
     mock_frame = np.array([[1, 2], [3, 4]])
     mock_capture = Mock()
     mock_capture.get.return_value = 30
-    mock_capture.read.return_value = (True, mock_frame)
+    mock_capture.grab.return_value = True
+    mock_capture.retrieve.return_value = (True, mock_frame)
     mock_video_capture.return_value = mock_capture
 
     camera = IPCamera("rtsp://example.com/stream")
     camera.start_capture()
-    frame = camera.get_frame()
+    frame, grabbed_at = camera.get_frame_with_timestamp()
+    camera.stop_capture()
 
-    assert frame is not None
     assert isinstance(frame, np.ndarray)
     assert (frame == mock_frame).all()
+    assert grabbed_at <= time.monotonic()
 
 
 def test_get_frame_failure():
@@ -68,18 +80,82 @@ def test_get_frame_failure():
 
 
 @patch("cv2.VideoCapture")
-def test_get_frame_read_failure(mock_video_capture):
+def test_unwanted_frames_are_grabbed_but_not_decoded(mock_video_capture):
     mock_capture = Mock()
     mock_capture.get.return_value = 30
-    mock_capture.read.return_value = (False, None)
+    mock_capture.grab.return_value = True
+    mock_capture.retrieve.return_value = (True, np.zeros((2, 2), dtype=np.uint8))
     mock_video_capture.return_value = mock_capture
 
     camera = IPCamera("rtsp://example.com/stream")
     camera.start_capture()
-    with pytest.raises(IOError, match="Failed to retrieve frame from camera"):
+    camera.get_frame()
+    time.sleep(0.05)
+    camera.stop_capture()
+
+    assert camera.frames_decoded == 1
+    assert camera.frames_grabbed > camera.frames_decoded
+
+
+@patch("cv2.VideoCapture")
+def test_reader_reconnects_when_grab_fails(mock_video_capture):
+    mock_frame = np.zeros((2, 2), dtype=np.uint8)
+    broken = Mock()
+    broken.isOpened.return_value = True
+    broken.get.return_value = 30
+    broken.grab.return_value = False
+    working = Mock()
+    working.isOpened.return_value = True
+    working.grab.return_value = True
+    working.retrieve.return_value = (True, mock_frame)
+    mock_video_capture.side_effect = [broken, working]
+
+    camera = IPCamera("rtsp://example.com/stream", reconnect_delay=0.01)
+    camera.start_capture()
+    frame = camera.get_frame()
+    camera.stop_capture()
+
+    assert (frame == mock_frame).all()
+    assert camera.reconnects == 1
+    assert broken.release.called
+
+
+@patch("cv2.VideoCapture")
+def test_stopping_capture_ends_the_stream(mock_video_capture):
+    mock_capture = Mock()
+    mock_capture.get.return_value = 30
+    mock_capture.grab.return_value = False
+    mock_video_capture.return_value = mock_capture
+
+    camera = IPCamera("rtsp://example.com/stream", reconnect_delay=10)
+    camera.start_capture()
+    threading.Timer(0.05, camera.stop_capture).start()
+    with pytest.raises(EndOfStream):
         camera.get_frame()
 
 
+@patch("cv2.VideoCapture")
+def test_stop_capture_leaves_a_blocked_reader_behind(mock_video_capture):
+    unblocked = threading.Event()
+    mock_capture = Mock()
+    mock_capture.get.return_value = 30
+    mock_capture.grab.side_effect = lambda: unblocked.wait() or True
+    mock_video_capture.return_value = mock_capture
+
+    camera = IPCamera("rtsp://example.com/stream")
+    camera.start_capture()
+    reader = camera.reader
+    started = time.monotonic()
+    camera.stop_capture(timeout=0.05)
+
+    assert time.monotonic() - started < 1
+    assert not mock_capture.release.called
+    unblocked.set()
+    reader.join(timeout=1)
+    assert mock_capture.release.called
+    assert camera.capture is None
+
+
 @patch("cv2.VideoCapture")
 def test_local_camera_start_capture_success(mock_video_capture):
     mock_capture = Mock()
@@ -103,3 +179,72 @@ def test_local_camera_start_capture_failure(mock_video_capture):
     camera = LocalCamera()
     with pytest.raises(IOError, match="Cannot open camera"):
         camera.start_capture()
+
+
+def write_numbered_video(path, num_frames):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter.fourcc(*"mp4v"), 10, (32, 32))
+    for i in range(num_frames):
+        writer.write(np.full((32, 32, 3), i * 20, dtype=np.uint8))
+    writer.release()
+
+
+def read_all(camera):
+    frames = []
+    with pytest.raises(EndOfStream):
+        while True:
+            frames.append(camera.get_frame())
+    return frames
+
+
+def test_video_file_input_reads_range_then_ends(tmp_path):
+    write_numbered_video(tmp_path / "clip.mp4", 10)
+
+    camera = VideoFileInput(str(tmp_path / "clip.mp4"), start_frame=2, end_frame=5)
+    camera.start_capture()
+    frames = read_all(camera)
+
+    assert len(frames) == 3
+    assert abs(int(frames[0].mean()) - 40) < 10
+
+
+def test_video_file_input_plays_directory_in_order(tmp_path):
+    write_numbered_video(tmp_path / "b.mp4", 3)
+    write_numbered_video(tmp_path / "a.mp4", 2)
+    (tmp_path / "notes.txt").write_text("not a video")
+
+    camera = VideoFileInput(str(tmp_path))
+    camera.start_capture()
+
+    assert [os.path.basename(f) for f in camera.files] == ["a.mp4", "b.mp4"]
+    assert len(read_all(camera)) == 5
+
+
+def test_video_file_input_skips_files_it_cannot_open(tmp_path):
+    write_numbered_video(tmp_path / "a.mp4", 2)
+    (tmp_path / "b.mp4").write_bytes(b"not a video")
+    write_numbered_video(tmp_path / "c.mp4", 3)
+
+    camera = VideoFileInput(str(tmp_path))
+    camera.start_capture()
+
+    assert len(read_all(camera)) == 5
+
+
+def test_video_file_input_range_needs_single_file(tmp_path):
+    write_numbered_video(tmp_path / "a.mp4", 2)
+    write_numbered_video(tmp_path / "b.mp4", 2)
+
+    with pytest.raises(ValueError, match="single video file"):
+        VideoFileInput(str(tmp_path), start_frame=1)
+
+
+def test_set_target_fps_changes_frame_interval():
+    camera = IPCamera("rtsp://example.com/stream")
+    camera.original_fps = 30
+
+    camera.set_target_fps(10)
+
+    assert camera.target_fps == 10
+    assert camera.frame_interval == 3
+    with pytest.raises(ValueError):
+        camera.set_target_fps(0)
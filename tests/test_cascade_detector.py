@@ -0,0 +1,149 @@
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from activity_detection.activity_manager import ActivityManager
+from activity_detection.classifiers import CascadeActivityDetector
+from activity_detection.classifiers.interfaces import ActivityDetectionInterface
+from activity_detection.classifiers.types import Detections, Prediction
+from activity_detection.registry import COMPONENT_MAPPING
+
+
+class FakeDetector(ActivityDetectionInterface):
+    def __init__(self, predictions):
+        super().__init__()
+        self.predictions = predictions
+        self.batches = []
+
+    def detect_activity(self, image):
+        return self.detect_batch([image])[0]
+
+    def detect_batch(self, images):
+        self.batches.append(images)
+        return [self.predictions.pop(0) for _ in images]
+
+
+def boxes(*rows):
+    rows = np.array(rows, dtype=np.float32).reshape(-1, 5)
+    return Prediction(
+        detected=len(rows) > 0,
+        detections=Detections(xyxy=rows[:, :4], confidence=rows[:, 4]),
+    )
+
+
+@pytest.fixture
+def image():
+    return Image.new("RGB", (100, 100))
+
+
+def test_only_uncertain_images_reach_the_heavy_detector(image):
+    fast = FakeDetector(
+        [
+            boxes([0, 0, 10, 10, 0.9]),
+            boxes([0, 0, 10, 10, 0.1]),
+            boxes([20, 30, 40, 60, 0.4]),
+            boxes(),
+        ]
+    )
+    heavy = FakeDetector([Prediction(detected=True, confidence=0.8)])
+    cascade = CascadeActivityDetector(fast, heavy)
+
+    results = cascade.detect_batch([image] * 4)
+
+    assert [result.detected for result in results] == [True, False, True, False]
+    assert len(heavy.batches) == 1 and len(heavy.batches[0]) == 1
+    # The uncertain box is kept when the heavy detector gives no boxes.
+    assert results[2].detections.xyxy.tolist() == [[20, 30, 40, 60]]
+    assert results[2].confidence == 0.8
+    assert cascade.stats() == {
+        "fast": 4,
+        "accepted": 1,
+        "rejected": 2,
+        "escalated": 1,
+        "confirmed": 1,
+    }
+
+
+def test_heavy_detector_sees_padded_crop_and_boxes_are_mapped_back(image):
+    fast = FakeDetector([boxes([20, 30, 40, 60, 0.4])])
+    heavy = FakeDetector([boxes([1, 2, 11, 12, 0.7])])
+    cascade = CascadeActivityDetector(fast, heavy, crop_padding=0.5)
+
+    result = cascade.detect_activity(image)
+
+    assert heavy.batches[0][0].size == (40, 60)
+    assert result.detections.xyxy.tolist() == [[11, 17, 21, 27]]
+    assert result.detections.confidence.tolist() == pytest.approx([0.7])
+
+
+def test_heavy_rejection_drops_the_detection(image):
+    fast = FakeDetector([boxes([20, 30, 40, 60, 0.4])])
+    heavy = FakeDetector([Prediction(detected=False)])
+    cascade = CascadeActivityDetector(fast, heavy)
+
+    result = cascade.detect_activity(image)
+
+    assert result.detected is False
+    assert len(result.detections) == 0
+    assert cascade.stats()["confirmed"] == 0
+
+
+def test_array_images_are_cropped_to_rgb(image):
+    frame = np.zeros((100, 100, 3), dtype=np.uint8)
+    frame[..., 0] = 255  # Blue in BGR
+    fast = FakeDetector([boxes([10, 10, 20, 20, 0.4])])
+    heavy = FakeDetector([Prediction(detected=True)])
+    cascade = CascadeActivityDetector(fast, heavy, crop_padding=0)
+
+    cascade.detect_activity(frame)
+
+    crop = heavy.batches[0][0]
+    assert crop.size == (10, 10)
+    assert crop.getpixel((0, 0)) == (0, 0, 255)
+
+
+def test_uncropped_array_images_are_converted_to_rgb():
+    frame = np.zeros((100, 100, 3), dtype=np.uint8)
+    frame[..., 0] = 255  # Blue in BGR
+    fast = FakeDetector([boxes([10, 10, 20, 20, 0.4])])
+    heavy = FakeDetector([Prediction(detected=True)])
+    cascade = CascadeActivityDetector(fast, heavy, crop=False)
+
+    cascade.detect_activity(frame)
+
+    whole = heavy.batches[0][0]
+    assert whole.size == (100, 100)
+    assert whole.getpixel((0, 0)) == (0, 0, 255)
+
+
+def test_image_level_confidence_escalates_whole_image(image):
+    fast = FakeDetector([Prediction(detected=True, confidence=0.5)])
+    heavy = FakeDetector([Prediction(detected=True, confidence=0.9)])
+    cascade = CascadeActivityDetector(fast, heavy)
+
+    cascade.detect_activity(image)
+
+    assert heavy.batches[0][0] is image
+
+
+def test_invalid_band():
+    with pytest.raises(ValueError, match="Uncertain band"):
+        CascadeActivityDetector(FakeDetector([]), FakeDetector([]), 0.7, 0.3)
+
+
+def test_stages_built_from_config(image):
+    config = {
+        "CascadeActivityDetector": {
+            "kwargs": {
+                "fast": {"FakeDetector": {"args": [[boxes([0, 0, 5, 5, 0.3])]]}},
+                "heavy": {"FakeDetector": {"args": [[Prediction(detected=True)]]}},
+            }
+        }
+    }
+    with patch.dict(COMPONENT_MAPPING["activity_detector"], FakeDetector=FakeDetector):
+        cascade = ActivityManager.create_from_config("activity_detector", config)
+
+    assert cascade.detect_activity(image).detected is True
+    assert cascade.stats()["escalated"] == 1
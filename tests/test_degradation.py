@@ -0,0 +1,117 @@
+import pytest
+
+from activity_detection.pipeline.degradation import DegradationController
+
+
+def make_controller(**kwargs):
+    settings = {
+        "target_latency_ms": 100,
+        "steps": [{"input_size": 320}, {"inference_stride": 2}],
+        "interval_s": 1,
+        "recover_after_s": 3,
+    }
+    return DegradationController(**{**settings, **kwargs})
+
+
+def overloaded(controller, now):
+    for _ in range(10):
+        controller.observe(0.5)
+    return controller.update(0.0, now=now)
+
+
+def calm(controller, now):
+    controller.observe(0.01)
+    return controller.update(0.0, now=now)
+
+
+def test_degrades_one_step_per_interval_when_latency_is_over_target():
+    controller = make_controller()
+
+    assert not overloaded(controller, now=0)
+    assert overloaded(controller, now=1)
+    assert controller.level == 1
+    # The window after a step is ignored, as it holds frames from before it.
+    assert not overloaded(controller, now=2)
+    assert overloaded(controller, now=3)
+    assert controller.level == 2
+    assert not overloaded(controller, now=4)
+    assert not overloaded(controller, now=5)
+    assert controller.level == 2
+
+
+def test_degrades_when_frame_queues_fill_up():
+    controller = make_controller()
+    controller.update(0.0, now=0)
+
+    assert controller.update(0.8, now=1)
+    assert controller.level == 1
+
+
+def test_restores_after_sustained_headroom():
+    controller = make_controller()
+    controller.update(0.0, now=0)
+    overloaded(controller, now=1)
+
+    assert not calm(controller, now=2)
+    assert not calm(controller, now=3)
+    assert not calm(controller, now=5)
+    assert calm(controller, now=6)
+    assert controller.level == 0
+    assert controller.limits == {}
+
+
+def test_latency_between_headroom_and_target_holds_the_level():
+    controller = make_controller()
+    controller.update(0.0, now=0)
+    overloaded(controller, now=1)
+    controller.update(0.0, now=2)
+
+    for now in range(3, 10):
+        controller.observe(0.08)
+        assert not controller.update(0.0, now=now)
+    assert controller.level == 1
+
+
+def test_degrade_only_makes_settings_cheaper():
+    controller = make_controller(
+        steps=[{"input_size": 480, "target_fps": 10}, {"inference_stride": 2}]
+    )
+    controller.update(0.0, now=0)
+    overloaded(controller, now=1)
+    controller.update(0.0, now=2)
+    overloaded(controller, now=3)
+
+    assert controller.degrade(
+        {"input_size": 640, "inference_stride": 1, "target_fps": 5}
+    ) == {"input_size": 480, "inference_stride": 2, "target_fps": 5}
+    assert controller.degrade({"input_size": 320, "inference_stride": 3}) == {
+        "input_size": 320,
+        "inference_stride": 3,
+    }
+    assert controller.degrade({"input_size": None}) == {"input_size": None}
+
+
+def test_disable_drops_a_setting_from_the_steps():
+    controller = make_controller(
+        steps=[{"input_size": 320}, {"input_size": 160, "inference_stride": 2}]
+    )
+
+    controller.disable("input_size")
+
+    assert controller.steps == [{"inference_stride": 2}]
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"target_latency_ms": 0},
+        {"steps": [{"brightness": 2}]},
+        {"steps": [{"inference_stride": 0}]},
+        {"steps": [{}]},
+        {"max_queue_fill": 0},
+        {"headroom": 1},
+    ],
+)
+def test_invalid_settings(kwargs):
+    with pytest.raises(ValueError):
+        make_controller(**kwargs)
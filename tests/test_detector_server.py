@@ -0,0 +1,134 @@
+import threading
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from activity_detection.classifiers.remote import RemoteActivityDetector
+from activity_detection.classifiers.types import Prediction
+from activity_detection.serving.protocol import parse_address
+from activity_detection.serving.server import DetectorServer
+
+
+class FakeDetector:
+    input_size = 64
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def detect_batch(self, images):
+        self.batch_sizes.append(len(images))
+        if any(np.asarray(image).shape == (1, 1) for image in images):
+            raise ValueError("Image too small")
+        return [
+            Prediction(
+                detected=bool(np.asarray(image).any()),
+                confidence=float(np.asarray(image).mean()),
+            )
+            for image in images
+        ]
+
+
+@pytest.fixture
+def serve(tmp_path):
+    servers = []
+
+    def serve(detector, **kwargs):
+        server = DetectorServer(detector, str(tmp_path / "detector.sock"), **kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield serve
+    for server in servers:
+        server.close()
+
+
+def test_parse_address():
+    assert parse_address("/tmp/detector.sock") == "/tmp/detector.sock"
+    assert parse_address("127.0.0.1:9200") == ("127.0.0.1", 9200)
+
+
+@pytest.mark.parametrize("shared_memory", [True, False])
+def test_remote_detector_round_trips_arrays_and_images(serve, shared_memory):
+    server = serve(FakeDetector())
+    client = RemoteActivityDetector(str(server.address), shared_memory=shared_memory)
+    images = [
+        np.zeros((4, 4, 3), dtype=np.uint8),
+        Image.new("RGB", (8, 8), (255, 255, 255)),
+        np.full((16, 16, 3), 7, dtype=np.uint8),
+    ]
+
+    predictions = client.detect_batch(images)
+
+    assert client.input_size == 64
+    assert [prediction.detected for prediction in predictions] == [False, True, True]
+    assert [prediction.confidence for prediction in predictions] == [0, 255, 7]
+    client.close()
+
+
+def test_requests_from_several_clients_are_batched_together(serve):
+    detector = FakeDetector()
+    server = serve(detector, max_batch_size=4, batch_timeout_ms=500)
+    clients = [RemoteActivityDetector(str(server.address)) for _ in range(2)]
+    results = {}
+
+    def detect(index):
+        images = [np.full((4, 4), index + 1, dtype=np.uint8)] * 2
+        results[index] = clients[index].detect_batch(images)
+
+    threads = [threading.Thread(target=detect, args=(i,)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert detector.batch_sizes == [4]
+    assert [p.confidence for p in results[0]] == [1, 1]
+    assert [p.confidence for p in results[1]] == [2, 2]
+    assert server.stats()["requests"] == 2
+    for client in clients:
+        client.close()
+
+
+def test_server_errors_are_raised_by_the_client(serve):
+    server = serve(FakeDetector())
+    client = RemoteActivityDetector(str(server.address))
+
+    with pytest.raises(RuntimeError, match="Image too small"):
+        client.detect_batch([np.zeros((1, 1), dtype=np.uint8)])
+    # The connection is still usable.
+    assert client.detect_batch([np.ones((2, 2), dtype=np.uint8)])[0].detected
+    client.close()
+
+
+def test_client_reconnects_after_the_server_restarts(serve):
+    server = serve(FakeDetector())
+    client = RemoteActivityDetector(str(server.address))
+    client.detect_batch([np.ones((2, 2), dtype=np.uint8)])
+
+    server.close()
+    serve(FakeDetector())
+
+    assert client.detect_batch([np.ones((2, 2), dtype=np.uint8)])[0].detected
+    assert client.stats()["reconnects"] == 1
+    client.close()
+
+
+def test_tcp_address_needs_an_authkey(monkeypatch):
+    monkeypatch.delenv("ACTIVITY_DETECTION_AUTHKEY", raising=False)
+
+    with pytest.raises(ValueError, match="authkey"):
+        DetectorServer(FakeDetector(), "127.0.0.1:0")
+
+
+def test_missing_shared_memory_block_is_reported_to_the_client(serve):
+    server = serve(FakeDetector())
+    client = RemoteActivityDetector(str(server.address))
+
+    client.connection.send(("detect", "no_such_block", []))
+
+    status, error = client.connection.recv()
+    assert status == "error"
+    assert "shared_memory: false" in error
+    client.close()
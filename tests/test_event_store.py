@@ -0,0 +1,145 @@
+import sqlite3
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from activity_detection.classifiers.types import Detections, Prediction
+from activity_detection.security.event_store import SQLiteEventStore
+from activity_detection.security.security_module import SecurityModule
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteEventStore(str(tmp_path / "events.db"), flush_interval_s=0.01)
+    yield store
+    store.close()
+
+
+def person(confidence=0.8, track_id=-1):
+    return Prediction(
+        detected=True,
+        detections=Detections(
+            xyxy=[[10, 20, 30, 40]],
+            confidence=np.array([confidence]),
+            track_id=np.array([track_id]),
+        ),
+    )
+
+
+def test_database_uses_wal_and_indexes_time_queries(store):
+    connection = sqlite3.connect(store.path)
+    journal_mode = connection.execute("PRAGMA journal_mode").fetchone()[0]
+    plan = connection.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM detections "
+        "WHERE camera = ? AND timestamp >= ? AND timestamp < ?",
+        ("front", 0, 1),
+    ).fetchall()
+    connection.close()
+
+    assert journal_mode == "wal"
+    assert "detections_camera_time" in str(plan)
+
+
+def test_detections_are_queried_by_camera_and_time(store):
+    store.record_detection("front", 100.0, person(0.9, track_id=3))
+    store.record_detection("front", 200.0, person(0.6))
+    store.record_detection("back", 150.0, person())
+
+    assert store.flush(timeout=5)
+    front = store.detections(50, 300, camera="front")
+    everything = store.detections(0, 1000)
+
+    assert [record.timestamp for record in front] == [100.0, 200.0]
+    assert front[0].boxes == [[10, 20, 30, 40, pytest.approx(0.9), 3]]
+    assert front[0].confidence == pytest.approx(0.9)
+    assert [record.camera for record in everything] == ["front", "back", "front"]
+    assert store.detections(0, 1000, limit=1)[0].timestamp == 100.0
+    assert store.last_detection("front").timestamp == 200.0
+    assert store.last_detection("front", before=200.0).timestamp == 100.0
+    assert store.last_detection("side") is None
+
+
+def test_events_overlapping_a_range_include_open_events(store):
+    store.start_event("front", 100.0)
+    store.end_event("front", 100.0, 160.0, ["clip.mp4"])
+    store.start_event("front", 500.0)
+    store.start_event("back", 120.0)
+    store.end_event("back", 120.0, 130.0, [])
+
+    store.flush(timeout=5)
+
+    events = store.events(150, 1000, camera="front")
+    assert [(e.started_at, e.ended_at, e.clips) for e in events] == [
+        (100.0, 160.0, ["clip.mp4"]),
+        (500.0, None, []),
+    ]
+    assert [e.camera for e in store.events(0, 125)] == ["front", "back"]
+    assert store.events(170, 400) == []
+
+
+def test_writes_are_batched_in_one_transaction(tmp_path):
+    store = SQLiteEventStore(str(tmp_path / "events.db"), batch_size=50)
+    batches = []
+    commit = store._commit
+    store._commit = lambda connection, batch: (
+        batches.append(len(batch)),
+        commit(connection, batch),
+    )
+    for i in range(20):
+        store.record_detection("front", float(i), person())
+
+    store.close()
+
+    # Everything arrives well within the flush interval, so the 20 inserts
+    # and the stop marker share one transaction.
+    assert batches == [21]
+    assert len(store.detections(0, 100)) == 20
+
+
+def test_closed_store_drops_writes(tmp_path):
+    store = SQLiteEventStore(str(tmp_path / "events.db"))
+    store.close()
+    store.record_detection("front", 1.0, person())
+
+    assert store.detections(0, 10) == []
+
+
+def test_security_module_records_events_and_detections():
+    store = MagicMock()
+    video_capture = MagicMock()
+    video_capture.on_clip_files.side_effect = lambda callback: callback(["front.mp4"])
+    security_module = SecurityModule(
+        video_capture,
+        MagicMock(),
+        stop_threshold=2,
+        event_store=store,
+        camera_name="front",
+    )
+    frame = np.zeros((50, 50, 3), dtype=np.uint8)
+
+    security_module.process_frame(frame, person())
+    security_module.process_frame(frame, person())
+    for _ in range(2):
+        security_module.process_frame(frame, Prediction(detected=False))
+
+    store.start_event.assert_called_once()
+    camera, started_at = store.start_event.call_args.args
+    assert camera == "front"
+    assert store.record_detection.call_count == 2
+    camera, event_start, ended_at, clips = store.end_event.call_args.args
+    assert (camera, event_start, clips) == ("front", started_at, ["front.mp4"])
+    assert ended_at >= started_at
+
+
+def test_closing_security_module_ends_open_event():
+    store = MagicMock()
+    video_capture = MagicMock()
+    video_capture.on_clip_files.side_effect = lambda callback: callback([])
+    security_module = SecurityModule(video_capture, MagicMock(), event_store=store)
+    security_module.process_frame(np.zeros((5, 5, 3), dtype=np.uint8), person())
+
+    security_module.close()
+
+    store.end_event.assert_called_once()
+    store.close.assert_not_called()
@@ -0,0 +1,140 @@
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from activity_detection.classifiers import YOLOActivityDetector
+from activity_detection.classifiers.compile_cache import enable_compile_cache
+from activity_detection.classifiers.export import export_key, exported_model
+
+
+@pytest.fixture
+def weights(tmp_path):
+    path = tmp_path / "yolo11n.pt"
+    path.write_bytes(b"weights")
+    return str(path)
+
+
+def fake_model(weights):
+    model = MagicMock()
+
+    def export(format, **kwargs):
+        path = weights.replace(".pt", ".onnx")
+        with open(path, "w") as exported:
+            exported.write(format)
+        return path
+
+    model.export.side_effect = export
+    return model
+
+
+def test_export_is_cached_by_model_and_input_size(tmp_path, weights):
+    model = fake_model(weights)
+    export_dir = str(tmp_path / "exports")
+
+    first = exported_model(model, weights, "onnx", 320, export_dir=export_dir)
+    second = exported_model(model, weights, "onnx", 320, export_dir=export_dir)
+    other_size = exported_model(model, weights, "onnx", 640, export_dir=export_dir)
+
+    assert first == second != other_size
+    assert os.path.dirname(first) == export_dir
+    assert first.endswith("-onnx-320-fp32.onnx")
+    assert model.export.call_count == 2
+    model.export.assert_called_with(
+        format="onnx", imgsz=640, dynamic=True, device="cpu"
+    )
+
+
+def test_export_key_changes_with_weights(weights):
+    before = export_key(weights, "onnx", 640)
+    with open(weights, "wb") as file:
+        file.write(b"retrained")
+
+    assert export_key(weights, "onnx", 640) != before
+
+
+def test_int8_export_needs_calibration(tmp_path, weights):
+    model = fake_model(weights)
+    with pytest.raises(ValueError, match="calibration data"):
+        exported_model(model, weights, "openvino", 640, int8=True)
+
+    path = exported_model(
+        model,
+        weights,
+        "openvino",
+        640,
+        int8=True,
+        calibration_data="coco8.yaml",
+        export_dir=str(tmp_path),
+    )
+
+    assert path.endswith("-openvino-640-int8_openvino_model")
+    assert model.export.call_args.kwargs["int8"] is True
+    assert model.export.call_args.kwargs["data"] == "coco8.yaml"
+
+
+def test_int8_export_needs_openvino(weights):
+    with pytest.raises(ValueError, match="openvino"):
+        exported_model(
+            fake_model(weights), weights, "onnx", 640, int8=True, calibration_data="x"
+        )
+
+
+@patch("activity_detection.classifiers.yolo_classifiers.YOLO")
+@patch("activity_detection.classifiers.yolo_classifiers.exported_model")
+def test_yolo_detector_runs_exported_model_on_cpu(mock_exported, mock_yolo):
+    mock_exported.return_value = "cache/yolo11m.onnx"
+    exported = mock_yolo.return_value
+    exported.names = {0: "person"}
+    exported.predict.return_value = []
+
+    detector = YOLOActivityDetector("yolo11m.pt", 0.5, 320, backend="onnx")
+    detector.detect_batch([])
+
+    pytorch_model = mock_yolo.call_args_list[0].args[0]
+    assert pytorch_model == "yolo11m.pt"
+    mock_yolo.assert_called_with("cache/yolo11m.onnx", task="detect")
+    assert mock_exported.call_args.args[1:4] == ("yolo11m.pt", "onnx", 320)
+    assert not mock_yolo.return_value.to.called
+    assert exported.predict.call_args.kwargs["device"] == "cpu"
+    assert detector.device.value == "cpu"
+
+
+def test_int8_needs_openvino_backend():
+    for backend in ("torch", "onnx"):
+        with pytest.raises(ValueError, match="INT8"):
+            YOLOActivityDetector("yolo11m.pt", backend=backend, int8=True)
+
+
+def test_compile_cache_directory_is_used_by_inductor(tmp_path, monkeypatch):
+    import torch._inductor.config
+    from torch._inductor.runtime.cache_dir_utils import cache_dir
+
+    monkeypatch.delenv("TORCHINDUCTOR_CACHE_DIR", raising=False)
+    monkeypatch.setattr(torch._inductor.config, "fx_graph_cache", False)
+
+    path = enable_compile_cache(str(tmp_path / "compiled"))
+
+    assert cache_dir() == path == str(tmp_path / "compiled")
+    assert torch._inductor.config.fx_graph_cache is True
+
+
+@patch("activity_detection.classifiers.yolo_classifiers.torch.compile")
+@patch("activity_detection.classifiers.yolo_classifiers.enable_compile_cache")
+@patch("activity_detection.classifiers.yolo_classifiers.YOLO")
+def test_yolo_compile_compiles_the_fused_network(mock_yolo, mock_cache, mock_compile):
+    model = mock_yolo.return_value.to.return_value
+    model.names = {0: "person"}
+    model.predict.return_value = []
+    network = model.model.fuse.return_value.eval.return_value
+    forward = network.forward
+
+    detector = YOLOActivityDetector("yolo11m.pt", compile="reduce-overhead")
+    detector.detect_batch([])
+
+    mock_cache.assert_called_once_with(None)
+    mock_compile.assert_called_once_with(forward, mode="reduce-overhead")
+    assert network.forward is mock_compile.return_value
+    assert "compile" not in model.predict.call_args.kwargs
+    with pytest.raises(ValueError, match="torch backend"):
+        YOLOActivityDetector("yolo11m.pt", backend="onnx", compile=True)
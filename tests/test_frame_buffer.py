@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from activity_detection.security.frame_buffer import FrameRingBuffer
+
+
+def frame(value):
+    return np.full((4, 6, 3), value, dtype=np.uint8)
+
+
+def test_buffer_allocates_once_on_first_push():
+    buffer = FrameRingBuffer(3)
+    assert buffer.nbytes == 0
+
+    buffer.push(frame(1))
+    allocated = buffer.frames
+    buffer.push(frame(2))
+
+    assert buffer.frames is allocated
+    assert buffer.nbytes == 3 * 4 * 6 * 3
+
+
+def test_buffer_keeps_most_recent_frames_in_order():
+    buffer = FrameRingBuffer(3)
+
+    for value in range(5):
+        buffer.push(frame(value))
+
+    assert [int(stored[0, 0, 0]) for stored in buffer] == [2, 3, 4]
+
+
+def test_buffer_copies_frames():
+    buffer = FrameRingBuffer(2)
+    source = frame(1)
+
+    buffer.push(source)
+    source[:] = 9
+
+    assert int(next(iter(buffer))[0, 0, 0]) == 1
+
+
+def test_clear_keeps_memory():
+    buffer = FrameRingBuffer(2)
+    buffer.push(frame(1))
+
+    buffer.clear()
+
+    assert len(buffer) == 0
+    assert buffer.frames is not None
+
+
+def test_invalid_capacity():
+    with pytest.raises(ValueError, match="Capacity must be at least 1"):
+        FrameRingBuffer(0)
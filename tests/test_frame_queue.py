@@ -0,0 +1,48 @@
+from queue import Empty
+
+import pytest
+
+from activity_detection.pipeline.frame_queue import FrameQueue
+
+
+def drain(queue):
+    items = []
+    while True:
+        try:
+            items.append(queue.get_nowait())
+        except Empty:
+            return items
+
+
+def test_drop_oldest_keeps_newest_frames():
+    queue = FrameQueue(2, "drop_oldest")
+
+    grew = [queue.push(i) for i in range(4)]
+
+    assert grew == [True, True, False, False]
+    assert drain(queue) == [2, 3]
+    assert queue.dropped == 2
+
+
+def test_latest_keeps_only_one_frame():
+    queue = FrameQueue(100, "latest")
+
+    for i in range(3):
+        queue.push(i)
+
+    assert drain(queue) == [2]
+
+
+def test_drop_newest_keeps_oldest_frames():
+    queue = FrameQueue(2, "drop_newest")
+
+    grew = [queue.push(i) for i in range(3)]
+
+    assert grew == [True, True, False]
+    assert drain(queue) == [0, 1]
+    assert queue.dropped == 1
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError, match="Invalid queue policy"):
+        FrameQueue(2, "newest")
@@ -1,6 +1,10 @@
 import numpy as np
 from PIL import Image
-from activity_detection.processing.image_processing import DefaultImageProcessor
+from activity_detection.classifiers.types import Detections, Prediction
+from activity_detection.processing.image_processing import (
+    DefaultImageProcessor,
+    LetterboxImageProcessor,
+)
 
 
 def test_process_frame():
@@ -25,3 +29,59 @@ def test_preprocess_frame():
 
     assert isinstance(preprocessed_image, Image.Image)
     assert preprocessed_image.size == (1920, 1080)
+
+
+def test_default_transform_maps_boxes_back_to_frame():
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    image_processor = DefaultImageProcessor()
+    prediction = Prediction(
+        detected=True, detections=Detections(xyxy=[[0, 0, 1920, 1080]])
+    )
+
+    mapped = image_processor.get_transform(frame).apply(prediction)
+
+    assert mapped.bounding_box.tolist() == [[0, 0, 640, 480]]
+
+
+def test_letterbox_keeps_aspect_ratio_and_pads_to_stride():
+    frame = np.full((480, 640, 3), 200, dtype=np.uint8)
+    image_processor = LetterboxImageProcessor(input_size=320)
+
+    letterboxed = image_processor.process_frame(frame)
+
+    assert isinstance(letterboxed, np.ndarray)
+    assert letterboxed.shape == (256, 320, 3)
+    assert (letterboxed[:8] == 114).all()
+    assert (letterboxed[8:248] == 200).all()
+    assert (letterboxed[248:] == 114).all()
+
+
+def test_letterbox_reuses_buffers():
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    image_processor = LetterboxImageProcessor(input_size=320, num_buffers=2)
+
+    outputs = [image_processor.process_frame(frame) for _ in range(3)]
+
+    assert outputs[0] is outputs[2]
+    assert outputs[0] is not outputs[1]
+
+
+def test_letterbox_configure_uses_detector_input_size_and_batch_size():
+    image_processor = LetterboxImageProcessor(num_buffers=2)
+
+    image_processor.configure(input_size=416, max_batch_size=8)
+
+    assert image_processor.input_size == 416
+    assert image_processor.num_buffers == 8
+
+
+def test_letterbox_transform_maps_boxes_back_to_frame():
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    image_processor = LetterboxImageProcessor(input_size=320)
+    prediction = Prediction(
+        detected=True, detections=Detections(xyxy=[[10, 18, 110, 68]])
+    )
+
+    mapped = image_processor.get_transform(frame).apply(prediction)
+
+    assert mapped.bounding_box.tolist() == [[20, 20, 220, 120]]
@@ -0,0 +1,74 @@
+import io
+import json
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from activity_detection.logging_config import (
+    configure_logging,
+    every,
+    setup_logger,
+    stop_logging,
+)
+
+
+@pytest.fixture
+def log_stream():
+    stream = io.StringIO()
+    configure_logging(stream=stream)
+    yield stream
+    stop_logging()
+    configure_logging(level="INFO")
+
+
+def test_setup_logger_adds_one_handler_however_often_it_is_called(log_stream):
+    for _ in range(3):
+        logger = setup_logger("test-dedup")
+    logger.info("hello")
+    stop_logging()
+
+    assert len(logger.handlers) == 1
+    assert log_stream.getvalue().count("hello") == 1
+
+
+def test_rate_limited_messages_report_how_many_were_suppressed(log_stream, monkeypatch):
+    logger = setup_logger("test-rate-limit")
+    clock = iter([0.0, 0.5, 0.8, 1.2])
+    monkeypatch.setattr(
+        "activity_detection.logging_config.time",
+        SimpleNamespace(monotonic=lambda: next(clock)),
+    )
+
+    for frame in range(4):
+        logger.info(f"frame {frame}", extra=every(1))
+    stop_logging()
+
+    lines = log_stream.getvalue().splitlines()
+    assert [line.split(" - ")[-1] for line in lines] == [
+        "frame 0",
+        "frame 3 (2 similar messages suppressed)",
+    ]
+
+
+def test_json_output_and_level_apply_to_existing_loggers(log_stream):
+    logger = setup_logger("test-json")
+    configure_logging(level="WARNING", json=True, stream=log_stream)
+
+    logger.info("hidden")
+    logger.warning("shown")
+    stop_logging()
+
+    (line,) = log_stream.getvalue().splitlines()
+    entry = json.loads(line)
+    assert (entry["logger"], entry["level"], entry["message"]) == (
+        "test-json",
+        "WARNING",
+        "shown",
+    )
+
+
+def test_invalid_level_is_rejected():
+    with pytest.raises(ValueError):
+        configure_logging(level="LOUD")
+    assert setup_logger("test-level").level == logging.INFO
@@ -0,0 +1,78 @@
+import time
+import urllib.request
+
+import pytest
+
+from activity_detection.metrics import Histogram, PipelineMetrics
+
+
+def test_histogram_quantile_reports_bucket_upper_bound():
+    histogram = Histogram((0.01, 0.1, 1))
+    for seconds in [0.005] * 90 + [0.5] * 10:
+        histogram.observe(seconds)
+
+    assert histogram.quantile(0.5) == 0.01
+    assert histogram.quantile(0.95) == 1
+    assert histogram.mean == pytest.approx(0.0545)
+
+
+def test_render_prometheus_text():
+    metrics = PipelineMetrics(summary_interval_s=None)
+    metrics.observe("inference", "", 0.02)
+    metrics.count("frames_dropped", "front", 3)
+    metrics.add_gauge("frame_queue_depth", "front", lambda: 7)
+
+    text = metrics.render()
+
+    assert (
+        "activity_detection_stage_seconds_bucket"
+        '{stage="inference",camera="",le="0.025"} 1' in text
+    )
+    assert (
+        'activity_detection_stage_seconds_count{stage="inference",camera=""} 1' in text
+    )
+    assert 'activity_detection_frames_dropped_total{camera="front"} 3' in text
+    assert 'activity_detection_frame_queue_depth{camera="front"} 7' in text
+
+
+def test_update_fps_uses_frames_written_since_last_update():
+    metrics = PipelineMetrics(summary_interval_s=None)
+    written = {}
+    metrics.count("frames_written", "front", 30)
+    metrics.update_fps(["front"], 2.0, written)
+    metrics.count("frames_written", "front", 10)
+    metrics.update_fps(["front"], 1.0, written)
+
+    assert metrics.fps["front"] == 10
+    assert metrics.summary("front").startswith("front: 10.0 fps")
+
+
+def test_serves_metrics_over_http():
+    metrics = PipelineMetrics(port=0, summary_interval_s=None)
+    metrics.count("frames_captured", "front")
+    metrics.start(["front"])
+    try:
+        host, port = metrics.server.server_address
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics") as response:
+            body = response.read().decode()
+    finally:
+        metrics.stop()
+
+    assert 'activity_detection_frames_captured_total{camera="front"} 1' in body
+
+
+def test_fps_is_exported_without_summaries():
+    metrics = PipelineMetrics(port=0, summary_interval_s=None)
+    metrics.FPS_INTERVAL = 0.05
+    metrics.fps_counter = "frames_processed"
+    metrics.start(["front"])
+    try:
+        metrics.count("frames_processed", "front", 10)
+        deadline = time.monotonic() + 5
+        while not metrics.fps.get("front") and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        metrics.stop()
+
+    assert metrics.fps["front"] > 0
+    assert 'activity_detection_fps{camera="front"}' in metrics.render()
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from activity_detection.processing.motion_detection import (
+    FrameDifferenceMotionDetector,
+)
+
+
+@pytest.fixture
+def static_frame():
+    return np.full((480, 640, 3), 100, dtype=np.uint8)
+
+
+@pytest.fixture
+def moving_frame(static_frame):
+    frame = static_frame.copy()
+    frame[100:300, 200:400] = 255
+    return frame
+
+
+def test_first_frame_counts_as_motion(static_frame):
+    detector = FrameDifferenceMotionDetector()
+
+    assert detector.detect_motion(static_frame) is True
+
+
+def test_static_frames_have_no_motion(static_frame):
+    detector = FrameDifferenceMotionDetector()
+    detector.detect_motion(static_frame)
+
+    assert detector.detect_motion(static_frame.copy()) is False
+
+
+def test_changed_frame_has_motion(static_frame, moving_frame):
+    detector = FrameDifferenceMotionDetector()
+    detector.detect_motion(static_frame)
+
+    assert detector.detect_motion(moving_frame) is True
+
+
+def test_small_change_below_sensitivity_is_ignored(static_frame):
+    detector = FrameDifferenceMotionDetector(min_changed_fraction=0.05)
+    detector.detect_motion(static_frame)
+    frame = static_frame.copy()
+    frame[:10, :10] = 255
+
+    assert detector.detect_motion(frame) is False
+
+
+def test_should_run_detector_respects_max_skip_frames(static_frame):
+    detector = FrameDifferenceMotionDetector(max_skip_frames=2)
+
+    decisions = [detector.should_run_detector(static_frame) for _ in range(7)]
+
+    assert decisions == [True, False, False, True, False, False, True]
+    assert detector.inferences_run == 3
+    assert detector.inferences_skipped == 4
@@ -0,0 +1,129 @@
+import multiprocessing
+import pickle
+import threading
+import time
+from queue import Empty, Queue
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from activity_detection.activity_manager import ActivityManager, CameraStream
+from activity_detection.classifiers.types import Prediction
+from activity_detection.pipeline.process_pipeline import (
+    CameraChannels,
+    ProcessPipeline,
+    SharedFrameQueue,
+    _drain_when_set,
+)
+from activity_detection.pipeline.shared_frames import SharedFrameRing
+from activity_detection.processing.image_processing import BoxTransform
+
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing.create(2, (4, 4, 3))
+    yield ring
+    ring.close()
+    ring.unlink()
+
+
+def test_ring_round_trips_frames_of_any_size_that_fits(ring):
+    frame = np.arange(2 * 3 * 3, dtype=np.uint8).reshape(2, 3, 3)
+
+    shape = ring.write(1, frame)
+
+    assert shape == (2, 3, 3)
+    assert np.array_equal(ring.view(1, shape), frame)
+
+
+def test_ring_rejects_frames_larger_than_a_slot(ring):
+    assert ring.write(0, np.zeros((5, 4, 3), dtype=np.uint8)) is None
+
+
+def test_pickled_ring_shares_memory(ring):
+    attached = pickle.loads(pickle.dumps(ring))
+    try:
+        ring.write(0, np.full((4, 4, 3), 7, dtype=np.uint8))
+
+        assert attached.view(0, (4, 4, 3)).max() == 7
+    finally:
+        attached.close()
+
+
+def test_process_frames_passes_slots_through_shared_frame_queue(ring):
+    context = multiprocessing.get_context("spawn")
+    channels = CameraChannels(
+        ring=ring,
+        free_slots=context.SimpleQueue(),
+        frame_slots=context.SimpleQueue(),
+        processed=Queue(),
+    )
+    camera = CameraStream("front", None, None)
+    camera.frame_queue = camera.processed_frame_queue = SharedFrameQueue(channels)
+    image_processor = MagicMock()
+    image_processor.get_transform.return_value = BoxTransform()
+    manager = ActivityManager([camera], image_processor, MagicMock())
+    manager.frames_available = context.Semaphore(0)
+
+    def stop_after_batch(images):
+        manager.running = False
+        return [Prediction(detected=True)]
+
+    manager.activity_detector.detect_batch.side_effect = stop_after_batch
+    shape = ring.write(1, np.ones((3, 4, 3), dtype=np.uint8))
+    channels.frame_slots.put((1, shape, time.monotonic()))
+    manager.frames_available.release()
+
+    manager.process_frames()
+
+    slot, processed_shape, prediction = channels.processed.get_nowait()
+    assert (slot, processed_shape) == (1, (3, 4, 3))
+    assert prediction.detected is True
+    assert camera.frame_queue.slots == {}
+
+
+def test_drain_processes_the_captured_frames_then_stops(ring):
+    context = multiprocessing.get_context("spawn")
+    channels = CameraChannels(
+        ring=ring,
+        free_slots=context.SimpleQueue(),
+        frame_slots=context.SimpleQueue(),
+        processed=Queue(),
+    )
+    camera = CameraStream("front", None, None)
+    camera.frame_queue = camera.processed_frame_queue = SharedFrameQueue(channels)
+    image_processor = MagicMock()
+    image_processor.get_transform.return_value = BoxTransform()
+    manager = ActivityManager([camera], image_processor, MagicMock())
+    manager.frames_available = context.Semaphore(0)
+    manager.activity_detector.detect_batch.side_effect = lambda images: [
+        Prediction(detected=False) for _ in images
+    ]
+    for slot in range(2):
+        shape = ring.write(slot, np.ones((4, 4, 3), dtype=np.uint8))
+        channels.frame_slots.put((slot, shape, time.monotonic()))
+        manager.frames_available.release()
+    drain_event = threading.Event()
+    drain_event.set()
+
+    _drain_when_set(manager, drain_event)
+    manager.process_frames()
+
+    assert [channels.processed.get_nowait()[0] for _ in range(2)] == [0, 1]
+    assert channels.processed.empty()
+
+
+def test_shared_frame_queue_raises_empty_without_frames(ring):
+    context = multiprocessing.get_context("spawn")
+    channels = CameraChannels(ring, None, context.SimpleQueue(), None)
+
+    with pytest.raises(Empty):
+        SharedFrameQueue(channels).get_nowait()
+
+
+def test_process_pipeline_requires_unique_camera_names():
+    camera = {"name": "front", "camera_input": {"LocalCamera": {}}}
+
+    with pytest.raises(ValueError):
+        ProcessPipeline({"cameras": [camera, camera]})
@@ -0,0 +1,78 @@
+import subprocess
+import sys
+from importlib.metadata import EntryPoint
+from unittest.mock import patch
+
+import pytest
+
+from activity_detection import registry
+from activity_detection.inputs.camera_input import IPCamera
+from activity_detection.startup import StartupTimer
+
+
+def test_importing_the_manager_does_not_load_model_libraries():
+    code = (
+        "import sys, activity_detection.activity_manager, "
+        "activity_detection.pipeline.process_pipeline; "
+        "print(sorted({'torch', 'ultralytics', 'transformers'} & set(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_resolve_imports_and_caches_the_class():
+    with patch.dict(
+        registry.COMPONENT_MAPPING["camera_input"],
+        IPCamera="activity_detection.inputs.camera_input:IPCamera",
+    ):
+        assert registry.resolve("camera_input", "IPCamera") is IPCamera
+        assert registry.COMPONENT_MAPPING["camera_input"]["IPCamera"] is IPCamera
+
+
+def test_resolve_rejects_unknown_components():
+    with pytest.raises(ValueError, match="Invalid component type"):
+        registry.resolve("speaker", "IPCamera")
+    with pytest.raises(ValueError, match="Invalid class name for camera_input"):
+        registry.resolve("camera_input", "Missing")
+
+
+def test_plugins_are_found_through_entry_points(monkeypatch):
+    plugins = [
+        EntryPoint(
+            "camera_input.PluginCamera",
+            "activity_detection.inputs.camera_input:IPCamera",
+            registry.ENTRY_POINT_GROUP,
+        ),
+        EntryPoint(
+            "camera_input.LocalCamera",
+            "somewhere.else:LocalCamera",
+            registry.ENTRY_POINT_GROUP,
+        ),
+    ]
+    monkeypatch.setattr(registry, "_plugins_loaded", False)
+    monkeypatch.setattr(registry, "entry_points", lambda group: plugins)
+    with patch.dict(registry.COMPONENT_MAPPING["camera_input"]):
+        assert registry.resolve("camera_input", "PluginCamera") is IPCamera
+        # Built-in components are not replaced by plugins.
+        assert "somewhere" not in str(
+            registry.COMPONENT_MAPPING["camera_input"]["LocalCamera"]
+        )
+
+
+def test_startup_report_lists_phases_and_slowest_steps():
+    timer = StartupTimer()
+    timer.mark("imports")
+    with timer.step("create Fast"):
+        pass
+    timer.steps.append(("create Slow", 1.5))
+    timer.mark("components")
+
+    report = timer.report()
+
+    assert report.startswith("Started in ")
+    assert "imports " in report and "components " in report
+    assert report.index("create Slow 1.50s") < report.index("create Fast")
+    assert "peak RSS" in report
@@ -1,5 +1,33 @@
+import os
+import threading
+from queue import Queue
+from unittest.mock import MagicMock, patch
+
+import cv2
+import numpy as np
 import pytest
-from activity_detection.security.security_capture import DefaultVideoCapture
+from activity_detection.classifiers.types import Prediction
+from activity_detection.security.security_capture import (
+    DefaultVideoCapture,
+    ProcessVideoCapture,
+    SegmentWriter,
+    _encode_frames,
+)
+from activity_detection.security.segment_index import SegmentIndex
+from activity_detection.security.security_module import SecurityModule
+
+
+def recorded(video_capture):
+    """(frame, timestamp) pairs a mock recorder got, pre-event ones first."""
+    pre_event = [
+        frame
+        for call in video_capture.capture_frames.call_args_list
+        for frame in call.args[0]
+    ]
+    return pre_event + [
+        (call.args[0], call.args[1])
+        for call in video_capture.capture_frame.call_args_list
+    ]
 
 
 @pytest.mark.xfail(reason="Not implemented yet")
@@ -19,3 +47,165 @@ def test_save_video():
     video_capture = DefaultVideoCapture()
     video_data = None
     video_capture.save_video(video_data)
+
+
+def test_security_module_flushes_pre_event_frames_on_detection():
+    video_capture = MagicMock()
+    security_module = SecurityModule(video_capture, MagicMock(), pre_event_frames=2)
+    frames = [np.full((4, 4, 3), value, dtype=np.uint8) for value in range(4)]
+
+    for frame in frames[:3]:
+        security_module.process_frame(frame, Prediction(detected=False))
+    video_capture.capture_frame.assert_not_called()
+    security_module.process_frame(frames[3], Prediction(detected=True))
+
+    video_capture.start_video_capture.assert_called_once()
+    written = [int(frame[0, 0, 0]) for frame, _ in recorded(video_capture)]
+    assert written == [1, 2, 3]
+    assert len(security_module.pre_event_buffer) == 0
+
+
+def test_default_video_capture_writes_to_output_dir_at_frame_size(tmp_path):
+    video_capture = DefaultVideoCapture(str(tmp_path / "videos"), "front")
+
+    video_capture.start_video_capture()
+    for _ in range(3):
+        video_capture.capture_frame(np.zeros((120, 160, 3), dtype=np.uint8))
+    video_capture.stop_video_capture()
+
+    (output_file,) = (tmp_path / "videos").glob("*.mp4")
+    assert output_file.name.startswith("suspicious_activity_front_")
+    capture = cv2.VideoCapture(str(output_file))
+    assert capture.get(cv2.CAP_PROP_FRAME_WIDTH) == 160
+    assert capture.get(cv2.CAP_PROP_FRAME_HEIGHT) == 120
+    capture.release()
+
+
+def test_segment_writer_rotates_by_size(tmp_path):
+    writer = SegmentWriter(str(tmp_path), max_segment_bytes=1)
+
+    writer.start("clip")
+    for _ in range(3):
+        writer.write(np.zeros((120, 160, 3), dtype=np.uint8))
+    files = writer.stop()
+
+    assert [os.path.basename(file) for file in files] == [
+        "clip.mp4",
+        "clip_001.mp4",
+        "clip_002.mp4",
+    ]
+
+
+def test_segment_writer_rotates_by_frame_time_and_indexes_segments(tmp_path):
+    writer = SegmentWriter(
+        str(tmp_path), segment_seconds=2, camera_name="front", index=True
+    )
+
+    writer.start("clip")
+    for second in range(5):
+        writer.write(np.zeros((120, 160, 3), dtype=np.uint8), 1000.0 + second)
+    files = writer.stop()
+
+    assert [os.path.basename(file) for file in files] == [
+        "clip.mp4",
+        "clip_001.mp4",
+        "clip_002.mp4",
+    ]
+    clips = SegmentIndex(str(tmp_path)).window(1001.0, 1004.0, camera="front")
+    assert [
+        (os.path.basename(clip.path), clip.start_frame, clip.end_frame)
+        for clip in clips
+    ] == [("clip.mp4", 1, 2), ("clip_001.mp4", 0, 2)]
+    assert [clip.recording_frame for clip in clips] == [0, 2]
+    assert (clips[0].started_at, clips[-1].ended_at) == (1001.0, 1003.0)
+    assert SegmentIndex(str(tmp_path)).window(1001.0, 1004.0, camera="back") == []
+
+
+def test_security_module_records_frames_with_the_time_they_were_seen():
+    video_capture = MagicMock()
+    security_module = SecurityModule(video_capture, MagicMock(), pre_event_frames=1)
+    frame = np.zeros((4, 4, 3), dtype=np.uint8)
+
+    with patch("time.time", side_effect=[10.0, 11.0]):
+        security_module.process_frame(frame, Prediction(detected=False))
+        security_module.process_frame(frame, Prediction(detected=True))
+
+    timestamps = [timestamp for _, timestamp in recorded(video_capture)]
+    assert timestamps == [10.0, 11.0]
+
+
+@patch("multiprocessing.get_context")
+def test_process_video_capture_drops_frames_when_encoder_is_behind(
+    mock_get_context, tmp_path
+):
+    mock_get_context.return_value.Queue.side_effect = lambda maxsize=0: Queue(maxsize)
+    video_capture = ProcessVideoCapture(str(tmp_path), queue_size=2)
+    mock_get_context.return_value.Process.return_value.start.assert_called_once()
+
+    video_capture.start_video_capture()
+    for _ in range(3):
+        video_capture.capture_frame(np.zeros((4, 4, 3), dtype=np.uint8))
+
+    assert video_capture.frame_queue.get_nowait()[0] == "start"
+    assert video_capture.frame_queue.get_nowait()[0] == "frame"
+    assert video_capture.dropped_frames == 2
+
+
+@patch("multiprocessing.get_context")
+def test_process_video_capture_drops_pre_event_frames_like_live_ones(
+    mock_get_context, tmp_path
+):
+    mock_get_context.return_value.Queue.side_effect = lambda maxsize=0: Queue(maxsize)
+    video_capture = ProcessVideoCapture(str(tmp_path), queue_size=2)
+    video_capture.start_video_capture()
+
+    frame = np.zeros((4, 4, 3), dtype=np.uint8)
+    video_capture.capture_frames([(frame, float(second)) for second in range(4)])
+
+    assert video_capture.frame_queue.get_nowait()[0] == "start"
+    assert video_capture.frame_queue.get_nowait()[0] == "frame"
+    assert video_capture.dropped_frames == 3
+
+
+@patch("multiprocessing.get_context")
+def test_process_video_capture_reports_every_segment_of_a_clip_later(
+    mock_get_context, tmp_path
+):
+    mock_get_context.return_value.Queue.side_effect = lambda maxsize=0: Queue(maxsize)
+    video_capture = ProcessVideoCapture(
+        str(tmp_path), queue_size=10, segment_seconds=2, camera_name="front"
+    )
+    video_capture.start_video_capture()
+    frame = np.zeros((120, 160, 3), dtype=np.uint8)
+    video_capture.capture_frames([(frame, 1000.0 + second) for second in range(5)])
+    video_capture.stop_video_capture()
+    reported = []
+    done = threading.Event()
+
+    video_capture.on_clip_files(lambda files: reported.append(files) or done.set())
+
+    # Nothing is known before the encoder has written the recording.
+    assert reported == []
+    assert video_capture.clip_files() == [video_capture.output_file]
+    encoder = threading.Thread(
+        target=_encode_frames,
+        args=(
+            video_capture.frame_queue,
+            video_capture.results,
+            str(tmp_path),
+            10.0,
+            2,
+            None,
+        ),
+    )
+    encoder.start()
+    assert done.wait(timeout=5)
+    video_capture.frame_queue.put(None)
+    encoder.join()
+
+    prefix = os.path.basename(video_capture.output_file)[: -len(".mp4")]
+    expected = [f"{prefix}.mp4", f"{prefix}_001.mp4", f"{prefix}_002.mp4"]
+    assert [[os.path.basename(file) for file in files] for files in reported] == [
+        expected
+    ]
+    assert [os.path.basename(file) for file in video_capture.clip_files()] == expected
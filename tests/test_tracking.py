@@ -0,0 +1,53 @@
+import numpy as np
+
+from activity_detection.classifiers.types import Detections, Prediction
+from activity_detection.processing.tracking import IoUTracker, box_iou
+
+
+def detection(*boxes):
+    return Prediction(detected=bool(boxes), detections=Detections(xyxy=boxes))
+
+
+def test_box_iou():
+    boxes_a = np.array([[0, 0, 10, 10]], dtype=np.float32)
+    boxes_b = np.array([[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]])
+
+    iou = box_iou(boxes_a, boxes_b)
+
+    np.testing.assert_allclose(iou, [[1.0, 1 / 3, 0.0]])
+
+
+def test_track_ids_are_stable_across_detections():
+    tracker = IoUTracker()
+
+    first = tracker.update(detection([0, 0, 10, 10], [50, 50, 60, 60]))
+    second = tracker.update(detection([52, 51, 62, 61], [1, 0, 11, 10]))
+
+    assert first.track_ids.tolist() == [0, 1]
+    assert second.track_ids.tolist() == [1, 0]
+
+
+def test_predict_propagates_boxes_with_velocity():
+    tracker = IoUTracker()
+    tracker.update(detection([0, 0, 10, 10]))
+    tracker.predict()
+    tracker.update(detection([4, 0, 14, 10]))
+
+    propagated = tracker.predict()
+
+    assert propagated.detected is True
+    assert propagated.track_ids.tolist() == [0]
+    np.testing.assert_allclose(propagated.bounding_box, [[6, 0, 16, 10]])
+
+
+def test_unmatched_tracks_are_dropped():
+    tracker = IoUTracker(max_missed=1)
+    tracker.update(detection([0, 0, 10, 10]))
+    tracker.update(detection())
+
+    assert len(tracker.predict().bounding_box) == 0
+
+    tracker.update(detection())
+    result = tracker.update(detection([0, 0, 10, 10]))
+
+    assert result.track_ids.tolist() == [1]